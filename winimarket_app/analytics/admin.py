@@ -0,0 +1,24 @@
+from django.contrib import admin
+from .models import CategoryDailyStats, PlatformDailyStats, SellerDailyStats, RollupWatermark
+
+@admin.register(SellerDailyStats)
+class SellerDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ("seller", "date", "views", "contact_clicks", "orders", "paid_orders", "items_sold", "revenue")
+    list_filter = ("date",)
+    search_fields = ("seller__store_name",)
+    ordering = ("-date",)
+
+@admin.register(RollupWatermark)
+class RollupWatermarkAdmin(admin.ModelAdmin):
+    list_display = ("name", "processed_until", "updated_at")
+
+@admin.register(PlatformDailyStats)
+class PlatformDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ("date", "gmv", "orders", "paid_orders", "items_sold", "active_sellers", "views", "contact_clicks")
+    ordering = ("-date",)
+
+@admin.register(CategoryDailyStats)
+class CategoryDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ("category", "date", "views", "contact_clicks", "orders", "items_sold", "gmv")
+    list_filter = ("date", "category")
+    ordering = ("-date",)
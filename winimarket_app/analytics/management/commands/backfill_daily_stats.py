@@ -0,0 +1,49 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from analytics.rollups import backfill_daily_stats
+from order.models import ArchivedOrder, Order
+from products.models import ContactClick, ProductView
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily stats rollups from the source tables, a few days at a time'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=date.fromisoformat, help='First day (YYYY-MM-DD), defaults to the oldest activity')
+        parser.add_argument('--end', type=date.fromisoformat, help='Last day included (YYYY-MM-DD), defaults to today')
+        parser.add_argument('--chunk-days', type=int, default=7, help='Days rebuilt per transaction')
+
+    def _oldest_activity(self):
+        candidates = [
+            ProductView.objects.order_by('viewed_at').values_list('viewed_at', flat=True).first(),
+            ContactClick.objects.order_by('clicked_at').values_list('clicked_at', flat=True).first(),
+            Order.objects.order_by('created_at').values_list('created_at', flat=True).first(),
+            # Finished orders moved out by order.archive hold the oldest history
+            ArchivedOrder.objects.order_by('created_at').values_list('created_at', flat=True).first(),
+        ]
+        candidates = [value for value in candidates if value]
+        return timezone.localdate(min(candidates)) if candidates else timezone.localdate()
+
+    def handle(self, *args, **options):
+        start = options['start'] or self._oldest_activity()
+        end = (options['end'] or timezone.localdate()) + timedelta(days=1)
+        chunk = timedelta(days=options['chunk_days'])
+
+        if options['chunk_days'] < 1:
+            raise CommandError("--chunk-days must be at least 1")
+        if start >= end:
+            raise CommandError("--start must be on or before --end")
+
+        total = 0
+        chunk_start = start
+        while chunk_start < end:
+            chunk_end = min(chunk_start + chunk, end)
+            written = backfill_daily_stats(chunk_start, chunk_end)
+            total += written
+            self.stdout.write(f"{chunk_start} → {chunk_end - timedelta(days=1)}: {written} seller-days")
+            chunk_start = chunk_end
+
+        self.stdout.write(self.style.SUCCESS(f"Backfill done, {total} seller-days written."))
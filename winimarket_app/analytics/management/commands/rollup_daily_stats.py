@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from analytics.rollups import run_daily_rollups
+
+
+class Command(BaseCommand):
+    help = 'Roll up activity written since the last run into the seller, platform and category daily stats (schedule every few minutes)'
+
+    def handle(self, *args, **options):
+        written = run_daily_rollups()
+        self.stdout.write(self.style.SUCCESS(f"{written} seller-days updated."))
@@ -0,0 +1,88 @@
+from django.db import models
+from uuid import uuid4
+
+# -----------------------------
+# Seller Daily Stats (rollup)
+# -----------------------------
+class SellerDailyStats(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    seller = models.ForeignKey('registration.SellerProfile', related_name='daily_stats', on_delete=models.CASCADE)
+    date = models.DateField()
+
+    views = models.PositiveIntegerField(default=0)                          # ProductView rows for the seller's products
+    contact_clicks = models.PositiveIntegerField(default=0)                 # Phone / WhatsApp clicks
+    orders = models.PositiveIntegerField(default=0)                         # Orders placed that day (any status)
+    paid_orders = models.PositiveIntegerField(default=0)                    # Orders paid that day and not cancelled
+    items_sold = models.PositiveIntegerField(default=0)                     # Units in those paid orders
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['seller', 'date'], name='unique_seller_daily_stats')
+        ]
+
+    def __str__(self):
+        return f"{self.seller.store_name} - {self.date}"
+
+# -----------------------------
+# Rollup Watermark
+# -----------------------------
+class RollupWatermark(models.Model):
+    name = models.CharField(max_length=100, primary_key=True)
+    processed_until = models.DateTimeField()                                # Source rows before this are rolled up
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.processed_until}"
+
+# -----------------------------
+# Platform Daily Stats (rollup)
+# -----------------------------
+class PlatformDailyStats(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    date = models.DateField(unique=True)
+
+    gmv = models.DecimalField(max_digits=14, decimal_places=2, default=0)  # Value of orders paid that day (not cancelled)
+    orders = models.PositiveIntegerField(default=0)                         # Orders placed that day
+    paid_orders = models.PositiveIntegerField(default=0)
+    items_sold = models.PositiveIntegerField(default=0)
+    orders_by_status = models.JSONField(default=dict, blank=True)           # Current status of the orders placed that day
+    active_sellers = models.PositiveIntegerField(default=0)                 # Sellers with any view, click or order that day
+    views = models.PositiveIntegerField(default=0)
+    contact_clicks = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['date']
+
+    def __str__(self):
+        return f"Platform - {self.date}"
+
+# -----------------------------
+# Category Daily Stats (rollup)
+# -----------------------------
+class CategoryDailyStats(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    category = models.ForeignKey('products.Category', related_name='daily_stats', on_delete=models.CASCADE)
+    date = models.DateField()
+
+    views = models.PositiveIntegerField(default=0)
+    contact_clicks = models.PositiveIntegerField(default=0)
+    orders = models.PositiveIntegerField(default=0)                         # Orders placed that day with an item in the category
+    items_sold = models.PositiveIntegerField(default=0)
+    gmv = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'date'], name='unique_category_daily_stats')
+        ]
+
+    def __str__(self):
+        return f"{self.category.name} - {self.date}"
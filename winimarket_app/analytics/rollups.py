@@ -0,0 +1,318 @@
+import logging
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from order.models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem, OrderStatus
+from products.models import ContactClick, ProductView
+
+from .models import CategoryDailyStats, PlatformDailyStats, RollupWatermark, SellerDailyStats
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# Daily stats rollups
+# -----------------------------
+# Rollup rows are always recomputed from the source tables for a whole day,
+# never incremented, so running the job twice (or over an overlapping
+# window) gives the same result. The source tables include the archived
+# orders, so recomputing or backfilling an old day does not lose the orders
+# order.archive has moved out of the hot tables.
+#
+# The incremental job only looks at source rows written since the last
+# watermark to find which (seller, day) pairs changed, recomputes just those
+# pairs, then the platform and category rows for the days involved. The
+# backfill rebuilds everything in a date range.
+
+SELLER_STATS_WATERMARK = 'seller_daily_stats'
+
+# Re-scan a little before the watermark to pick up rows from transactions
+# that committed after the previous run started
+ROLLUP_OVERLAP = timedelta(minutes=10)
+
+# Where the first incremental run starts when there is no watermark yet
+INITIAL_LOOKBACK = timedelta(days=1)
+
+METRICS = ('views', 'contact_clicks', 'orders', 'paid_orders', 'items_sold', 'revenue')
+
+
+def _empty_metrics():
+    return {'views': 0, 'contact_clicks': 0, 'orders': 0, 'paid_orders': 0, 'items_sold': 0, 'revenue': Decimal('0')}
+
+
+def day_bounds(start_day, end_day):
+    """
+    Aware datetimes covering [start_day, end_day) in the current time zone.
+    """
+    tz = timezone.get_current_timezone()
+    return (
+        timezone.make_aware(datetime.combine(start_day, time.min), tz),
+        timezone.make_aware(datetime.combine(end_day, time.min), tz),
+    )
+
+
+def _paid_orders(model=Order):
+    return model.objects.filter(paid_at__isnull=False).exclude(status=OrderStatus.CANCELLED)
+
+
+def compute_day_metrics(start, end, seller_ids=None):
+    """
+    Aggregate the source tables between two datetimes, archived orders
+    included. Returns {(seller_id, date): metrics}; six GROUP BY queries.
+    """
+    views = ProductView.objects.filter(viewed_at__gte=start, viewed_at__lt=end)
+    clicks = ContactClick.objects.filter(clicked_at__gte=start, clicked_at__lt=end)
+
+    if seller_ids is not None:
+        views = views.filter(product__seller_id__in=seller_ids)
+        clicks = clicks.filter(seller_id__in=seller_ids)
+
+    metrics = defaultdict(_empty_metrics)
+
+    for row in (views.annotate(day=TruncDate('viewed_at')).order_by()
+                .values('product__seller_id', 'day').annotate(count=Count('id'))):
+        metrics[(row['product__seller_id'], row['day'])]['views'] = row['count']
+
+    for row in (clicks.annotate(day=TruncDate('clicked_at')).order_by()
+                .values('seller_id', 'day').annotate(count=Count('id'))):
+        metrics[(row['seller_id'], row['day'])]['contact_clicks'] = row['count']
+
+    # Finished orders moved to cold storage (order.archive) still count for
+    # their days; an order is in exactly one of the two tables
+    for order_model in (Order, ArchivedOrder):
+        orders = order_model.objects.filter(created_at__gte=start, created_at__lt=end, seller__isnull=False)
+        paid = _paid_orders(order_model).filter(paid_at__gte=start, paid_at__lt=end, seller__isnull=False)
+
+        if seller_ids is not None:
+            orders = orders.filter(seller_id__in=seller_ids)
+            paid = paid.filter(seller_id__in=seller_ids)
+
+        for row in (orders.annotate(day=TruncDate('created_at')).order_by()
+                    .values('seller_id', 'day').annotate(count=Count('id'))):
+            metrics[(row['seller_id'], row['day'])]['orders'] += row['count']
+
+        for row in (paid.annotate(day=TruncDate('paid_at')).order_by()
+                    .values('seller_id', 'day')
+                    .annotate(
+                        count=Count('id', distinct=True),
+                        items_sold=Sum('items__quantity'),
+                        revenue=Sum(F('items__price') * F('items__quantity')),
+                    )):
+            day_metrics = metrics[(row['seller_id'], row['day'])]
+            day_metrics['paid_orders'] += row['count']
+            day_metrics['items_sold'] += row['items_sold'] or 0
+            day_metrics['revenue'] += row['revenue'] or Decimal('0')
+
+    return metrics
+
+
+def touched_seller_days(since, until):
+    """
+    (seller_id, date) pairs whose source rows were written in [since, until).
+    Meta.ordering is cleared so its columns do not end up in the DISTINCT.
+    """
+    pairs = set()
+
+    pairs.update(
+        ProductView.objects.filter(viewed_at__gte=since, viewed_at__lt=until)
+        .annotate(day=TruncDate('viewed_at'))
+        .order_by().values_list('product__seller_id', 'day').distinct()
+    )
+    pairs.update(
+        ContactClick.objects.filter(clicked_at__gte=since, clicked_at__lt=until)
+        .annotate(day=TruncDate('clicked_at'))
+        .order_by().values_list('seller_id', 'day').distinct()
+    )
+
+    # An order update can move its created day (status) or its paid day (revenue)
+    changed_orders = Order.objects.filter(updated_at__gte=since, updated_at__lt=until, seller__isnull=False)
+    pairs.update(
+        changed_orders.annotate(day=TruncDate('created_at')).order_by().values_list('seller_id', 'day').distinct()
+    )
+    pairs.update(
+        changed_orders.filter(paid_at__isnull=False)
+        .annotate(day=TruncDate('paid_at')).order_by().values_list('seller_id', 'day').distinct()
+    )
+
+    return pairs
+
+
+def upsert_seller_days(metrics):
+    rows = [
+        SellerDailyStats(seller_id=seller_id, date=day, **values)
+        for (seller_id, day), values in metrics.items()
+    ]
+    SellerDailyStats.objects.bulk_create(
+        rows,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['seller', 'date'],
+        update_fields=[*METRICS, 'updated_at'],
+    )
+    return len(rows)
+
+
+def recompute_seller_days(pairs):
+    """
+    Recompute the given (seller_id, date) pairs from the source tables.
+    Pairs with no activity left are written as zeros.
+    """
+    sellers_by_day = defaultdict(set)
+    for seller_id, day in pairs:
+        sellers_by_day[day].add(seller_id)
+
+    metrics = {}
+    for day, seller_ids in sellers_by_day.items():
+        start, end = day_bounds(day, day + timedelta(days=1))
+        day_metrics = compute_day_metrics(start, end, seller_ids)
+
+        for seller_id in seller_ids:
+            metrics[(seller_id, day)] = day_metrics.get((seller_id, day)) or _empty_metrics()
+
+    return upsert_seller_days(metrics)
+
+
+def compute_category_metrics(start, end):
+    """
+    Per category and day between two datetimes, archived orders included.
+    Returns {(category_id, date): metrics}.
+    """
+    metrics = defaultdict(lambda: {'views': 0, 'contact_clicks': 0, 'orders': 0, 'items_sold': 0, 'gmv': Decimal('0')})
+
+    for row in (ProductView.objects.filter(viewed_at__gte=start, viewed_at__lt=end, product__category__isnull=False)
+                .annotate(day=TruncDate('viewed_at')).order_by()
+                .values('product__category_id', 'day').annotate(count=Count('id'))):
+        metrics[(row['product__category_id'], row['day'])]['views'] = row['count']
+
+    for row in (ContactClick.objects.filter(clicked_at__gte=start, clicked_at__lt=end, product__category__isnull=False)
+                .annotate(day=TruncDate('clicked_at')).order_by()
+                .values('product__category_id', 'day').annotate(count=Count('id'))):
+        metrics[(row['product__category_id'], row['day'])]['contact_clicks'] = row['count']
+
+    for item_model, order_model in ((OrderItem, Order), (ArchivedOrderItem, ArchivedOrder)):
+        items = item_model.objects.filter(product__category__isnull=False)
+
+        for row in (items.filter(order__created_at__gte=start, order__created_at__lt=end)
+                    .annotate(day=TruncDate('order__created_at')).order_by()
+                    .values('product__category_id', 'day').annotate(count=Count('order', distinct=True))):
+            metrics[(row['product__category_id'], row['day'])]['orders'] += row['count']
+
+        for row in (items.filter(order__in=_paid_orders(order_model), order__paid_at__gte=start, order__paid_at__lt=end)
+                    .annotate(day=TruncDate('order__paid_at')).order_by()
+                    .values('product__category_id', 'day')
+                    .annotate(items_sold=Sum('quantity'), gmv=Sum(F('price') * F('quantity')))):
+            day_metrics = metrics[(row['product__category_id'], row['day'])]
+            day_metrics['items_sold'] += row['items_sold'] or 0
+            day_metrics['gmv'] += row['gmv'] or Decimal('0')
+
+    return metrics
+
+
+def recompute_platform_days(start_day, end_day):
+    """
+    Rebuild PlatformDailyStats and CategoryDailyStats for [start_day, end_day).
+    Platform totals are summed from SellerDailyStats, so refresh those first.
+    """
+    start, end = day_bounds(start_day, end_day)
+
+    statuses = defaultdict(lambda: defaultdict(int))
+    for order_model in (Order, ArchivedOrder):
+        for row in (order_model.objects.filter(created_at__gte=start, created_at__lt=end)
+                    .annotate(day=TruncDate('created_at')).order_by()
+                    .values('day', 'status').annotate(count=Count('id'))):
+            statuses[row['day']][row['status']] += row['count']
+
+    # Aliases must not shadow the SellerDailyStats fields used in the filter
+    seller_totals = {
+        row['date']: row
+        for row in (SellerDailyStats.objects.filter(date__gte=start_day, date__lt=end_day)
+                    .order_by().values('date')
+                    .annotate(
+                        total_gmv=Sum('revenue'),
+                        total_orders=Sum('orders'),
+                        total_paid_orders=Sum('paid_orders'),
+                        total_items_sold=Sum('items_sold'),
+                        total_views=Sum('views'),
+                        total_contact_clicks=Sum('contact_clicks'),
+                        active_sellers=Count('id', filter=Q(views__gt=0) | Q(contact_clicks__gt=0) | Q(orders__gt=0) | Q(paid_orders__gt=0)),
+                    ))
+    }
+
+    platform_rows = []
+    day = start_day
+    while day < end_day:
+        totals = seller_totals.get(day, {})
+        platform_rows.append(PlatformDailyStats(
+            date=day,
+            gmv=totals.get('total_gmv') or Decimal('0'),
+            orders=totals.get('total_orders') or 0,
+            paid_orders=totals.get('total_paid_orders') or 0,
+            items_sold=totals.get('total_items_sold') or 0,
+            orders_by_status=dict(statuses.get(day, {})),
+            active_sellers=totals.get('active_sellers') or 0,
+            views=totals.get('total_views') or 0,
+            contact_clicks=totals.get('total_contact_clicks') or 0,
+        ))
+        day += timedelta(days=1)
+
+    PlatformDailyStats.objects.bulk_create(
+        platform_rows,
+        update_conflicts=True,
+        unique_fields=['date'],
+        update_fields=['gmv', 'orders', 'paid_orders', 'items_sold', 'orders_by_status', 'active_sellers',
+                       'views', 'contact_clicks', 'updated_at'],
+    )
+
+    category_rows = [
+        CategoryDailyStats(category_id=category_id, date=day, **values)
+        for (category_id, day), values in compute_category_metrics(start, end).items()
+    ]
+    CategoryDailyStats.objects.filter(date__gte=start_day, date__lt=end_day).delete()
+    CategoryDailyStats.objects.bulk_create(category_rows, batch_size=1000)
+
+
+def run_daily_rollups(now=None):
+    """
+    Incremental job: roll up everything written since the watermark.
+    Returns the number of (seller, day) rows rewritten.
+    """
+    now = now or timezone.now()
+
+    with transaction.atomic():
+        watermark, _ = RollupWatermark.objects.select_for_update().get_or_create(
+            name=SELLER_STATS_WATERMARK,
+            defaults={'processed_until': now - INITIAL_LOOKBACK},
+        )
+
+        pairs = touched_seller_days(watermark.processed_until - ROLLUP_OVERLAP, now)
+        written = recompute_seller_days(pairs)
+
+        for day in sorted({day for _, day in pairs}):
+            recompute_platform_days(day, day + timedelta(days=1))
+
+        watermark.processed_until = now
+        watermark.save(update_fields=['processed_until', 'updated_at'])
+
+    logger.info("Daily rollups: %s seller-days rewritten up to %s", written, now)
+    return written
+
+
+def backfill_daily_stats(start_day, end_day):
+    """
+    Rebuild every seller, platform and category day in [start_day, end_day)
+    from the source tables. Returns the number of seller-days written.
+    """
+    start, end = day_bounds(start_day, end_day)
+    metrics = compute_day_metrics(start, end)
+
+    with transaction.atomic():
+        SellerDailyStats.objects.filter(date__gte=start_day, date__lt=end_day).delete()
+        written = upsert_seller_days(metrics)
+        recompute_platform_days(start_day, end_day)
+
+    return written
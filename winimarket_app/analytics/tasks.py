@@ -0,0 +1,26 @@
+import logging
+
+from .rollups import run_daily_rollups
+
+logger = logging.getLogger(__name__)
+
+try:
+    from celery import shared_task
+except ImportError:
+    shared_task = None  # Celery not installed or not used in prod
+
+
+def _rollup_daily_stats_task():
+    return run_daily_rollups()
+
+if shared_task:
+    @shared_task(bind=True, max_retries=3)
+    def rollup_daily_stats_task(self, **kwargs):
+        try:
+            return _rollup_daily_stats_task(**kwargs)
+        except Exception as exc:
+            logger.exception("Seller stats rollup failed")
+            raise self.retry(exc=exc, countdown=60)
+else:
+    def rollup_daily_stats_task(**kwargs):
+        return _rollup_daily_stats_task(**kwargs)
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'analytics'
+
+urlpatterns = [
+    path('api/seller/stats/', views.seller_stats_timeseries, name='seller-stats'),
+    path('dashboard/', views.platform_dashboard, name='platform-dashboard'),
+]
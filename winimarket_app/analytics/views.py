@@ -0,0 +1,138 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db.models import Sum
+from django.shortcuts import render
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .models import CategoryDailyStats, PlatformDailyStats, RollupWatermark, SellerDailyStats
+from .rollups import METRICS, SELLER_STATS_WATERMARK
+
+DEFAULT_STATS_DAYS = 30
+MAX_STATS_DAYS = 366
+
+
+def _parse_range(params):
+    """
+    ?start=YYYY-MM-DD&end=YYYY-MM-DD (inclusive), last 30 days by default.
+    """
+    end = params.get('end')
+    start = params.get('start')
+
+    end = date.fromisoformat(end) if end else timezone.localdate()
+    start = date.fromisoformat(start) if start else end - timedelta(days=DEFAULT_STATS_DAYS - 1)
+
+    if start > end:
+        raise ValueError("start must be on or before end")
+    if (end - start).days >= MAX_STATS_DAYS:
+        raise ValueError(f"The range cannot be longer than {MAX_STATS_DAYS} days")
+    return start, end
+
+
+def _format_metrics(values):
+    return {
+        **{metric: values[metric] for metric in METRICS if metric != 'revenue'},
+        'revenue': f"{values['revenue']:.2f}",
+    }
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def seller_stats_timeseries(request):
+    """
+    Daily views, contact clicks, orders and revenue for the seller, read
+    from the SellerDailyStats rollup only. Days without activity are zero.
+    """
+    seller = request.user.profile.seller_profile
+
+    try:
+        start, end = _parse_range(request.query_params)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    rows = {
+        row['date']: row
+        for row in SellerDailyStats.objects.filter(seller=seller, date__gte=start, date__lte=end).values('date', *METRICS)
+    }
+
+    zero = {metric: 0 for metric in METRICS}
+    zero['revenue'] = Decimal('0')
+    totals = dict(zero)
+
+    series = []
+    day = start
+    while day <= end:
+        values = rows.get(day, zero)
+        for metric in METRICS:
+            totals[metric] += values[metric]
+        series.append({'date': day.isoformat(), **_format_metrics(values)})
+        day += timedelta(days=1)
+
+    return Response(
+        {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "series": series,
+            "totals": _format_metrics(totals),
+        },
+        status=status.HTTP_200_OK
+    )
+
+
+def _ratio(numerator, denominator):
+    return round(numerator * 100 / denominator, 1) if denominator else 0
+
+
+@staff_member_required
+def platform_dashboard(request):
+    """
+    Staff analytics page. Reads only the daily rollups, so it costs a few
+    small queries whatever the size of the order and view tables.
+    """
+    try:
+        start, end = _parse_range(request.GET)
+    except ValueError:
+        start, end = _parse_range({})
+
+    days = list(
+        PlatformDailyStats.objects.filter(date__gte=start, date__lte=end)
+        .values('date', 'gmv', 'orders', 'paid_orders', 'items_sold', 'orders_by_status', 'active_sellers', 'views', 'contact_clicks')
+    )
+
+    totals = {field: sum(day[field] for day in days) for field in ('gmv', 'orders', 'paid_orders', 'items_sold', 'views', 'contact_clicks')}
+    totals['peak_active_sellers'] = max((day['active_sellers'] for day in days), default=0)
+
+    orders_by_status = {}
+    for day in days:
+        for order_status, count in day['orders_by_status'].items():
+            orders_by_status[order_status] = orders_by_status.get(order_status, 0) + count
+
+    top_categories = (
+        CategoryDailyStats.objects.filter(date__gte=start, date__lte=end)
+        .values('category__name')
+        .annotate(views=Sum('views'), contact_clicks=Sum('contact_clicks'), orders=Sum('orders'),
+                  items_sold=Sum('items_sold'), gmv=Sum('gmv'))
+        .order_by('-gmv', '-views')[:10]
+    )
+
+    watermark = RollupWatermark.objects.filter(name=SELLER_STATS_WATERMARK).first()
+
+    context = {
+        'title': 'Platform analytics',
+        'start': start,
+        'end': end,
+        'days': list(reversed(days)),
+        'totals': totals,
+        'orders_by_status': sorted(orders_by_status.items(), key=lambda item: -item[1]),
+        'view_to_click': _ratio(totals['contact_clicks'], totals['views']),
+        'click_to_order': _ratio(totals['orders'], totals['contact_clicks']),
+        'order_to_paid': _ratio(totals['paid_orders'], totals['orders']),
+        'top_categories': top_categories,
+        'updated_until': watermark.processed_until if watermark else None,
+    }
+    return render(request, 'analytics/platform_dashboard.html', context)
@@ -0,0 +1,65 @@
+from products.models import ProductImage
+from registration.fast_serializers import file_url, format_datetime, format_decimal, profile_values, serialize_profile
+from registration.models import Profile
+
+from .models import CartItem
+
+# -----------------------------
+# Fast read path for CartSerializer
+# -----------------------------
+
+ITEM_VALUES = (
+    'id', 'product_id', 'product__name', 'product__slug', 'product__seller__store_name', 'product__price',
+    'product__is_active', 'quantity', 'choice_price', 'added_at',
+)
+
+
+def serialize_cart(cart, request):
+    """
+    Same output as CartSerializer(cart). Runs three queries whatever the
+    number of items.
+    """
+    buyer = Profile.objects.filter(pk=cart.buyer_id).values(*profile_values()).get()
+    items = list(CartItem.objects.filter(cart=cart).values(*ITEM_VALUES))
+
+    # Newest primary image per product, like CartProductMiniSerializer.get_primary_image
+    primary_images = {}
+    for row in (ProductImage.objects
+                .filter(product_id__in=[item['product_id'] for item in items], is_primary=True)
+                .values('product_id', 'image')):
+        primary_images.setdefault(row['product_id'], row['image'])
+
+    serialized_items = []
+    total_items, total_price = 0, 0
+    for item in items:
+        subtotal = item['quantity'] * item['choice_price'] if item['choice_price'] is not None else 0
+        total_items += item['quantity']
+        total_price += subtotal
+
+        serialized_items.append({
+            'id': str(item['id']),
+            'product': {
+                'id': str(item['product_id']),
+                'name': item['product__name'],
+                'slug': item['product__slug'],
+                'seller_name': item['product__seller__store_name'],
+                'primary_image': file_url(primary_images.get(item['product_id']), request),
+                'price': format_decimal(item['product__price']),
+                'is_active': item['product__is_active'],
+            },
+            'quantity': item['quantity'],
+            'choice_price': format_decimal(item['choice_price']),
+            'subtotal': format_decimal(subtotal),
+            'added_at': format_datetime(item['added_at']),
+        })
+
+    return {
+        'id': str(cart.id),
+        'buyer': serialize_profile(buyer, request),
+        'status': cart.status,
+        'updated_at': format_datetime(cart.updated_at),
+        'created_at': format_datetime(cart.created_at),
+        'items': serialized_items,
+        'total_items': total_items,
+        'total_price': format_decimal(total_price),
+    }
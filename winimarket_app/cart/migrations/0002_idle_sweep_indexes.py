@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 18:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0001_initial'),
+        ('registration', '0006_alter_sellerprofile_store_name'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cart',
+            index=models.Index(fields=['status', 'updated_at'], name='cart_cart_status_39ba2f_idx'),
+        ),
+    ]
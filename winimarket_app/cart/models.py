@@ -19,7 +19,10 @@ class Cart(models.Model):
 
     class Meta:
         ordering = ['-created_at']
-        indexes = [models.Index(fields=['status'])]
+        indexes = [
+            models.Index(fields=['status']),
+            models.Index(fields=['status', 'updated_at']),  # Idle cart sweep
+        ]
 
     def __str__(self):
         return f"Cart {self.id} for {self.buyer.user.email} - Status: {self.status}"
@@ -31,6 +34,27 @@ class Cart(models.Model):
     @property
     def total_price(self):
         return sum(item.subtotal for item in self.items.all())
+
+
+def get_active_cart(buyer):
+    """
+    The buyer's cart, created on first use. A cart the sweeper marked
+    abandoned (or an old checked out one) is reopened with its items, since
+    a buyer only ever has the one cart.
+    """
+    cart, _ = Cart.objects.get_or_create(buyer=buyer)
+    if cart.status != 'active':
+        cart.status = 'active'
+        cart.save(update_fields=['status', 'updated_at'])
+    return cart
+
+
+def touch_cart(cart_id):
+    """
+    Record activity on a cart. Changing or removing an item does not write
+    the Cart row, and the idle cart sweeper goes by Cart.updated_at.
+    """
+    Cart.objects.filter(pk=cart_id).update(updated_at=timezone.now())
     
 class CartItem(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
@@ -1,7 +1,7 @@
 from rest_framework import serializers
 from .models import Cart, CartItem
 from products.serializers import ProductSerializer
-from registration.serializers import ProfileSerializer
+from registration.serializers import ProfileSerializer, SparseFieldsMixin
 from products.models import Product
 
 class CartProductMiniSerializer(serializers.ModelSerializer):
@@ -34,7 +34,7 @@ class CartItemSerializer(serializers.ModelSerializer):
         fields = ['id', 'product', 'quantity', 'choice_price', 'subtotal', 'added_at']
         read_only_fields = ['choice_price', 'subtotal']
 
-class CartSerializer(serializers.ModelSerializer):
+class CartSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     items = CartItemSerializer(many=True, read_only=True)
     total_items = serializers.IntegerField(read_only=True)
     total_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
@@ -44,6 +44,7 @@ class CartSerializer(serializers.ModelSerializer):
         model = Cart
         fields = ['id', 'buyer', 'status', 'updated_at', 'created_at', 'items', 'total_items', 'total_price']
         read_only_fields = ['id', 'buyer', 'created_at']  # Ensure these fields are read-only
+        expandable_fields = ['buyer', 'items']
 
     def create(self, validated_data):
         buyer = self.context['request'].user.profile
@@ -0,0 +1,38 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import Cart, CartItem
+
+logger = logging.getLogger(__name__)
+
+ABANDON_BATCH_SIZE = 1000
+
+def abandon_idle_carts(now=None, days=None, batch_size=ABANDON_BATCH_SIZE):
+    """
+    Mark active carts abandoned once neither the cart nor any of its items
+    has changed for `days`. One short UPDATE per batch; the items are kept,
+    so the buyer finds them again when the cart is reopened.
+    """
+    now = now or timezone.now()
+    days = days if days is not None else getattr(settings, 'CART_ABANDON_DAYS', 14)
+    cutoff = now - timedelta(days=days)
+
+    idle = Cart.objects.filter(status='active', updated_at__lt=cutoff).exclude(
+        Exists(CartItem.objects.filter(cart=OuterRef('pk'), added_at__gte=cutoff))
+    )
+
+    abandoned = 0
+    while True:
+        ids = list(idle.order_by().values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+        # Re-check the status so a cart reopened in the meantime stays active
+        abandoned += Cart.objects.filter(id__in=ids, status='active').update(status='abandoned', updated_at=now)
+
+    if abandoned:
+        logger.info("Marked %s idle cart(s) abandoned", abandoned)
+    return abandoned
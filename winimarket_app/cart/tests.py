@@ -1,3 +1,67 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from winimarket_app.renderers import ORJSONRenderer
+from winimarket_app.testing import api_request, make_products, make_user
+
+from .fast_serializers import serialize_cart
+from .models import Cart, CartItem
+from .serializers import CartSerializer
+from .tasks import abandon_idle_carts
+from .views import remove_from_cart, update_cart_item
+
+
+class FastCartSerializerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.buyer = make_user()
+        cls.cart = Cart.objects.create(buyer=cls.buyer.profile)
+        products = make_products(make_user('seller'), 3) + make_products(make_user('seller'), 2, price='4.50')
+        CartItem.objects.bulk_create([
+            CartItem(cart=cls.cart, product=product, quantity=index + 1, choice_price=product.price)
+            for index, product in enumerate(products)
+        ])
+
+    def test_matches_cart_serializer(self):
+        request = api_request(self.buyer)
+        expected = CartSerializer(self.cart, context={'request': request}).data
+        renderer = ORJSONRenderer()
+        self.assertEqual(renderer.render(serialize_cart(self.cart, request)), renderer.render(expected))
+
+    def test_runs_three_queries(self):
+        with self.assertNumQueries(3):
+            serialize_cart(self.cart, api_request(self.buyer))
+
+
+class IdleCartActivityTests(TestCase):
+    def setUp(self):
+        self.buyer = make_user()
+        self.cart = Cart.objects.create(buyer=self.buyer.profile)
+        self.items = CartItem.objects.bulk_create([
+            CartItem(cart=self.cart, product=product, quantity=1, choice_price=product.price)
+            for product in make_products(make_user('seller'), 2)
+        ])
+        # Cart and items untouched for three weeks
+        weeks_ago = timezone.now() - timedelta(days=21)
+        Cart.objects.filter(pk=self.cart.pk).update(updated_at=weeks_ago)
+        CartItem.objects.filter(cart=self.cart).update(added_at=weeks_ago)
+
+    def call(self, view, method, data=None):
+        request = getattr(APIRequestFactory(), method)('/cart/api/', data, format='json')
+        force_authenticate(request, user=self.buyer)
+        response = view(request, cart_item_id=self.items[0].id)
+        self.assertEqual(response.status_code, 200, response.data)
+
+    def test_untouched_cart_is_abandoned(self):
+        self.assertEqual(abandon_idle_carts(days=14), 1)
+
+    def test_changing_a_quantity_keeps_the_cart_active(self):
+        self.call(update_cart_item, 'patch', {'quantity': 3})
+        self.assertEqual(abandon_idle_carts(days=14), 0)
 
-# Create your tests here.
+    def test_removing_an_item_keeps_the_cart_active(self):
+        self.call(remove_from_cart, 'delete')
+        self.assertEqual(abandon_idle_carts(days=14), 0)
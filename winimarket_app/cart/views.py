@@ -13,8 +13,10 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from .models import Cart, CartItem
+from .models import Cart, CartItem, get_active_cart, touch_cart
 from .serializers import CartSerializer, CartItemSerializer
+from .fast_serializers import serialize_cart
+from registration.fast_serializers import uses_sparse_fields
 from products.models import Product
 from decimal import Decimal
 from django.db import transaction
@@ -26,7 +28,10 @@ def cart_view(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def view_cart(request):
-    cart, _ = Cart.objects.get_or_create(buyer=request.user.profile, status='active')
+    cart = get_active_cart(request.user.profile)
+
+    if not uses_sparse_fields(request):
+        return Response(serialize_cart(cart, request), status=status.HTTP_200_OK)
 
     serializers = CartSerializer(cart, context={'request': request})
     return Response(serializers.data, status=status.HTTP_200_OK)
@@ -70,10 +75,7 @@ def add_to_cart(request):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            cart, _ = Cart.objects.get_or_create(
-                buyer=request.user.profile,
-                status='active'
-            )
+            cart = get_active_cart(request.user.profile)
 
             cart_item, created = CartItem.objects.get_or_create(
                 cart=cart,
@@ -96,6 +98,7 @@ def add_to_cart(request):
                 cart_item.quantity = new_quantity
                 cart_item.choice_price = choice_price
                 cart_item.save()
+                touch_cart(cart.id)
 
         serializer = CartItemSerializer(cart_item, context={'request': request})
         return Response(
@@ -140,6 +143,7 @@ def update_cart_item(request, cart_item_id):
     
     cart_item.quantity = quantity
     cart_item.save()
+    touch_cart(cart_item.cart_id)
 
     serializer = CartItemSerializer(cart_item, context={'request': request})
     return Response(serializer.data, status=status.HTTP_200_OK)
@@ -147,7 +151,7 @@ def update_cart_item(request, cart_item_id):
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
 def remove_from_cart(request, cart_item_id):
-    cart= Cart.objects.get(buyer=request.user.profile, status='active')
+    cart = get_active_cart(request.user.profile)
 
     try:
         cart_item = CartItem.objects.get(id=cart_item_id, cart=cart)
@@ -155,6 +159,10 @@ def remove_from_cart(request, cart_item_id):
         return Response({"error": "Cart item not found"}, status=status.HTTP_404_NOT_FOUND)
     
     cart_item.delete()
+    touch_cart(cart.id)
+
+    if not uses_sparse_fields(request):
+        return Response(serialize_cart(cart, request), status=status.HTTP_200_OK)
 
     serializer = CartSerializer(cart, context={'request': request})
     return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
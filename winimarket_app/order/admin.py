@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Order, OrderItem, ShippingAddress, OrderEmailLog, PushSubscription  
+from .models import (
+    ArchivedOrder, ArchivedOrderItem, Order, OrderItem, ShippingAddress, OrderEmailLog, PushSubscription, StockReservation
+)
 
 # ---------------------------
 # SIMPLIFIED SHIPPING ADDRESS INLINE
@@ -29,7 +31,7 @@ class OrderAdmin(admin.ModelAdmin):
         'seller',
         'status',
         'track_status',
-        'total_cost',
+        'total',
         'created_at',
         'paid_at',
     )
@@ -54,7 +56,8 @@ class OrderAdmin(admin.ModelAdmin):
         'updated_at',
         'paid_at',
         'cancelled_at',
-        'total_cost',
+        'subtotal',
+        'total',
     )
 
     fieldsets = (
@@ -65,7 +68,7 @@ class OrderAdmin(admin.ModelAdmin):
             "fields": ("shipping_address",)
         }),
         ("Payment", {
-            "fields": ("paid_at", "total_cost"),
+            "fields": ("paid_at", "subtotal", "total"),
         }),
         ("Timestamps", {
             "fields": ("created_at", "updated_at", "cancelled_at"),
@@ -102,6 +105,36 @@ class OrderItemAdmin(admin.ModelAdmin):
 
     ordering = ('-order__created_at',)
 
+# ---------------------------
+# ARCHIVED ORDER ADMIN (read only)
+# ---------------------------
+class ArchivedOrderItemInline(admin.TabularInline):
+    model = ArchivedOrderItem
+    extra = 0
+    readonly_fields = ('product', 'quantity', 'price')
+    can_delete = False
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    list_display = ('id', 'buyer', 'seller', 'status', 'total', 'created_at', 'archived_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('id', 'buyer__user__email')
+    ordering = ('-created_at',)
+    inlines = [ArchivedOrderItemInline]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    list_display = ("order", "product", "quantity", "status", "expires_at", "created_at")
+    list_filter = ("status",)
+    search_fields = ("order__id", "product__name")
+    readonly_fields = ("order", "product", "quantity", "status", "expires_at", "created_at", "updated_at")
+
 @admin.register(OrderEmailLog)
 class OrderEmailLogAdmin(admin.ModelAdmin):
     list_display = (
@@ -3,4 +3,7 @@ from django.db.utils import OperationalError, ProgrammingError
 
 class OrderConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'order'
\ No newline at end of file
+    name = 'order'
+
+    def ready(self):
+        import order.signals  # noqa
\ No newline at end of file
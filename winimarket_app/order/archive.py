@@ -0,0 +1,126 @@
+import logging
+from calendar import monthrange
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from registration.models import ArchivedSellerNotificationLog, SellerNotificationLog
+
+from .models import (
+    ArchivedOrder,
+    ArchivedOrderEmailLog,
+    ArchivedOrderItem,
+    Order,
+    OrderEmailLog,
+    OrderItem,
+    OrderStatus,
+    Payment,
+)
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# Cold storage
+# -----------------------------
+# Orders that finished (completed or cancelled) more than ARCHIVE_AFTER_MONTHS
+# ago are copied to the Archived* tables and deleted from the hot ones, one
+# batch per transaction. Terminal orders do not change any more, so their
+# updated_at is when they finished. The buyer order list and detail fall
+# back to the archive, see order.views.
+
+ARCHIVE_BATCH_SIZE = 500
+ARCHIVABLE_STATUSES = [OrderStatus.COMPLETED, OrderStatus.CANCELLED]
+
+
+def months_ago(now, months):
+    month_index = now.year * 12 + now.month - 1 - months
+    year, month = divmod(month_index, 12)
+    return now.replace(year=year, month=month + 1, day=min(now.day, monthrange(year, month + 1)[1]))
+
+
+def _field_names(model, exclude=()):
+    return [field.attname for field in model._meta.concrete_fields if field.attname not in exclude]
+
+
+def _copy(source, target, exclude=('archived_at',)):
+    """
+    Insert a copy of every row of `source` into the `target` model.
+    """
+    fields = _field_names(target, exclude)
+    rows = source.order_by().values(*fields)
+    return len(target.objects.bulk_create([target(**row) for row in rows]))
+
+
+def _archive_order_batch(cutoff, batch_size):
+    with transaction.atomic():
+        order_ids = list(
+            Order.objects.filter(status__in=ARCHIVABLE_STATUSES, updated_at__lt=cutoff)
+            .select_for_update(skip_locked=True)
+            .order_by()
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not order_ids:
+            return 0, 0
+
+        _copy(Order.objects.filter(id__in=order_ids), ArchivedOrder)
+        items = _copy(OrderItem.objects.filter(order_id__in=order_ids), ArchivedOrderItem)
+        _copy(OrderEmailLog.objects.filter(order_id__in=order_ids), ArchivedOrderEmailLog)
+
+        payment_links = Payment.orders.through.objects.filter(order_id__in=order_ids).values_list('payment_id', 'order_id')
+        ArchivedOrder.payments.through.objects.bulk_create([
+            ArchivedOrder.payments.through(payment_id=payment_id, archivedorder_id=order_id)
+            for payment_id, order_id in payment_links
+        ])
+
+        # Cascades to the items, email logs, reservations and payment links
+        Order.objects.filter(id__in=order_ids).delete()
+
+    return len(order_ids), items
+
+
+def _archive_notification_batch(cutoff, batch_size):
+    with transaction.atomic():
+        log_ids = list(
+            SellerNotificationLog.objects.filter(created_at__lt=cutoff)
+            .select_for_update(skip_locked=True)
+            .order_by()
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not log_ids:
+            return 0
+
+        _copy(SellerNotificationLog.objects.filter(id__in=log_ids), ArchivedSellerNotificationLog)
+        SellerNotificationLog.objects.filter(id__in=log_ids).delete()
+
+    return len(log_ids)
+
+
+def archive_old_records(now=None, months=None, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Move finished orders (with their items, email logs and payment links)
+    and seller notification logs older than `months` to the archive tables.
+    Returns the number of rows moved per kind.
+    """
+    now = now or timezone.now()
+    months = months if months is not None else getattr(settings, 'ARCHIVE_AFTER_MONTHS', 6)
+    cutoff = months_ago(now, months)
+
+    counts = {'orders': 0, 'order_items': 0, 'notification_logs': 0}
+
+    while True:
+        orders, items = _archive_order_batch(cutoff, batch_size)
+        if not orders:
+            break
+        counts['orders'] += orders
+        counts['order_items'] += items
+
+    while True:
+        logs = _archive_notification_batch(cutoff, batch_size)
+        if not logs:
+            break
+        counts['notification_logs'] += logs
+
+    if any(counts.values()):
+        logger.info("Archived %(orders)s order(s), %(order_items)s item(s), %(notification_logs)s notification log(s)", counts)
+    return counts
@@ -0,0 +1,71 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Order, OrderItem, OrderStatus, OrderTrackingStatus
+from .reservations import reserve_stock
+
+# -----------------------------
+# Set-based checkout
+# -----------------------------
+# The cart is turned into one pending order per seller with a fixed number
+# of queries whatever the cart size:
+#   1. read the cart lines (product, seller, price, quantity)
+#   2. insert the missing pending orders, ignoring the ones that already exist
+#      (one_pending_order_per_buyer_seller makes this safe under concurrency)
+#   3. lock and read back the pending orders for those sellers
+#   4. point them at the shipping address
+#   5. replace their items with a single bulk_create
+#   6. swap their stock reservations for the new items (one conditional UPDATE
+#      on Product.quantity, see order/reservations.py)
+# OrderItemQuerySet keeps the stored totals in step through step 5.
+
+
+def cart_lines(cart):
+    return list(
+        cart.items.order_by('added_at').values_list('product_id', 'product__seller_id', 'product__price', 'quantity')
+    )
+
+
+def build_checkout_orders(buyer, address, lines):
+    """
+    Create or refresh the buyer's pending orders from cart lines
+    [(product_id, seller_id, price, quantity), ...].
+    Returns the order ids in the order sellers first appear in the cart.
+    Raises InsufficientStock, with nothing written, when the stock is short.
+    """
+    seller_ids = list(dict.fromkeys(seller_id for _, seller_id, _, _ in lines))
+
+    with transaction.atomic():
+        Order.objects.bulk_create(
+            [
+                Order(
+                    buyer=buyer,
+                    seller_id=seller_id,
+                    status=OrderStatus.PENDING,
+                    shipping_address=address,
+                    track_status=OrderTrackingStatus.PENDING,
+                )
+                for seller_id in seller_ids
+            ],
+            ignore_conflicts=True,
+        )
+
+        orders = dict(
+            Order.objects.select_for_update()
+            .filter(buyer=buyer, seller_id__in=seller_ids, status=OrderStatus.PENDING)
+            .values_list('seller_id', 'id')
+        )
+        order_ids = [orders[seller_id] for seller_id in seller_ids]
+
+        Order.objects.filter(id__in=order_ids).update(shipping_address=address, updated_at=timezone.now())
+
+        # Remove old items to prevent duplicates, then re-add the cart lines
+        OrderItem.objects.filter(order_id__in=order_ids).delete()
+        OrderItem.objects.bulk_create([
+            OrderItem(order_id=orders[seller_id], product_id=product_id, quantity=quantity, price=price)
+            for product_id, seller_id, price, quantity in lines
+        ])
+
+        reserve_stock(order_ids)
+
+    return order_ids
@@ -34,36 +34,70 @@ class OrderEmailDispatcher:
                 )
 
     @staticmethod
-    def _send_email(*, order, event, role, recipient, config):
+    def dispatch_many(orders, event: str):
         """
-        Create OrderEmailLog and enqueue Celery task
+        Dispatch emails for an event on many orders at once: recipients come
+        from one query, and after commit the already-sent check and the
+        email logs are one query each for the whole batch.
         """
 
-        if OrderEmailLog.objects.filter(event=event, order=order, recipient_email=recipient['email'], status="sent").exists():
+        routes = ORDER_EMAIL_ROUTING.get(event)
+
+        if not routes:
             return
-        
-        email_log = OrderEmailLog.objects.create(
-            order=order,
-            event=event,
-            recipient_role=role,
-            recipient_email=recipient["email"],
-            subject=config["subject"],
+
+        orders = list(orders.select_related('buyer__user', 'seller__profile__user'))
+
+        transaction.on_commit(
+            lambda: OrderEmailDispatcher._send_many(orders=orders, event=event, routes=routes)
         )
 
-        user_id = recipient.get("user_id")
+    @staticmethod
+    def _send_many(*, orders, event, routes):
+        already_sent = set(
+            OrderEmailLog.objects.filter(order__in=orders, event=event, status="sent")
+            .values_list("order_id", "recipient_email")
+        )
 
-        if not user_id:
-            return 
+        email_logs, queued = [], []
+        for order in orders:
+            for role, config in routes.items():
+                for recipient in resolve_recipient(order, role):
+                    OrderEmailDispatcher._send_push(order=order, event=event, role=role, recipient=recipient)
+
+                    if (order.id, recipient["email"]) in already_sent:
+                        continue
+
+                    email_log = OrderEmailLog(
+                        order=order,
+                        event=event,
+                        recipient_role=role,
+                        recipient_email=recipient["email"],
+                        subject=config["subject"],
+                    )
+                    email_logs.append(email_log)
+
+                    if recipient.get("user_id"):
+                        queued.append((email_log, order, recipient, config))
+
+        OrderEmailLog.objects.bulk_create(email_logs)
 
+        for email_log, order, recipient, config in queued:
+            queue_email_task(**OrderEmailDispatcher._email_payload(
+                email_log=email_log, order=order, event=event, recipient=recipient, config=config
+            ))
+
+    @staticmethod
+    def _email_payload(*, email_log, order, event, recipient, config):
         context = {
             "order_id": str(order.id),
-            "user_id": str(user_id),
+            "user_id": str(recipient["user_id"]),
             "cta_url": config["cta"].format(order_id=order.id),
             "site_url": settings.SITE_URL,
             "event": event,
         }
 
-        payload = {
+        return {
             "email_log_id": str(email_log.id),
             "to_email": recipient["email"],
             "subject": config["subject"],
@@ -71,7 +105,29 @@ class OrderEmailDispatcher:
             "context": context
         }
 
-        queue_email_task(**payload)
+    @staticmethod
+    def _send_email(*, order, event, role, recipient, config):
+        """
+        Create OrderEmailLog and enqueue Celery task
+        """
+
+        if OrderEmailLog.objects.filter(event=event, order=order, recipient_email=recipient['email'], status="sent").exists():
+            return
+        
+        email_log = OrderEmailLog.objects.create(
+            order=order,
+            event=event,
+            recipient_role=role,
+            recipient_email=recipient["email"],
+            subject=config["subject"],
+        )
+
+        if not recipient.get("user_id"):
+            return 
+
+        queue_email_task(**OrderEmailDispatcher._email_payload(
+            email_log=email_log, order=order, event=event, recipient=recipient, config=config
+        ))
 
     @staticmethod
     def _send_push(*, order, event, role, recipient):
@@ -1,18 +1,18 @@
-import logging
 import json
+import logging
+import uuid
+from datetime import date, datetime
 from decimal import Decimal
-from google.cloud import tasks_v2
+
 from django.conf import settings
 from google.api_core.exceptions import AlreadyExists
-import json
-import uuid
-from datetime import datetime, date
+from google.cloud import tasks_v2
 
 logger = logging.getLogger(__name__)
 
 
 def safe_json_dumps(data):
-    
+
     def default(o):
         if isinstance(o, uuid.UUID):
             return str(o)
@@ -24,7 +24,12 @@ def safe_json_dumps(data):
 
     return json.dumps(data, default=default)
 
-def enqueue_order_email(**payload):
+
+def enqueue_task(task_name, payload, task_id=None):
+    """
+    Enqueue any task routed by view_cloudtask.cloud_task_handler.
+    Pass a stable task_id to let Cloud Tasks drop duplicate enqueues.
+    """
     client = tasks_v2.CloudTasksClient()
 
     parent = client.queue_path(
@@ -34,11 +39,11 @@ def enqueue_order_email(**payload):
     )
 
     body = safe_json_dumps({
-        "task": "send_email_task",
+        "task": task_name,
         "payload": payload
     }).encode()
 
-    task_id = f"order-email-{payload.get('email_log_id')}"
+    task_id = task_id or f"{task_name.replace('_', '-')}-{uuid.uuid4()}"
 
     task = {
         "name": client.task_path(
@@ -47,7 +52,6 @@ def enqueue_order_email(**payload):
             settings.CLOUD_TASKS_QUEUE_NAME,
             task_id
         ),
-
         "http_request": {
             "http_method": tasks_v2.HttpMethod.POST,
             "url": settings.CLOUD_TASKS_HANDLER_URL,
@@ -62,100 +66,24 @@ def enqueue_order_email(**payload):
 
     try:
         response = client.create_task(request={"parent": parent, "task": task})
-        logger.info("✅ Cloud Task created: %s", response.name)
+        logger.info("✅ Cloud Task %s created: %s", task_name, response.name)
         return response
     except AlreadyExists:
-        logger.warning("⚠️ Task already exists, skipping duplicate enqueue.")
+        logger.warning("⚠️ Task %s already exists, skipping duplicate enqueue.", task_id)
     except Exception as e:
-        logger.exception("❌ Failed to enqueue Cloud Task: %s", e)
+        logger.exception("❌ Failed to enqueue %s Cloud Task: %s", task_name, e)
         raise
 
-def enqueue_push_notification(**payload):
-    client = tasks_v2.CloudTasksClient()
 
-    parent = client.queue_path(
-        settings.GCP_PROJECT_ID,
-        settings.GCP_REGION,
-        settings.CLOUD_TASKS_QUEUE_NAME
-    )
+def enqueue_order_email(**payload):
+    return enqueue_task("send_email_task", payload, task_id=f"order-email-{payload.get('email_log_id')}")
 
-    body = safe_json_dumps({
-        "task": "send_push_task",
-        "payload": payload
-    }).encode()
-    
-    task_id = f"order-push-{payload.get('user_id')}-{uuid.uuid4()}"
 
-    task = {
-        "name": client.task_path(
-            settings.GCP_PROJECT_ID,
-            settings.GCP_REGION,
-            settings.CLOUD_TASKS_QUEUE_NAME,
-            task_id
-        ),
-        "http_request": {
-            "http_method": tasks_v2.HttpMethod.POST,
-            "url": settings.CLOUD_TASKS_HANDLER_URL,
-            "headers": {"Content-Type": "application/json"},
-            "body": body,
-            "oidc_token": {
-                "service_account_email": settings.CLOUD_TASKS_SERVICE_ACCOUNT,
-                "audience": settings.CLOUD_TASKS_AUDIENCE,
-            },
-        }
-    }
+def enqueue_push_notification(**payload):
+    return enqueue_task("send_push_task", payload, task_id=f"order-push-{payload.get('user_id')}-{uuid.uuid4()}")
 
-    try:
-        response = client.create_task(request={"parent": parent, "task": task})
-        logger.info("✅ Push Cloud Task created: %s", response.name)
-        return response
-    except AlreadyExists:
-        logger.warning("⚠️ Push task already exists, skipping duplicate enqueue.")
-    except Exception as e:
-        logger.exception("❌ Failed to enqueue push Cloud Task: %s", e)
-        raise
 
 def enqueue_seller_email_task(**payload):
-    client = tasks_v2.CloudTasksClient()
-
-    parent = client.queue_path(
-        settings.GCP_PROJECT_ID,
-        settings.GCP_REGION,
-        settings.CLOUD_TASKS_QUEUE_NAME
+    return enqueue_task(
+        "send_seller_email_task", payload, task_id=f"seller-email-{payload.get('notification_log_id')}"
     )
-
-    body = safe_json_dumps({
-        "task": "send_seller_email_task",
-        "payload": payload
-    }).encode()
-
-    task_id = f"seller-email-{payload.get('notification_log_id')}"
-
-    task = {
-        "name": client.task_path(
-            settings.GCP_PROJECT_ID,
-            settings.GCP_REGION,
-            settings.CLOUD_TASKS_QUEUE_NAME,
-            task_id
-        ),
-        "http_request": {
-            "http_method": tasks_v2.HttpMethod.POST,
-            "url": settings.CLOUD_TASKS_HANDLER_URL,
-            "headers": {"Content-Type": "application/json"},
-            "body": body,
-            "oidc_token": {
-                "service_account_email": settings.CLOUD_TASKS_SERVICE_ACCOUNT,
-                "audience": settings.CLOUD_TASKS_AUDIENCE,
-            },
-        }
-    }
-
-    try:
-        response = client.create_task(request={"parent": parent, "task": task})
-        logger.info("✅ Seller Email Cloud Task created: %s", response.name)
-        return response
-    except AlreadyExists:
-        logger.warning("⚠️ Seller email task already exists, skipping duplicate enqueue.")
-    except Exception as e:
-        logger.exception("❌ Failed to enqueue seller email Cloud Task: %s", e)
-        raise
\ No newline at end of file
@@ -10,6 +10,8 @@ from .tasks import (
     _send_seller_email_task,
     _send_push_task,
 )
+from products.tasks import _fetch_product_image_task, _process_product_import_task
+from payment.tasks import _process_paystack_events_task, _verify_payment_task
 
 
 @csrf_exempt
@@ -93,6 +95,43 @@ def cloud_task_handler(request):
             except Exception as e:
                 logger.exception("Push task failed: %s", e)
                 raise
+
+        elif task == "process_product_import_task":
+            logger.info("Executing product import job_id=%s", payload.get("job_id"))
+
+            try:
+                _process_product_import_task(**payload)
+            except Exception as e:
+                logger.exception("Product import task failed: %s", e)
+                raise
+
+        elif task == "fetch_product_image_task":
+            logger.info("Fetching product image for product_id=%s", payload.get("product_id"))
+
+            try:
+                _fetch_product_image_task(**payload)
+            except Exception as e:
+                logger.exception("Product image task failed: %s", e)
+                raise
+
+        elif task == "verify_payment_task":
+            logger.info("Verifying payment reference=%s", payload.get("reference"))
+
+            try:
+                _verify_payment_task(**payload)
+            except Exception as e:
+                # PaystackPending included: the 500 makes Cloud Tasks retry later
+                logger.exception("Payment verification task failed: %s", e)
+                raise
+
+        elif task == "process_paystack_events_task":
+            logger.info("Applying stored Paystack events")
+
+            try:
+                _process_paystack_events_task(**payload)
+            except Exception as e:
+                logger.exception("Paystack event task failed: %s", e)
+                raise
         else:
             return HttpResponseBadRequest(f"Unknown task: {task}")
 
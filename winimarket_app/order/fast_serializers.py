@@ -0,0 +1,98 @@
+from collections import defaultdict
+
+from products.models import ProductImage
+from registration.fast_serializers import file_url, format_datetime, format_decimal, profile_values, serialize_profile
+
+from .models import OrderItem
+
+# -----------------------------
+# Fast read path for OrderSerializer
+# -----------------------------
+
+SHIPPING_ADDRESS_FIELDS = (
+    'id', 'state_region', 'city', 'country', 'campus', 'campus_area', 'hall_or_hostel', 'landmark', 'phonenumber',
+)
+
+ORDER_VALUES = (
+    'id', 'status', 'track_status', 'is_escrow_released', 'created_at', 'updated_at', 'paid_at', 'cancelled_at',
+    'total', 'shipping_address_id', 'seller__store_name',
+) + profile_values('buyer__') + tuple(f'shipping_address__{name}' for name in SHIPPING_ADDRESS_FIELDS[1:])
+
+ITEM_VALUES = ('id', 'order_id', 'product_id', 'product__name', 'quantity', 'price')
+
+
+def _product_image_urls(product_ids):
+    """
+    Primary image (else the newest one) per product, as relative URLs like
+    OrderItemSerializer.get_product_image.
+    """
+    images = {}
+    rows = ProductImage.objects.filter(product_id__in=product_ids).values('product_id', 'image', 'is_primary')
+
+    # rows come newest first (ProductImage.Meta.ordering)
+    for row in rows:
+        current = images.get(row['product_id'])
+        if current is None or (row['is_primary'] and not current['is_primary']):
+            images[row['product_id']] = row
+
+    return {product_id: file_url(row['image'], None) for product_id, row in images.items()}
+
+
+def _serialize_item(row, image_urls):
+    item = {'id': str(row['id'])}
+
+    # OrderItemSerializer skips product_name once the product is deleted
+    if row['product_id'] is not None:
+        item['product_name'] = row['product__name']
+
+    item.update({
+        'product_image': image_urls.get(row['product_id']),
+        'quantity': row['quantity'],
+        'price': format_decimal(row['price']),
+        'subtotal': row['price'] * row['quantity'],
+    })
+    return item
+
+
+def serialize_orders(orders, request, item_model=OrderItem):
+    """
+    Same output as OrderSerializer(many=True) for an Order queryset.
+    Runs three queries whatever the number of orders. Archived orders are
+    serialized the same way with item_model=ArchivedOrderItem.
+    """
+    rows = list(orders.values(*ORDER_VALUES))
+    if not rows:
+        return []
+
+    items = defaultdict(list)
+    for item in item_model.objects.filter(order_id__in=[row['id'] for row in rows]).values(*ITEM_VALUES):
+        items[item['order_id']].append(item)
+
+    image_urls = _product_image_urls({item['product_id'] for order_items in items.values() for item in order_items})
+
+    data = []
+    for row in rows:
+        order_items = items[row['id']]
+
+        shipping_address = None
+        if row['shipping_address_id'] is not None:
+            shipping_address = {'id': str(row['shipping_address_id'])}
+            shipping_address.update({name: row[f'shipping_address__{name}'] for name in SHIPPING_ADDRESS_FIELDS[1:]})
+
+        data.append({
+            'id': str(row['id']),
+            'buyer': serialize_profile(row, request, prefix='buyer__'),
+            'seller': row['seller__store_name'],
+            'shipping_address': shipping_address,
+            'status': row['status'],
+            'track_status': row['track_status'],
+            'is_escrow_released': row['is_escrow_released'],
+            'created_at': format_datetime(row['created_at']),
+            'updated_at': format_datetime(row['updated_at']),
+            'paid_at': format_datetime(row['paid_at']),
+            'cancelled_at': format_datetime(row['cancelled_at']),
+            'total_cost': format_decimal(row['total']),
+            'items': [_serialize_item(item, image_urls) for item in order_items],
+        })
+
+    return data
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from order.archive import ARCHIVE_BATCH_SIZE, archive_old_records
+
+
+class Command(BaseCommand):
+    help = 'Move finished orders and notification logs older than ARCHIVE_AFTER_MONTHS to the archive tables (run nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, help='Age in months, defaults to settings.ARCHIVE_AFTER_MONTHS (6)')
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE, help='Rows moved per transaction')
+
+    def handle(self, *args, **options):
+        counts = archive_old_records(months=options['months'], batch_size=options['batch_size'])
+        for name, count in counts.items():
+            self.stdout.write(f"{name.replace('_', ' ')}: {count}")
+        self.stdout.write(self.style.SUCCESS("Archival finished."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from order.tasks import AUTO_COMPLETE_BATCH_SIZE, auto_complete_delivered_orders
+
+
+class Command(BaseCommand):
+    help = 'Complete delivered orders the buyer never confirmed and release their escrow (run daily)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Days after delivery, defaults to settings.ORDER_AUTO_COMPLETE_DAYS (7)')
+        parser.add_argument('--batch-size', type=int, default=AUTO_COMPLETE_BATCH_SIZE, help='Orders completed per transaction')
+
+    def handle(self, *args, **options):
+        result = auto_complete_delivered_orders(days=options['days'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(result))
@@ -0,0 +1,43 @@
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+
+from order.models import Order, items_subtotal, recalculate_order_totals
+
+
+class Command(BaseCommand):
+    help = 'Compare the stored order subtotal/total with the sum of the order items'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='Recalculate the orders that are out of step')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Orders recalculated per UPDATE with --fix')
+        parser.add_argument('--show', type=int, default=20, help='How many mismatched orders to list')
+
+    def handle(self, *args, **options):
+        mismatched = (
+            Order.objects.annotate(items_total=items_subtotal())
+            .filter(~Q(subtotal=F('items_total')) | ~Q(total=F('items_total')))
+            .order_by()
+        )
+
+        rows = mismatched.values_list('id', 'subtotal', 'total', 'items_total')
+        for order_id, subtotal, total, items_total in rows[:options['show']]:
+            self.stdout.write(f"{order_id}: stored subtotal {subtotal}, total {total}, items {items_total}")
+
+        order_ids = mismatched.values_list('id', flat=True).iterator(chunk_size=options['batch_size'])
+
+        if not options['fix']:
+            count = mismatched.count()
+            style = self.style.WARNING if count else self.style.SUCCESS
+            self.stdout.write(style(f"{count} order(s) with totals out of step."))
+            return
+
+        fixed = 0
+        while True:
+            batch = list(islice(order_ids, options['batch_size']))
+            if not batch:
+                break
+            fixed += recalculate_order_totals(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Recalculated {fixed} order(s)."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from order.reservations import SWEEP_BATCH_SIZE, release_expired_reservations
+
+
+class Command(BaseCommand):
+    help = 'Give back the stock held by expired reservations (run every few minutes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=SWEEP_BATCH_SIZE, help='Reservations released per transaction')
+
+    def handle(self, *args, **options):
+        released = release_expired_reservations(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Released {released} expired reservation(s)."))
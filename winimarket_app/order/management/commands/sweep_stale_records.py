@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from order.tasks import sweep_stale_records
+
+
+class Command(BaseCommand):
+    help = (
+        'Mark idle carts abandoned, cancel unpaid pending orders and release leftover stock reservations '
+        '(run every few minutes; see CART_ABANDON_DAYS and ORDER_PENDING_EXPIRY_MINUTES)'
+    )
+
+    def handle(self, *args, **options):
+        counts = sweep_stale_records()
+        for name, count in counts.items():
+            self.stdout.write(f"{name.replace('_', ' ')}: {count}")
+        self.stdout.write(self.style.SUCCESS("Sweep finished."))
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.5 on 2026-10-19 18:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0003_alter_order_track_status'),
+        ('registration', '0006_alter_sellerprofile_store_name'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['updated_at'], name='order_order_updated_910d82_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['paid_at'], name='order_order_paid_at_40554f_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.5 on 2026-10-19 18:47
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_order_totals(apps, schema_editor):
+    Order = apps.get_model('order', 'Order')
+    OrderItem = apps.get_model('order', 'OrderItem')
+
+    subtotal = (
+        OrderItem.objects.filter(order=OuterRef('pk'))
+        .order_by()
+        .values('order')
+        .annotate(subtotal=Sum(F('price') * F('quantity')))
+        .values('subtotal')
+    )
+    subtotal = Coalesce(
+        Subquery(subtotal, output_field=DecimalField(max_digits=10, decimal_places=2)),
+        Value(Decimal('0.00')),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+    Order.objects.update(subtotal=subtotal, total=subtotal)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0004_order_order_order_updated_910d82_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='total',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10),
+        ),
+        migrations.RunPython(populate_order_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-19 18:56
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_delivered_at(apps, schema_editor):
+    # Best estimate for orders delivered before the column existed
+    Order = apps.get_model('order', 'Order')
+    Order.objects.filter(status='delivered', delivered_at__isnull=True).update(delivered_at=F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0006_stock_reservation'),
+        ('registration', '0006_alter_sellerprofile_store_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='delivered_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'delivered_at'], name='order_order_status_e2c0c5_idx'),
+        ),
+        migrations.RunPython(backfill_delivered_at, migrations.RunPython.noop),
+    ]
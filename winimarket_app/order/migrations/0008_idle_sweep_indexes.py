@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 18:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0007_order_delivered_at'),
+        ('registration', '0006_alter_sellerprofile_store_name'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'updated_at'], name='order_order_status_a2add6_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0009_archive_tables'),
+        ('registration', '0007_archive_tables'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['seller', 'status', 'created_at'], name='order_order_seller__75dc6d_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0010_order_seller_inbox_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='failure_reason',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
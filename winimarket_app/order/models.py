@@ -1,9 +1,11 @@
+from decimal import Decimal
 from django.db import models
 from uuid import uuid4
 from django.utils import timezone
 from registration.models import Profile, SellerProfile
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 
 class OrderStatus(models.TextChoices):
     PENDING = 'pending', 'Pending'
@@ -101,11 +103,21 @@ class Order(models.Model):
 
     cancelled_at = models.DateTimeField(null=True, blank=True)
     paid_at = models.DateTimeField(null=True, blank=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    # Kept in step with the items by OrderItemQuerySet / OrderItem.save()
+    subtotal = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
+    total = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))  # subtotal + fees (none yet)
 
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['created_at']),
+            models.Index(fields=['updated_at']),  # Change scans for the analytics rollup
+            models.Index(fields=['paid_at']),
+            models.Index(fields=['status', 'delivered_at']),  # Auto-completion scan
+            models.Index(fields=['status', 'updated_at']),  # Stale pending order sweep
+            models.Index(fields=['seller', 'status', 'created_at']),  # Seller order inbox
         ]
         constraints = [
             models.UniqueConstraint(
@@ -120,15 +132,83 @@ class Order(models.Model):
 
     @property
     def total_cost(self):
-        return sum(item.subtotal for item in self.items.all())
+        return self.total
 
     def cancel(self):
-        if self.status in [OrderStatus.SHIPPED, OrderStatus.DELIVERED]:
-            raise ValueError("Cannot cancel an order that has been shipped or delivered.")
-        
-        self.status = OrderStatus.CANCELLED
-        self.cancelled_at = timezone.now()
-        self.save()
+        from .state_machine import apply_transition
+
+        if not apply_transition('cancel', Order.objects.filter(pk=self.pk)):
+            raise ValueError(f"Cannot cancel an order that is {self.get_status_display().lower()}.")
+
+        self.refresh_from_db(fields=['status', 'cancelled_at', 'updated_at'])
+
+
+def items_subtotal():
+    """
+    Subquery summing price * quantity of the outer order's items (0 when empty).
+    """
+    subtotal = (
+        OrderItem.objects.filter(order=OuterRef('pk'))
+        .order_by()
+        .values('order')
+        .annotate(subtotal=Sum(F('price') * F('quantity')))
+        .values('subtotal')
+    )
+    return Coalesce(
+        Subquery(subtotal, output_field=DecimalField(max_digits=10, decimal_places=2)),
+        Value(Decimal('0.00')),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+
+
+def recalculate_order_totals(order_ids):
+    """
+    Recompute the stored subtotal/total of the given orders in one UPDATE.
+    """
+    order_ids = {order_id for order_id in order_ids if order_id}
+    if not order_ids:
+        return 0
+
+    subtotal = items_subtotal()
+    return Order.objects.filter(id__in=order_ids).update(
+        subtotal=subtotal,
+        total=subtotal,
+        updated_at=timezone.now(),
+    )
+
+
+class OrderItemQuerySet(models.QuerySet):
+    """
+    Bulk writes on order items refresh the totals of the orders they touch,
+    once per call rather than once per row.
+    """
+
+    def _order_ids(self):
+        return set(self.order_by().values_list('order_id', flat=True).distinct())
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        recalculate_order_totals({obj.order_id for obj in objs})
+        return objs
+
+    def update(self, **kwargs):
+        # bulk_update() goes through here as well
+        order_ids = self._order_ids()
+        rows = super().update(**kwargs)
+        if 'order' in kwargs or 'order_id' in kwargs:
+            order_ids |= self._order_ids()
+        recalculate_order_totals(order_ids)
+        return rows
+
+    update.queryset_only = True
+
+    def delete(self):
+        order_ids = self._order_ids()
+        result = super().delete()
+        recalculate_order_totals(order_ids)
+        return result
+
+    delete.queryset_only = True
 
 
 class OrderItem(models.Model):
@@ -147,6 +227,8 @@ class OrderItem(models.Model):
     quantity = models.PositiveIntegerField(default=1)
     price = models.DecimalField(max_digits=10, decimal_places=2)
 
+    objects = OrderItemQuerySet.as_manager()
+
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=['order', 'product'], name='unique_order_product')
@@ -174,12 +256,55 @@ class OrderItem(models.Model):
             self.price = 0  # fallback in case product has no price
 
         super().save(*args, **kwargs)
+        recalculate_order_totals([self.order_id])
+
+    def delete(self, *args, **kwargs):
+        order_id = self.order_id
+        result = super().delete(*args, **kwargs)
+        recalculate_order_totals([order_id])
+        return result
+
+class ReservationStatus(models.TextChoices):
+    ACTIVE = 'active', 'Active'
+    COMMITTED = 'committed', 'Committed'
+    RELEASED = 'released', 'Released'
+
+class StockReservation(models.Model):
+    """
+    Stock taken off Product.quantity for a pending order. Committed when the
+    order is paid, released (stock put back) when it expires or is dropped.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='reservations')
+    product = models.ForeignKey('products.Product', on_delete=models.CASCADE, related_name='reservations')
+    quantity = models.PositiveIntegerField()
+    status = models.CharField(max_length=20, choices=ReservationStatus.choices, default=ReservationStatus.ACTIVE)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'expires_at']),  # Sweeper scan
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['order', 'product'],
+                condition=Q(status=ReservationStatus.ACTIVE),
+                name='one_active_reservation_per_order_product'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product_id} for order {self.order_id} ({self.status})"
 
 class PaymentStatus(models.TextChoices):
     PENDING = 'pending', 'Pending'
     SUCCESS = 'success', 'Success'
     FAILED = 'failed', 'Failed'
     REFUNDED = 'refunded', 'Refunded'
+    NEEDS_REVIEW = 'needs_review', 'Needs review'  # Paid, but the orders could not all be paid
 
 class Payment(models.Model):
     id = models.UUIDField(primary_key=True, editable=False, default=uuid4)
@@ -193,6 +318,7 @@ class Payment(models.Model):
     reference = models.CharField(max_length=100, unique=True)
 
     status = models.CharField(max_length=20, choices=PaymentStatus.choices, default=PaymentStatus.PENDING)
+    failure_reason = models.CharField(max_length=255, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     paid_at = models.DateTimeField(blank=True, null=True)
@@ -260,6 +386,88 @@ class OrderEmailLog(models.Model):
         self.status = "failed"
         self.save(update_fields=["status"])
 
+# -----------------------------
+# Archive (cold storage)
+# -----------------------------
+# Orders completed or cancelled long ago are moved here, with their items,
+# email logs and payment links, by order.archive.archive_old_records(). The
+# columns mirror the hot tables so the same serializers can read both.
+
+class ArchivedOrder(models.Model):
+    id = models.UUIDField(primary_key=True, editable=False)
+    buyer = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='archived_orders')
+    seller = models.ForeignKey(SellerProfile, on_delete=models.SET_NULL, related_name='archived_seller_orders', null=True, blank=True)
+    shipping_address = models.ForeignKey(ShippingAddress, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_orders')
+    payments = models.ManyToManyField(Payment, related_name='archived_orders', blank=True)
+
+    is_escrow_released = models.BooleanField(default=False)
+    escrow_released_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    status = models.CharField(max_length=20, choices=OrderStatus.choices)
+    track_status = models.CharField(max_length=20, choices=OrderTrackingStatus.choices)
+
+    cancelled_at = models.DateTimeField(null=True, blank=True)
+    paid_at = models.DateTimeField(null=True, blank=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    subtotal = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
+    total = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
+
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['buyer', 'created_at']),  # "My orders" past the hot table
+            models.Index(fields=['seller', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f'Archived order {self.id}'
+
+    @property
+    def total_cost(self):
+        return self.total
+
+class ArchivedOrderItem(models.Model):
+    id = models.UUIDField(primary_key=True, editable=False)
+    order = models.ForeignKey(ArchivedOrder, on_delete=models.CASCADE, related_name='items')
+    product = models.ForeignKey('products.Product', on_delete=models.SET_NULL, null=True, related_name='archived_order_items')
+    quantity = models.PositiveIntegerField(default=1)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['order']),
+        ]
+
+    def __str__(self):
+        return f'{self.quantity} x {self.product.name if self.product else "Deleted Product"}'
+
+    @property
+    def subtotal(self):
+        return self.price * self.quantity
+
+class ArchivedOrderEmailLog(models.Model):
+    id = models.UUIDField(primary_key=True, editable=False)
+    order = models.ForeignKey(ArchivedOrder, on_delete=models.CASCADE, related_name='email_logs')
+    event = models.CharField(max_length=50)
+    recipient_role = models.CharField(max_length=10, choices=(("buyer", "Buyer"), ("seller", "Seller")))
+    recipient_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    status = models.CharField(max_length=20, choices=(("pending", "Pending"), ("sent", "Sent"), ("failed", "Failed")))
+    sent_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.order_id} | {self.event} → {self.recipient_email}"
+
 User = get_user_model()
 class PushSubscription(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
@@ -0,0 +1,231 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from products.cards import invalidate_product_cards
+from products.models import Product
+
+from .models import OrderItem, ReservationStatus, StockReservation
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# Stock reservations
+# -----------------------------
+# Checkout takes the ordered quantities off Product.quantity straight away
+# with one conditional UPDATE (... SET quantity = quantity - n WHERE
+# quantity >= n), so two buyers can never both get the last unit and no row
+# lock is held between requests. Each line is recorded as an active
+# StockReservation that:
+# - is committed when the order is paid (the stock stays sold)
+# - is released by the sweeper once expires_at has passed, or when the
+#   order is refreshed, cancelled or deleted (the stock goes back)
+# Cancelling a paid or processing order also releases its committed
+# reservations, so the units it had sold go back on sale.
+# Before a multi-row stock UPDATE the product rows are locked in primary key
+# order, so two checkouts that share products queue up instead of locking
+# them in whatever order the planner picks and deadlocking.
+
+RESERVATION_TTL = timedelta(minutes=30)  # Same window as the pending order expiry
+SWEEP_BATCH_SIZE = 500
+
+
+class InsufficientStock(Exception):
+    def __init__(self, shortages):
+        # {product_id: quantity still available}
+        self.shortages = shortages
+        super().__init__(f"Not enough stock for {len(shortages)} product(s)")
+
+
+def _per_product(quantities):
+    return Case(
+        *[When(pk=product_id, then=Value(quantity)) for product_id, quantity in quantities.items()],
+        output_field=IntegerField(),
+    )
+
+
+def _add_up(rows):
+    quantities = defaultdict(int)
+    for product_id, quantity in rows:
+        quantities[product_id] += quantity
+    return quantities
+
+
+def _lock_products(product_ids):
+    list(Product.objects.select_for_update().filter(pk__in=product_ids).order_by('pk').values_list('pk', flat=True))
+
+
+def decrement_stock(quantities):
+    """
+    Take {product_id: quantity} off stock in a single conditional UPDATE.
+    All or nothing: raises InsufficientStock when any product is short or
+    inactive, leaving every product untouched.
+    """
+    if not quantities:
+        return
+
+    try:
+        with transaction.atomic():
+            _lock_products(quantities)
+            updated = (
+                Product.objects.filter(pk__in=quantities, is_active=True, quantity__gte=_per_product(quantities))
+                .update(quantity=F('quantity') - _per_product(quantities))
+            )
+            if updated != len(quantities):
+                raise InsufficientStock({})
+    except InsufficientStock:
+        available = dict(Product.objects.filter(pk__in=quantities, is_active=True).values_list('pk', 'quantity'))
+        raise InsufficientStock({
+            product_id: available.get(product_id, 0)
+            for product_id, quantity in quantities.items()
+            if available.get(product_id, 0) < quantity
+        })
+
+    transaction.on_commit(lambda: invalidate_product_cards(list(quantities)))
+
+
+def restore_stock(quantities):
+    """
+    Put {product_id: quantity} back on stock in a single UPDATE.
+    """
+    if not quantities:
+        return
+
+    with transaction.atomic():
+        _lock_products(quantities)
+        Product.objects.filter(pk__in=quantities).update(quantity=F('quantity') + _per_product(quantities))
+    transaction.on_commit(lambda: invalidate_product_cards(list(quantities)))
+
+
+def _release(reservations, statuses=(ReservationStatus.ACTIVE,)):
+    with transaction.atomic():
+        rows = list(
+            reservations.select_for_update()
+            .filter(status__in=statuses)
+            .values_list('id', 'product_id', 'quantity')
+        )
+        if not rows:
+            return 0
+
+        StockReservation.objects.filter(id__in=[row[0] for row in rows]).update(
+            status=ReservationStatus.RELEASED, updated_at=timezone.now()
+        )
+        restore_stock(_add_up((product_id, quantity) for _, product_id, quantity in rows))
+
+    return len(rows)
+
+
+def release_order_reservations(order_ids):
+    """
+    Give back the stock held by the orders' active reservations.
+    """
+    return _release(StockReservation.objects.filter(order_id__in=order_ids))
+
+
+def release_cancelled_order_stock(order_ids):
+    """
+    Give back all the stock of cancelled orders: what was still reserved
+    and, for orders cancelled after payment, what had been sold.
+    """
+    return _release(
+        StockReservation.objects.filter(order_id__in=order_ids),
+        statuses=(ReservationStatus.ACTIVE, ReservationStatus.COMMITTED),
+    )
+
+
+def reserve_stock(order_ids, ttl=RESERVATION_TTL):
+    """
+    Reserve stock for every item of the given pending orders. Reservations
+    the orders already hold are released first, so a checkout refresh ends
+    up holding exactly its current items. Raises InsufficientStock.
+    """
+    with transaction.atomic():
+        release_order_reservations(order_ids)
+
+        items = list(
+            OrderItem.objects.filter(order_id__in=order_ids, product__isnull=False)
+            .values_list('order_id', 'product_id', 'quantity')
+        )
+        decrement_stock(_add_up((product_id, quantity) for _, product_id, quantity in items))
+
+        expires_at = timezone.now() + ttl
+        StockReservation.objects.bulk_create([
+            StockReservation(order_id=order_id, product_id=product_id, quantity=quantity, expires_at=expires_at)
+            for order_id, product_id, quantity in items
+        ])
+
+
+def commit_reservations(order_ids):
+    """
+    Mark the stock of paid orders as sold. Items whose reservation lapsed
+    before the payment came in are taken off stock again; what cannot be
+    covered any more is logged as oversold rather than failing the payment.
+    """
+    now = timezone.now()
+
+    with transaction.atomic():
+        StockReservation.objects.filter(order_id__in=order_ids, status=ReservationStatus.ACTIVE).update(
+            status=ReservationStatus.COMMITTED, updated_at=now
+        )
+
+        covered = set(
+            StockReservation.objects.filter(order_id__in=order_ids, status=ReservationStatus.COMMITTED)
+            .values_list('order_id', 'product_id')
+        )
+        missing = [
+            (order_id, product_id, quantity)
+            for order_id, product_id, quantity in OrderItem.objects.filter(
+                order_id__in=order_ids, product__isnull=False
+            ).values_list('order_id', 'product_id', 'quantity')
+            if (order_id, product_id) not in covered
+        ]
+        if not missing:
+            return
+
+        quantities = _add_up((product_id, quantity) for _, product_id, quantity in missing)
+        try:
+            decrement_stock(quantities)
+        except InsufficientStock as e:
+            logger.error("Paid orders %s oversold products %s", list(order_ids), list(e.shortages))
+            missing = [row for row in missing if row[1] not in e.shortages]
+            try:
+                decrement_stock(_add_up((product_id, quantity) for _, product_id, quantity in missing))
+            except InsufficientStock:
+                logger.error("Stock changed while committing orders %s, nothing taken", list(order_ids))
+                return
+
+        StockReservation.objects.bulk_create([
+            StockReservation(
+                order_id=order_id, product_id=product_id, quantity=quantity,
+                status=ReservationStatus.COMMITTED, expires_at=now,
+            )
+            for order_id, product_id, quantity in missing
+        ])
+
+
+def release_expired_reservations(now=None, batch_size=SWEEP_BATCH_SIZE):
+    """
+    Sweeper: release active reservations past their expiry, batch by batch.
+    Rows locked by a concurrent checkout or payment are skipped this round.
+    """
+    now = now or timezone.now()
+    released = 0
+
+    while True:
+        with transaction.atomic():
+            ids = list(
+                StockReservation.objects.select_for_update(skip_locked=True)
+                .filter(status=ReservationStatus.ACTIVE, expires_at__lte=now)
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            released += _release(StockReservation.objects.filter(id__in=ids))
+
+    if released:
+        logger.info("Released %s expired stock reservation(s)", released)
+    return released
@@ -1,7 +1,8 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
 from .models import Order, OrderItem, ShippingAddress, OrderStatus, OrderTrackingStatus
-from products.models import Product
-from registration.serializers import ProfileSerializer as BuyerProfileSerializer
+from products.models import Product, ProductImage
+from registration.serializers import ProfileSerializer as BuyerProfileSerializer, SparseFieldsMixin
 from cart.models import Cart, CartItem
 
 class ShippingAddressSerializer(serializers.ModelSerializer):
@@ -30,11 +31,16 @@ class OrderItemSerializer(serializers.ModelSerializer):
         return obj.price * obj.quantity
 
     def get_product_image(self, obj):
-        if obj.product and obj.product.images.exists():
-            image = obj.product.images.filter(is_primary=True).first()
-            return image.image.url if image else obj.product.images.first().image.url
-        return None
-class OrderSerializer(serializers.ModelSerializer):
+        # Primary image, else the newest one (see with_order_serializer_data)
+        product = obj.product
+        if product is None:
+            return None
+
+        images = getattr(product, 'primary_images', None)
+        if images is None:
+            images = list(product.images.order_by('-is_primary', '-uploaded_at')[:1])
+        return images[0].image.url if images else None
+class OrderSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     buyer = BuyerProfileSerializer(read_only=True)
     seller = serializers.SerializerMethodField(read_only=True)
 
@@ -73,9 +79,25 @@ class OrderSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
+        expandable_fields = ["buyer", "items", "shipping_address"]
 
     def get_seller(self, obj):
-        if obj.items.exists():
-            product = obj.items.first().product
-            return product.seller.store_name if product and product.seller else None
-        return None
+        return obj.seller.store_name if obj.seller else None
+
+
+def with_order_serializer_data(orders):
+    """
+    Load everything OrderSerializer reads up front: three queries for the
+    whole queryset (orders with buyer/seller/address joined, items with
+    their products, one primary image per product).
+    """
+    return orders.select_related(
+        'buyer__user', 'buyer__seller_profile', 'seller', 'shipping_address'
+    ).prefetch_related(
+        Prefetch('items', queryset=OrderItem.objects.select_related('product')),
+        Prefetch(
+            'items__product__images',
+            queryset=ProductImage.objects.order_by('-is_primary', '-uploaded_at')[:1],
+            to_attr='primary_images',
+        ),
+    )
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from products.dashboard import invalidate_seller_dashboard_stats
+from .models import Order
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def invalidate_dashboard_on_order_change(sender, instance, **kwargs):
+    invalidate_seller_dashboard_stats([instance.seller_id])
@@ -0,0 +1,119 @@
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from products.dashboard import invalidate_seller_dashboard_stats
+
+from .constants.email_event import OrderEmailEvent
+from .emails.dispatcher import OrderEmailDispatcher
+from .models import Order, OrderStatus, OrderTrackingStatus
+from .reservations import commit_reservations, release_cancelled_order_stock
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# Order state machine
+# -----------------------------
+# Every status change goes through apply_transition(). A transition declares:
+#   from_status   statuses the order may be in
+#   from_track    (optional) track statuses it may be in
+#   conditions    (optional) extra field filters
+#   set           fields written, {'<field>': 'now'} stamps the current time
+#   after         side effects, called with the ids that moved
+#   event         notification sent to the buyer / seller
+# Orders that are not in an allowed state are left alone, so a transition
+# applied twice (double click, retried webhook) is a no-op the second time.
+
+ORDER_TRANSITIONS = {
+    'pay': {
+        'from_status': [OrderStatus.PENDING],
+        'set': {'status': OrderStatus.PAID, 'track_status': OrderTrackingStatus.PROCESSING, 'paid_at': 'now'},
+        'after': [commit_reservations],
+        'event': OrderEmailEvent.ORDER_PAID,
+    },
+    'process': {
+        'from_status': [OrderStatus.PAID],
+        'from_track': [OrderTrackingStatus.PENDING, OrderTrackingStatus.PROCESSING],
+        'set': {'track_status': OrderTrackingStatus.PROCESSING},
+    },
+    'ship': {
+        'from_status': [OrderStatus.PAID, OrderStatus.PROCESSING],
+        'set': {'status': OrderStatus.SHIPPED, 'track_status': OrderTrackingStatus.SHIPPED},
+        'event': OrderEmailEvent.ORDER_SHIPPED,
+    },
+    'deliver': {
+        'from_status': [OrderStatus.PAID, OrderStatus.PROCESSING, OrderStatus.SHIPPED],
+        'set': {'status': OrderStatus.DELIVERED, 'track_status': OrderTrackingStatus.DELIVERED, 'delivered_at': 'now'},
+        'event': OrderEmailEvent.ORDER_DELIVERED,
+    },
+    'complete': {
+        'from_status': [OrderStatus.DELIVERED],
+        'conditions': {'is_escrow_released': False},
+        'set': {
+            'status': OrderStatus.COMPLETED,
+            'track_status': OrderTrackingStatus.COMPLETED,
+            'is_escrow_released': True,
+            'escrow_released_at': 'now',
+        },
+        'event': OrderEmailEvent.ORDER_COMPLETED,
+    },
+    'cancel': {
+        'from_status': [OrderStatus.PENDING, OrderStatus.PAID, OrderStatus.PROCESSING],
+        'set': {'status': OrderStatus.CANCELLED, 'cancelled_at': 'now'},
+        'after': [release_cancelled_order_stock],
+        'event': OrderEmailEvent.ORDER_CANCELLED,
+    },
+}
+
+# Seller facing track status -> transition
+SELLER_TRACK_TRANSITIONS = {
+    OrderTrackingStatus.PROCESSING: 'process',
+    OrderTrackingStatus.SHIPPED: 'ship',
+    OrderTrackingStatus.DELIVERED: 'deliver',
+}
+
+
+def _allowed(orders, transition):
+    orders = orders.filter(status__in=transition['from_status'], **transition.get('conditions', {}))
+    if 'from_track' in transition:
+        orders = orders.filter(track_status__in=transition['from_track'])
+    return orders
+
+
+def apply_transition(name, orders, now=None, skip_locked=False):
+    """
+    Move every order of the queryset that is allowed to take the named
+    transition: one locking SELECT, one conditional UPDATE, then the side
+    effects and notifications for the whole batch. Returns the ids moved.
+
+    skip_locked leaves out orders another transaction is working on, so
+    concurrent background jobs split the work instead of queueing up.
+    """
+    transition = ORDER_TRANSITIONS[name]
+    now = now or timezone.now()
+
+    updates = {field: now if value == 'now' else value for field, value in transition['set'].items()}
+    updates['updated_at'] = now
+
+    with transaction.atomic():
+        moving = list(
+            _allowed(orders, transition).select_for_update(skip_locked=skip_locked).values_list('id', 'seller_id')
+        )
+        if not moving:
+            return []
+
+        order_ids = [order_id for order_id, _ in moving]
+        _allowed(Order.objects.filter(id__in=order_ids), transition).update(**updates)
+
+        for side_effect in transition.get('after', []):
+            side_effect(order_ids)
+
+        if transition.get('event'):
+            OrderEmailDispatcher.dispatch_many(Order.objects.filter(id__in=order_ids), transition['event'])
+
+        seller_ids = {seller_id for _, seller_id in moving}
+        transaction.on_commit(lambda: invalidate_seller_dashboard_stats(seller_ids))
+
+    logger.info("Order transition %s applied to %s order(s)", name, len(order_ids))
+    return order_ids
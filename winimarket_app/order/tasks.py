@@ -1,11 +1,98 @@
-from .models import Order
+from .archive import archive_old_records
+from .models import Order, OrderStatus
+from .reservations import release_expired_reservations
+from .state_machine import apply_transition
+from cart.tasks import abandon_idle_carts
+from django.conf import settings
+from django.db.models import Q
 from django.utils import timezone
 from datetime import timedelta
 
-def cancel_expire_order():
-    expiry_time = timezone.now() - timedelta(minutes=30)
-    expired_order = Order.objects.filter(status='pending', created_at__lt=expiry_time)
+AUTO_COMPLETE_BATCH_SIZE = 500
+EXPIRE_BATCH_SIZE = 500
+
+def _walk(orders, field, batch_size):
+    """
+    Yield the ids of `orders` in keyset batches on (field, id), so rows a
+    batch leaves behind (locked elsewhere) are stepped over, not re-read.
+    """
+    orders = orders.order_by(field, 'id')
+    last = None
+    while True:
+        batch = orders
+        if last:
+            batch = batch.filter(Q(**{f'{field}__gt': last[0]}) | Q(**{field: last[0], 'id__gt': last[1]}))
+
+        rows = list(batch.values_list(field, 'id')[:batch_size])
+        if not rows:
+            return
+        yield [order_id for _, order_id in rows]
+        last = rows[-1]
+
+def expire_pending_orders(now=None, minutes=None, batch_size=EXPIRE_BATCH_SIZE):
+    """
+    Cancel pending orders nobody paid for within `minutes` of their last
+    checkout, batch by batch, giving their reserved stock back. This also
+    frees the buyer/seller pair for a new pending order.
+    """
+    now = now or timezone.now()
+    minutes = minutes if minutes is not None else getattr(settings, 'ORDER_PENDING_EXPIRY_MINUTES', 30)
+    stale = Order.objects.filter(status=OrderStatus.PENDING, updated_at__lt=now - timedelta(minutes=minutes))
 
-    count = expired_order.update(status='cancelled')
+    cancelled = 0
+    for order_ids in _walk(stale, 'updated_at', batch_size):
+        cancelled += len(apply_transition('cancel', Order.objects.filter(id__in=order_ids), now=now, skip_locked=True))
+    return cancelled
+
+def cancel_expire_order():
+    count = expire_pending_orders()
     return f"{count} expired orders cancelled"
 
+def sweep_stale_records(now=None):
+    """
+    Housekeeping run: abandon idle carts, cancel stale pending orders and
+    release any reservation that outlived its order. Returns the counts.
+    """
+    now = now or timezone.now()
+    return {
+        'carts_abandoned': abandon_idle_carts(now=now),
+        'orders_cancelled': expire_pending_orders(now=now),
+        'reservations_released': release_expired_reservations(now=now),
+    }
+
+def auto_complete_delivered_orders(now=None, days=None, batch_size=AUTO_COMPLETE_BATCH_SIZE):
+    """
+    Complete (and release escrow for) orders delivered more than `days` ago
+    that the buyer never confirmed. Walks the (status, delivered_at) index
+    in keyset batches; rows another worker holds are skipped, so several
+    runs can overlap safely.
+    """
+    now = now or timezone.now()
+    days = days if days is not None else getattr(settings, 'ORDER_AUTO_COMPLETE_DAYS', 7)
+    cutoff = now - timedelta(days=days)
+
+    stale = Order.objects.filter(status=OrderStatus.DELIVERED, is_escrow_released=False, delivered_at__lte=cutoff)
+
+    completed = 0
+    for order_ids in _walk(stale, 'delivered_at', batch_size):
+        completed += len(apply_transition('complete', Order.objects.filter(id__in=order_ids), now=now, skip_locked=True))
+
+    return f"{completed} delivered orders auto-completed"
+
+def release_expired_stock():
+    count = release_expired_reservations()
+    return f"{count} expired stock reservations released"
+
+def sweep_stale_carts_and_orders():
+    counts = sweep_stale_records()
+    return (
+        f"{counts['carts_abandoned']} carts abandoned, {counts['orders_cancelled']} pending orders cancelled, "
+        f"{counts['reservations_released']} stock reservations released"
+    )
+
+def archive_old_orders():
+    counts = archive_old_records()
+    return (
+        f"{counts['orders']} orders ({counts['order_items']} items) and "
+        f"{counts['notification_logs']} notification logs archived"
+    )
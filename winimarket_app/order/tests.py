@@ -1,3 +1,253 @@
-from django.test import TestCase
+import json
+import threading
+import uuid
+from collections import Counter
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from cart.models import Cart, CartItem
+from products.models import Product, ProductImage
+from winimarket_app.renderers import ORJSONRenderer
+from winimarket_app.testing import api_request, make_products, make_user
+
+from .emails.enqueue import enqueue_order_email
+from .fast_serializers import serialize_orders
+from .models import Order, OrderItem, OrderStatus, ReservationStatus, ShippingAddress, StockReservation
+from .reservations import InsufficientStock, decrement_stock, reserve_stock
+from .serializer import OrderSerializer, with_order_serializer_data
+from .state_machine import apply_transition
+from .views import checkout
+
+
+class FastOrderSerializerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.buyer, cls.seller = make_user(), make_user('seller')
+        products = make_products(cls.seller, 4)
+        address = ShippingAddress.objects.create(buyer=cls.buyer.profile, state_region='Central', city='Winneba', phonenumber='0200000000')
+
+        for status in (OrderStatus.PENDING, OrderStatus.PAID, OrderStatus.COMPLETED):
+            order = Order.objects.create(
+                buyer=cls.buyer.profile, seller=cls.seller.profile.seller_profile, shipping_address=address, status=status
+            )
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, product=product, quantity=2, price=product.price) for product in products[:3]
+            ])
+
+    def test_matches_order_serializer(self):
+        renderer = ORJSONRenderer()
+        for user, orders in (
+            (self.buyer, Order.objects.filter(buyer=self.buyer.profile)),
+            (self.seller, Order.objects.filter(seller=self.seller.profile.seller_profile).order_by('-created_at')),
+        ):
+            with self.subTest(user=user):
+                request = api_request(user)
+                expected = OrderSerializer(with_order_serializer_data(orders), many=True, context={'request': request}).data
+                self.assertEqual(renderer.render(serialize_orders(orders, request)), renderer.render(expected))
+
+
+class OrderListQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.buyer = make_user()
+        sellers = [make_user('seller') for _ in range(3)]
+        products = [product for seller in sellers for product in make_products(seller, 4)]
+        ProductImage.objects.bulk_create([
+            ProductImage(product=product, image=f"product_images/{uuid.uuid4().hex}.jpg", is_primary=primary)
+            for product in products
+            for primary in (True, False)
+        ])
+        address = ShippingAddress.objects.create(buyer=cls.buyer.profile, state_region='Central', city='Winneba', phonenumber='0200000000')
+
+        # Order.seller is part of a partial unique constraint on pending orders only
+        orders = Order.objects.bulk_create([
+            Order(buyer=cls.buyer.profile, seller=sellers[index % 3].profile.seller_profile, shipping_address=address, status=OrderStatus.PAID)
+            for index in range(15)
+        ])
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=products[(index + offset) % len(products)], quantity=1, price=Decimal('5.00'))
+            for index, order in enumerate(orders)
+            for offset in range(3)
+        ])
+
+    def test_prefetched_order_list_runs_three_queries(self):
+        request = api_request(self.buyer)
+        orders = Order.objects.filter(buyer=self.buyer.profile)
+
+        plain = OrderSerializer(orders, many=True, context={'request': request}).data
+        # orders (+ buyer, seller, address), items (+ product), primary images
+        with self.assertNumQueries(3):
+            prefetched = OrderSerializer(with_order_serializer_data(orders), many=True, context={'request': request}).data
+
+        renderer = ORJSONRenderer()
+        self.assertEqual(renderer.render(prefetched), renderer.render(plain))
+        self.assertEqual(renderer.render(serialize_orders(orders, request)), renderer.render(plain))
+
+
+class CheckoutQueryTests(TestCase):
+    def _cart(self, lines, sellers):
+        buyer = make_user()
+        products = []
+        for _ in range(sellers):
+            products += make_products(make_user('seller'), lines // sellers)
+
+        cart = Cart.objects.create(buyer=buyer.profile)
+        CartItem.objects.bulk_create([
+            CartItem(cart=cart, product=product, quantity=2, choice_price=product.price) for product in products
+        ])
+        address = ShippingAddress.objects.create(buyer=buyer.profile, state_region='Central', city='Winneba', phonenumber='0200000000')
+        return buyer, address
+
+    def _checkout(self, buyer, address):
+        request = APIRequestFactory().post('/order/api/checkout/', {'shipping_address_id': str(address.id)}, format='json')
+        force_authenticate(request, user=buyer)
+        with CaptureQueriesContext(connection) as queries:
+            response = checkout(request)
+        self.assertEqual(response.status_code, 201, response.data)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_the_cart(self):
+        counts = {}
+        for lines, sellers in ((1, 1), (10, 2), (30, 5)):
+            buyer, address = self._cart(lines, sellers)
+            counts[lines, sellers] = (self._checkout(buyer, address), self._checkout(buyer, address))
+            self.assertEqual(Order.objects.filter(buyer=buyer.profile).count(), sellers)
+        # (first checkout, repeat checkout) is the same for every cart size
+        self.assertEqual(len(set(counts.values())), 1, counts)
+
+
+class CancelledOrderStockTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.buyer, seller = make_user(), make_user('seller')
+        cls.products = make_products(seller, 2)
+        cls.address = ShippingAddress.objects.create(buyer=cls.buyer.profile, state_region='Central', city='Winneba', phonenumber='0200000000')
+
+    def _order(self):
+        order = Order.objects.create(
+            buyer=self.buyer.profile, seller=self.products[0].seller, shipping_address=self.address
+        )
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, quantity=3, price=product.price) for product in self.products
+        ])
+        reserve_stock([order.id])
+        return Order.objects.filter(pk=order.pk)
+
+    def _stock(self):
+        return sorted(Product.objects.filter(pk__in=[p.pk for p in self.products]).values_list('quantity', flat=True))
+
+    def test_cancelling_a_pending_order_gives_the_reserved_stock_back(self):
+        order = self._order()
+        self.assertEqual(self._stock(), [7, 7])
+
+        apply_transition('cancel', order)
+        self.assertEqual(self._stock(), [10, 10])
+
+    def test_cancelling_a_paid_order_gives_the_sold_stock_back(self):
+        for steps in (['pay'], ['pay', 'process']):
+            with self.subTest(steps=steps):
+                order = self._order()
+                for step in steps:
+                    self.assertTrue(apply_transition(step, order))
+                self.assertEqual(self._stock(), [7, 7])
+
+                apply_transition('cancel', order)
+                self.assertEqual(self._stock(), [10, 10])
+                self.assertFalse(StockReservation.objects.filter(order__in=order).exclude(status=ReservationStatus.RELEASED).exists())
+
+                # Cancelled twice: nothing is given back twice
+                apply_transition('cancel', order)
+                self.assertEqual(self._stock(), [10, 10])
+
+
+class ConcurrentStockDecrementTests(TransactionTestCase):
+    threads = 8
+    attempts = 10
+
+    def _hammer(self, quantities_for):
+        """
+        Run decrement_stock from many threads at once; quantities_for(thread)
+        gives each thread its {product_id: quantity}. Returns the outcomes.
+        """
+        results = Counter()
+        lock = threading.Lock()
+        start_gate = threading.Event()
+
+        def worker(index):
+            outcomes = Counter()
+            try:
+                start_gate.wait()
+                for _ in range(self.attempts):
+                    try:
+                        decrement_stock(quantities_for(index))
+                        outcomes['reserved'] += 1
+                    except InsufficientStock:
+                        outcomes['short'] += 1
+                    except OperationalError:
+                        # SQLite allows one writer at a time and may give up waiting
+                        outcomes['busy'] += 1
+            finally:
+                connection.close()
+                with lock:
+                    results.update(outcomes)
+
+        workers = [threading.Thread(target=worker, args=(index,)) for index in range(self.threads)]
+        for thread in workers:
+            thread.start()
+        start_gate.set()
+        for thread in workers:
+            thread.join()
+        return results
+
+    def test_last_units_are_never_oversold(self):
+        product = make_products(make_user('seller'), 1)[0]
+        Product.objects.filter(pk=product.pk).update(quantity=25)
+
+        results = self._hammer(lambda index: {product.pk: 1})
+
+        product.refresh_from_db(fields=['quantity'])
+        self.assertGreater(results['reserved'], 0, results)
+        self.assertEqual(results['reserved'] + product.quantity, 25, results)
+        self.assertGreaterEqual(product.quantity, 0)
+
+    def test_overlapping_multi_product_checkouts_do_not_deadlock(self):
+        first, second = make_products(make_user('seller'), 2)
+        Product.objects.filter(pk__in=[first.pk, second.pk]).update(quantity=40)
+
+        # Half the threads name the products in the opposite order
+        results = self._hammer(
+            lambda index: {first.pk: 1, second.pk: 1} if index % 2 else {second.pk: 1, first.pk: 1}
+        )
+
+        stock = dict(Product.objects.filter(pk__in=[first.pk, second.pk]).values_list('pk', 'quantity'))
+        self.assertGreater(results['reserved'], 0, results)
+        self.assertEqual(results['reserved'] + stock[first.pk], 40, results)
+        self.assertEqual(results['reserved'] + stock[second.pk], 40, results)
+        if connection.features.has_select_for_update:
+            # A deadlock surfaces as an OperationalError
+            self.assertEqual(results['busy'], 0, results)
+
+
+@override_settings(
+    GCP_PROJECT_ID='project', GCP_REGION='region', CLOUD_TASKS_QUEUE_NAME='queue',
+    CLOUD_TASKS_HANDLER_URL='https://example.com/tasks/handler/',
+    CLOUD_TASKS_SERVICE_ACCOUNT='tasks@example.com', CLOUD_TASKS_AUDIENCE='https://example.com',
+)
+class CloudTaskEnqueueTests(SimpleTestCase):
+    def test_helpers_share_one_task_builder(self):
+        with mock.patch('order.emails.enqueue.tasks_v2.CloudTasksClient') as client_class:
+            client = client_class.return_value
+            client.task_path.side_effect = lambda project, region, queue, task_id: f"tasks/{task_id}"
+            enqueue_order_email(email_log_id=7, order_id=uuid.UUID(int=1))
+
+        task = client.create_task.call_args.kwargs['request']['task']
+        self.assertEqual(task['name'], 'tasks/order-email-7')
+        self.assertEqual(
+            json.loads(task['http_request']['body']),
+            {'task': 'send_email_task', 'payload': {'email_log_id': 7, 'order_id': str(uuid.UUID(int=1))}},
+        )
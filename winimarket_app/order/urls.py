@@ -8,11 +8,14 @@ urlpatterns = [
     path('api/detail/<uuid:order_id>/', views.order_detail),
     path('api/orders/buyer/', views.my_orders, name='buyer-order'),
     path('api/orders/seller/', views.seller_orders, name='seller-orders'),
+    path('api/orders/seller/inbox/', views.seller_order_inbox, name='seller-order-inbox'),
+    path('api/orders/seller/export/', views.seller_export_orders, name='seller-orders-export'),
 
     path('seller/<uuid:order_id>/order/', views.seller_order_detail, name='order-detail-seller'),
     path('api/seller/orders/<uuid:order_id>/', views.seller_order_detail_api, name='seller-order-detail-api'),
 
     path('api/update/<uuid:order_id>/order/', views.update_order_status, name='order-update'),
+    path('api/orders/seller/bulk-update/', views.seller_bulk_update_order_status, name='seller-orders-bulk-update'),
     path('api/confirm/<uuid:order_id>/order/', views.confirm_delivery, name='confirm-order'),
 
     path('api/order/<uuid:order_id>/delete/', views.delete_order),
@@ -13,24 +13,43 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from .models import Order, OrderItem, OrderStatus, OrderTrackingStatus, ShippingAddress
-from .serializer import OrderSerializer, OrderItemSerializer, ShippingAddressSerializer
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem, OrderStatus, OrderTrackingStatus, ShippingAddress
+from .serializer import OrderSerializer, OrderItemSerializer, ShippingAddressSerializer, with_order_serializer_data
+from .fast_serializers import serialize_orders
+from .checkout import build_checkout_orders, cart_lines
+from .reservations import InsufficientStock, release_order_reservations
+from .state_machine import SELLER_TRACK_TRANSITIONS, apply_transition
+from registration.fast_serializers import uses_sparse_fields
+from winimarket_app.exports import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export_response, format_export_datetime
 from cart.models import Cart, CartItem
 from products.models import Product
 
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, timedelta
 from django.conf import settings
 from django.db import transaction
+from django.db.models import Count, Q
+from rest_framework.utils.urls import replace_query_param
 
 from order.models import PushSubscription
 from order.constants.email_event import OrderEmailEvent
 from order.emails.dispatcher import OrderEmailDispatcher
 
+import binascii
 import json
+import uuid
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from itertools import chain
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 
+# Max number of orders per seller_bulk_update_order_status request
+ORDER_BULK_UPDATE_LIMIT = 200
+
+# Keyset paged order lists (?cursor= / ?limit=)
+ORDER_PAGE_SIZE = 20
+ORDER_MAX_PAGE_SIZE = 100
+
 @require_POST
 @login_required
 def subscribe_push(request):
@@ -111,57 +130,29 @@ def checkout(request):
     except Cart.DoesNotExist:
         return Response({'error': 'Cart not found.'}, status=status.HTTP_404_NOT_FOUND)
     
-    cart_items = CartItem.objects.select_related('product', 'product__seller').filter(cart=cart)
+    lines = cart_lines(cart)
     
-    if not cart_items.exists():
+    if not lines:
         return Response({'error': 'Cart is empty.'}, status=status.HTTP_400_BAD_REQUEST)
-    
-    seller_groups = {}
-    for item in cart.items.all():
-        product = item.product
-        seller = product.seller
-        seller_groups.setdefault(seller, []).append(item)
 
-    created_orders = []
+    try:
+        order_ids = build_checkout_orders(buyer, address, lines)
+    except InsufficientStock as e:
+        return Response(
+            {
+                'error': 'Not enough stock available',
+                'products': [{'id': str(product_id), 'available': available} for product_id, available in e.shortages.items()],
+            },
+            status=status.HTTP_409_CONFLICT
+        )
 
-    with transaction.atomic():
-        for seller, items in seller_groups.items():
-            order, created = Order.objects.get_or_create(
-                buyer=buyer,
-                seller=seller,
-                status=OrderStatus.PENDING,
-                defaults = {
-                    "shipping_address": address,
-                    "track_status": OrderTrackingStatus.PENDING
-                }
-            )
-
-            # If order already existed → refresh it
-            if not created:
-                order.shipping_address = address
-                order.updated_at = timezone.now()
-                order.save()
-
-                # Remove old items to prevent duplicates
-                order.items.all().delete()
-
-            # Re-add cart items
-            for item in items:
-                OrderItem.objects.create(
-                    order=order,
-                    product=item.product,
-                    quantity=item.quantity,
-                    price=item.product.price
-                )
-
-            created_orders.append(order)
-
-    serializer = OrderSerializer(created_orders, many=True, context={'request': request})
+    orders = {order['id']: order for order in serialize_orders(Order.objects.filter(id__in=order_ids), request)}
+    data = [orders[str(order_id)] for order_id in order_ids]
 
     return Response(
         {
             "message": "Order(s) created successfully.",
-            "orders": serializer.data
+            "orders": data
         },
         status=status.HTTP_201_CREATED
     )
@@ -172,17 +163,105 @@ def checkout(request):
 @permission_classes([IsAuthenticated])
 def my_orders(request):
     buyer = request.user.profile
-    orders = Order.objects.filter(buyer=buyer).prefetch_related('items__product__images', 'shipping_address', 'seller')
 
-    serializer = OrderSerializer(orders, many=True, context={'request': request})
+    if 'cursor' in request.query_params or 'limit' in request.query_params:
+        return _order_history(request, buyer)
+
+    orders = Order.objects.filter(buyer=buyer)
+
+    if not uses_sparse_fields(request):
+        return Response(serialize_orders(orders, request), status=status.HTTP_200_OK)
+
+    serializer = OrderSerializer(with_order_serializer_data(orders), many=True, context={'request': request})
     return Response(serializer.data, status=status.HTTP_200_OK)
 
+# Order sources of the buyer history, hot table first
+ORDER_HISTORY_SOURCES = (
+    ('orders', Order, OrderItem),
+    ('archive', ArchivedOrder, ArchivedOrderItem),
+)
+
+def _encode_order_cursor(source, created_at, order_id):
+    return urlsafe_b64encode(json.dumps([source, created_at.isoformat(), str(order_id)]).encode()).decode()
+
+def _decode_order_cursor(value):
+    try:
+        source, created_at, order_id = json.loads(urlsafe_b64decode(value.encode()))
+        return source, datetime.fromisoformat(created_at), uuid.UUID(order_id)
+    except (ValueError, TypeError, binascii.Error):
+        return None
+
+def _page_limit(request):
+    try:
+        limit = min(int(request.query_params.get('limit', ORDER_PAGE_SIZE)), ORDER_MAX_PAGE_SIZE)
+    except ValueError:
+        return None
+    return limit if limit > 0 else None
+
+def _older_than(orders, created_at, order_id):
+    # Keyset on (created_at, id), newest first
+    return orders.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=order_id))
+
+def _order_history(request, buyer):
+    """
+    One page of the buyer's orders, newest first, as {results, next}.
+    The hot table is read first and the page only carries on into
+    ArchivedOrder once it runs out, so old history costs nothing until the
+    buyer scrolls that far back.
+    """
+    limit = _page_limit(request)
+    if limit is None:
+        return Response({'error': 'limit must be a positive number'}, status=status.HTTP_400_BAD_REQUEST)
+
+    cursor = None
+    sources = ORDER_HISTORY_SOURCES
+    if request.query_params.get('cursor'):
+        cursor = _decode_order_cursor(request.query_params['cursor'])
+        names = [name for name, _, _ in ORDER_HISTORY_SOURCES]
+        if cursor is None or cursor[0] not in names:
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        sources = ORDER_HISTORY_SOURCES[names.index(cursor[0]):]
+
+    # One row past the page tells whether there is a next one
+    keys = []
+    for name, model, _ in sources:
+        orders = model.objects.filter(buyer=buyer)
+        if cursor and cursor[0] == name:
+            orders = _older_than(orders, *cursor[1:])
+
+        wanted = limit + 1 - len(keys)
+        keys += [(name, created_at, order_id) for created_at, order_id in
+                 orders.order_by('-created_at', '-id').values_list('created_at', 'id')[:wanted]]
+        if len(keys) > limit:
+            break
+
+    page = keys[:limit]
+    results = []
+    for name, model, item_model in sources:
+        ids = [order_id for source, _, order_id in page if source == name]
+        if ids:
+            results += serialize_orders(model.objects.filter(id__in=ids).order_by('-created_at', '-id'), request, item_model)
+
+    next_url = None
+    if len(keys) > limit:
+        next_url = replace_query_param(request.build_absolute_uri(), 'cursor', _encode_order_cursor(*page[-1]))
+
+    return Response({'results': results, 'next': next_url}, status=status.HTTP_200_OK)
+
+def _archived_order_data(request, **filters):
+    # Orders moved to cold storage are read-only and only looked up on a miss
+    data = serialize_orders(ArchivedOrder.objects.filter(**filters), request, ArchivedOrderItem)
+    return data[0] if data else None
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def order_detail(request, order_id):
     try:
-        order = Order.objects.get(id=order_id, buyer=request.user.profile)
+        order = with_order_serializer_data(Order.objects.all()).get(id=order_id, buyer=request.user.profile)
     except Order.DoesNotExist:
+        archived = _archived_order_data(request, id=order_id, buyer=request.user.profile)
+        if archived is not None:
+            return Response(archived, status=status.HTTP_200_OK)
         return Response({"error": "Order not found"}, status=status.HTTP_404_NOT_FOUND)
     
     serializer = OrderSerializer(order, context={"request": request})
@@ -194,23 +273,133 @@ def order_detail(request, order_id):
 @permission_classes([IsAuthenticated])
 def seller_orders(request):
     seller = request.user.profile.seller_profile
-    orders = (Order.objects.filter(seller=seller).prefetch_related('items__product__images', 'shipping_address', 'buyer__user').order_by('-created_at'))
+    orders = Order.objects.filter(seller=seller).order_by('-created_at')
 
-    serializer = OrderSerializer(orders, many=True, context={'request': request})
+    if not uses_sparse_fields(request):
+        return Response(serialize_orders(orders, request), status=status.HTTP_200_OK)
+
+    serializer = OrderSerializer(with_order_serializer_data(orders), many=True, context={'request': request})
     return Response(serializer.data, status=status.HTTP_200_OK)
 
+def _choice_filter(request, name, choices):
+    # Comma separated values of a choices field, None when one is unknown
+    values = [value for value in request.query_params.get(name, '').split(',') if value]
+    if any(value not in choices.values for value in values):
+        return None
+    return values
+
+def _order_facets(orders):
+    """
+    Order counts per status and per track status, from one grouped query.
+    """
+    counts = {
+        'all': 0,
+        'status': dict.fromkeys(OrderStatus.values, 0),
+        'track_status': dict.fromkeys(OrderTrackingStatus.values, 0),
+    }
+    for order_status, track_status, count in (
+        orders.order_by().values('status', 'track_status').annotate(count=Count('id')).values_list('status', 'track_status', 'count')
+    ):
+        counts['all'] += count
+        counts['status'][order_status] += count
+        counts['track_status'][track_status] += count
+    return counts
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def seller_order_inbox(request):
+    """
+    One page of the seller's orders, newest first, as {results, next, counts}.
+    ?status= / ?track_status= (comma separated) narrow the page; counts
+    always cover every order so the filter tabs can show them.
+    """
+    seller = request.user.profile.seller_profile
+    orders = Order.objects.filter(seller=seller)
+
+    limit = _page_limit(request)
+    if limit is None:
+        return Response({'error': 'limit must be a positive number'}, status=status.HTTP_400_BAD_REQUEST)
+
+    statuses = _choice_filter(request, 'status', OrderStatus)
+    track_statuses = _choice_filter(request, 'track_status', OrderTrackingStatus)
+    if statuses is None or track_statuses is None:
+        return Response({'error': 'Invalid status filter'}, status=status.HTTP_400_BAD_REQUEST)
+
+    page = orders
+    if statuses:
+        page = page.filter(status__in=statuses)
+    if track_statuses:
+        page = page.filter(track_status__in=track_statuses)
+
+    if request.query_params.get('cursor'):
+        cursor = _decode_order_cursor(request.query_params['cursor'])
+        if cursor is None or cursor[0] != 'orders':
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        page = _older_than(page, *cursor[1:])
+
+    # One row past the page tells whether there is a next one
+    keys = list(page.order_by('-created_at', '-id').values_list('created_at', 'id')[:limit + 1])
+    results = serialize_orders(
+        Order.objects.filter(id__in=[order_id for _, order_id in keys[:limit]]).order_by('-created_at', '-id'), request
+    )
+
+    next_url = None
+    if len(keys) > limit:
+        next_url = replace_query_param(request.build_absolute_uri(), 'cursor', _encode_order_cursor('orders', *keys[limit - 1]))
+
+    return Response({'results': results, 'next': next_url, 'counts': _order_facets(orders)}, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def seller_export_orders(request):
+    """
+    Stream the seller's order history, one row per order item,
+    as CSV (default) or XLSX (?type=xlsx).
+    """
+    seller = request.user.profile.seller_profile
+    export_format = request.query_params.get('type', 'csv')
+
+    if export_format not in EXPORT_FORMATS:
+        return Response({"error": "type must be csv or xlsx"}, status=status.HTTP_400_BAD_REQUEST)
+
+    headers = [
+        "Order ID", "Created At", "Status", "Track Status", "Paid At", "Buyer", "Buyer Email",
+        "Product", "Quantity", "Unit Price", "Subtotal",
+    ]
+
+    # Hot orders first, then the archived history
+    items = chain.from_iterable(
+        item_model.objects.filter(order__seller=seller)
+        .order_by('-order__created_at', 'order_id')
+        .values_list(
+            'order_id', 'order__created_at', 'order__status', 'order__track_status', 'order__paid_at',
+            'order__buyer__full_name', 'order__buyer__user__email', 'product__name', 'quantity', 'price',
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        for item_model in (OrderItem, ArchivedOrderItem)
+    )
+
+    rows = (
+        [str(order_id), format_export_datetime(created_at), order_status, track_status,
+         format_export_datetime(paid_at), buyer_name or '', buyer_email, product_name or 'Deleted Product',
+         quantity, str(price), str(price * quantity)]
+        for order_id, created_at, order_status, track_status, paid_at,
+            buyer_name, buyer_email, product_name, quantity, price in items
+    )
+
+    return export_response(export_format, 'winimarket_orders', headers, rows, sheet_title='Orders')
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def seller_order_detail_api(request, order_id):
     seller = request.user.profile.seller_profile
 
     try:
-        order = Order.objects.select_related(
-            'buyer__user', 'shipping_address'
-        ).prefetch_related('items__product').get(
-            id=order_id, seller=seller
-        )
+        order = with_order_serializer_data(Order.objects.all()).get(id=order_id, seller=seller)
     except Order.DoesNotExist:
+        archived = _archived_order_data(request, id=order_id, seller=seller)
+        if archived is not None:
+            return Response(archived)
         return Response({'error': 'Order not found'}, status=404)
 
     serializer = OrderSerializer(order, context={'request': request})
@@ -224,40 +413,52 @@ def update_order_status(request, order_id):
     seller = request.user.profile.seller_profile
     status_value = request.data.get('status')
 
-    try:
-        order = Order.objects.get(id=order_id, seller=seller)
-    except Order.DoesNotExist:
+    orders = Order.objects.filter(id=order_id, seller=seller)
+    if not orders.exists():
         return Response({'error': 'Order not found.'}, status=status.HTTP_404_NOT_FOUND)
     
-    allowed = ['processing', 'shipped', 'delivered']
-    if status_value not in allowed:
+    if status_value not in SELLER_TRACK_TRANSITIONS:
         return Response({'error': 'Invalid status value.'}, status=status.HTTP_400_BAD_REQUEST)
-    
-    order.track_status = status_value
 
-    flow_rank = {
-        'processing': 1,
-        'shipped': 2,
-        'delivered': 3
-    }
+    if not apply_transition(SELLER_TRACK_TRANSITIONS[status_value], orders):
+        return Response({'error': f'Order cannot be moved to {status_value}.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    serializer = OrderSerializer(with_order_serializer_data(orders).get(), context={'request': request})
+    return Response(serializer.data, status=status.HTTP_200_OK)
+
+# ---------------------------
+# BULK ORDER UPDATE VIEW - SELLER
+@api_view(['PATCH'])
+@permission_classes([IsAuthenticated])
+def seller_bulk_update_order_status(request):
+    """
+    Move many orders at once: {"order_ids": [...], "status": "delivered"}.
+    Orders that are not the seller's or cannot take the step are skipped.
+    """
+    seller = request.user.profile.seller_profile
+    order_ids = request.data.get('order_ids')
+    status_value = request.data.get('status')
 
-    if flow_rank[status_value] < flow_rank[order.track_status]:
-        return Response({'error': 'Cannot move order backward'}, status=status.HTTP_400_BAD_REQUEST)
+    if not isinstance(order_ids, list) or not order_ids:
+        return Response({'error': 'order_ids must be a non-empty list.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    if status_value == "shipped":
-        order.status = OrderStatus.SHIPPED
-    elif status_value == "delivered":
-        order.status = OrderStatus.DELIVERED
+    if len(order_ids) > ORDER_BULK_UPDATE_LIMIT:
+        return Response({'error': f'A maximum of {ORDER_BULK_UPDATE_LIMIT} orders can be updated at once.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        OrderEmailDispatcher.dispatcher(
-            order=order,
-            event=OrderEmailEvent.ORDER_DELIVERED
-        )
+    if status_value not in SELLER_TRACK_TRANSITIONS:
+        return Response({'error': 'Invalid status value.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        order_ids = {uuid.UUID(str(order_id)) for order_id in order_ids}
+    except ValueError:
+        return Response({'error': 'Invalid order id.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    order.save()
+    updated = set(apply_transition(SELLER_TRACK_TRANSITIONS[status_value], Order.objects.filter(id__in=order_ids, seller=seller)))
 
-    serializer = OrderSerializer(order, context={'request': request})
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return Response({
+        'updated': sorted(str(order_id) for order_id in updated),
+        'skipped': sorted(str(order_id) for order_id in order_ids - updated),
+    }, status=status.HTTP_200_OK)
 
 # ---------------------------
 # ORDER CONFIRM VIEW - BUYER
@@ -277,19 +478,10 @@ def confirm_delivery(request, order_id):
     if order.is_escrow_released:
         return Response({'error': 'Escrow has already been released for this order.'}, status=status.HTTP_400_BAD_REQUEST)
     
-    order.status = OrderStatus.COMPLETED
-    order.track_status = OrderStatus.COMPLETED
-    order.is_escrow_released = True
-    order.escrow_released_at = timezone.now()
-
-    OrderEmailDispatcher.dispatcher(
-        order=order,
-        event=OrderEmailEvent.ORDER_COMPLETED
-    )
+    if not apply_transition('complete', Order.objects.filter(id=order.id)):
+        return Response({'error': 'Order cannot be completed.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    order.save()
-
-    serializer = OrderSerializer(order, context={'request': request})
+    serializer = OrderSerializer(with_order_serializer_data(Order.objects.filter(id=order.id)).get(), context={'request': request})
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 @api_view(['DELETE'])
@@ -302,7 +494,9 @@ def delete_order(request, order_id):
     except Order.DoesNotExist:
         return Response({'error': 'Order not found.'}, status=status.HTTP_404_NOT_FOUND)
     
-    order.delete()
+    with transaction.atomic():
+        release_order_reservations([order.id])
+        order.delete()
     return Response({'message': 'Order deleted successfully.'}, status=status.HTTP_200_OK)
 
 # ---------------------------
@@ -1,8 +1,9 @@
 from django.contrib import admin
 from order.models import Payment
+from .models import PaystackEvent
 @admin.register(Payment)
 class PaymentAdmin(admin.ModelAdmin):
-    list_display = ('buyer', 'order_id_short', 'amount', 'status', 'reference', 'paid_at', 'created_at')
+    list_display = ('buyer', 'order_id_short', 'amount', 'status', 'reference', 'paid_at', 'created_at', 'failure_reason')
     list_filter = ('status', 'created_at')
     search_fields = ('orders__id', 'amount', 'status')  # works for searching by order ID
     date_hierarchy = 'created_at'
@@ -17,3 +18,16 @@ class PaymentAdmin(admin.ModelAdmin):
     order_id_short.short_description = "Order ID"
     order_id_short.admin_order_field = 'orders__id'  # allows searching via related field
 
+
+@admin.register(PaystackEvent)
+class PaystackEventAdmin(admin.ModelAdmin):
+    list_display = ('event', 'reference', 'received_at', 'processed_at', 'attempts', 'last_error')
+    list_filter = ('event', 'processed_at')
+    search_fields = ('reference', 'event_key')
+    readonly_fields = ('event_key', 'event', 'reference', 'payload', 'received_at', 'processed_at', 'attempts', 'last_error')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from payment.webhooks import WEBHOOK_BATCH_SIZE, process_paystack_events
+
+
+class Command(BaseCommand):
+    help = 'Apply stored Paystack webhook events that were not processed yet (run every few minutes as a safety net)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=WEBHOOK_BATCH_SIZE, help='Events applied per transaction')
+
+    def handle(self, *args, **options):
+        processed, failed = process_paystack_events(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Applied {processed} event(s), {failed} failed."))
@@ -0,0 +1,43 @@
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from payment.reconciliation import RECONCILE_PAGE_SIZE, reconcile_payments
+from payment.services import PaystackError
+
+
+class Command(BaseCommand):
+    help = "Match Paystack's successful transactions with local payments and settle the ones we missed (run nightly)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start', type=str, help='First day (YYYY-MM-DD), defaults to yesterday')
+        parser.add_argument('--to', dest='end', type=str, help='Last day (YYYY-MM-DD), defaults to today')
+        parser.add_argument('--dry-run', action='store_true', help='Only report, settle nothing')
+        parser.add_argument('--page-size', type=int, default=RECONCILE_PAGE_SIZE, help='Transactions per Paystack page')
+
+    def _day(self, value, default, at):
+        if not value:
+            return timezone.make_aware(datetime.combine(default, at))
+        try:
+            return timezone.make_aware(datetime.combine(datetime.strptime(value, '%Y-%m-%d').date(), at))
+        except ValueError:
+            raise CommandError(f"Invalid date {value}, expected YYYY-MM-DD")
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        start = self._day(options['start'], today - timedelta(days=1), time.min)
+        end = self._day(options['end'], today, time.max)
+        if start > end:
+            raise CommandError("--from is after --to")
+
+        try:
+            report = reconcile_payments(start, end, settle=not options['dry_run'], page_size=options['page_size'])
+        except PaystackError as e:
+            raise CommandError(str(e))
+
+        for name, count in report['counts'].items():
+            self.stdout.write(f"{name.replace('_', ' ')}: {count}")
+        for name, references in report['samples'].items():
+            self.stdout.write(f"{name.replace('_', ' ')} references: {', '.join(references)}")
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {start.date()} - {end.date()}."))
@@ -1,3 +1,31 @@
+from uuid import uuid4
+
 from django.db import models
 
-# Create your models here.
+
+class PaystackEvent(models.Model):
+    """
+    Raw Paystack webhook deliveries, stored as received. event_key makes a
+    redelivered event a no-op; the processing columns are the only ones
+    ever updated (by payment.webhooks.process_paystack_events).
+    """
+    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    event_key = models.CharField(max_length=100, unique=True)  # "<event>:<data.id>"
+    event = models.CharField(max_length=50)
+    reference = models.CharField(max_length=100, blank=True)
+    payload = models.JSONField()
+    received_at = models.DateTimeField(auto_now_add=True)
+
+    processed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        ordering = ['-received_at']
+        indexes = [
+            models.Index(fields=['processed_at', 'received_at']),  # Pending events scan
+            models.Index(fields=['reference']),
+        ]
+
+    def __str__(self):
+        return f"{self.event} {self.reference or self.event_key}"
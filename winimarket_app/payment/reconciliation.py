@@ -0,0 +1,113 @@
+import logging
+from decimal import Decimal
+
+from order.models import Payment, PaymentStatus
+
+from .services import PaystackError, list_transactions, settle_payment
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# Reconciliation
+# -----------------------------
+# Pages through Paystack's successful transactions for a window. Each page
+# is indexed by reference in memory and looked up locally with one query,
+# so memory stays flat however large the window is. Payments Paystack took
+# that are not successful here are settled with the same code as
+# verify_payment and the webhooks. Most of them come from a closed payment
+# tab, found after the sweeper cancelled the orders: those end up as
+# needs_refund rather than settled.
+
+RECONCILE_PAGE_SIZE = 100
+REPORT_SAMPLE_SIZE = 20  # references kept per finding
+
+
+def _new_report():
+    counts = dict.fromkeys((
+        'paystack_transactions',
+        'matched',
+        'settled',
+        'needs_refund',
+        'unsettled',
+        'amount_mismatch',
+        'unknown_reference',
+        'pending_unpaid',
+    ), 0)
+    return {'counts': counts, 'samples': {}}
+
+
+def _note(report, finding, reference):
+    report['counts'][finding] += 1
+    samples = report['samples'].setdefault(finding, [])
+    if len(samples) < REPORT_SAMPLE_SIZE:
+        samples.append(reference)
+
+
+def _reconcile_page(transactions, report, settle):
+    index = {tx['reference']: tx for tx in transactions if tx.get('reference')}
+    local = {
+        reference: (status, amount)
+        for reference, status, amount in Payment.objects.filter(reference__in=list(index)).values_list(
+            'reference', 'status', 'amount'
+        )
+    }
+
+    for reference, tx in index.items():
+        if reference not in local:
+            _note(report, 'unknown_reference', reference)
+            continue
+
+        status, amount = local[reference]
+        if status == PaymentStatus.SUCCESS:
+            report['counts']['matched'] += 1
+            continue
+        if status == PaymentStatus.NEEDS_REVIEW:
+            _note(report, 'needs_refund', reference)
+            continue
+
+        if Decimal(tx.get('amount') or 0) / 100 != amount:
+            # settle_payment would only fail it; leave it for a person to look at
+            _note(report, 'amount_mismatch', reference)
+            continue
+
+        if not settle:
+            _note(report, 'unsettled', reference)
+            continue
+
+        try:
+            status, _ = settle_payment(reference, tx)
+        except PaystackError as e:
+            logger.warning("Could not settle payment %s: %s", reference, e)
+            _note(report, 'unsettled', reference)
+        else:
+            # NEEDS_REVIEW: some of the orders were cancelled before the money came in
+            _note(report, 'settled' if status == PaymentStatus.SUCCESS else 'needs_refund', reference)
+
+
+def reconcile_payments(start, end, settle=True, page_size=RECONCILE_PAGE_SIZE):
+    """
+    Match Paystack's successful transactions between start and end with
+    the local payments and, unless settle is False, settle the ones still
+    pending or failed here. Returns counts per finding plus a sample of
+    references for each.
+    """
+    report = _new_report()
+    page = 1
+
+    while True:
+        transactions, meta = list_transactions(start, end, page, per_page=page_size)
+        report['counts']['paystack_transactions'] += len(transactions)
+        _reconcile_page(transactions, report, settle)
+
+        page_count = meta.get('pageCount')
+        if not transactions or (page_count is not None and page >= page_count):
+            break
+        page += 1
+
+    # Still pending here and not among Paystack's successes: abandoned checkouts
+    report['counts']['pending_unpaid'] = Payment.objects.filter(
+        status=PaymentStatus.PENDING, created_at__range=(start, end)
+    ).count()
+
+    logger.info("Reconciled payments %s - %s: %s", start.isoformat(), end.isoformat(), report['counts'])
+    return report
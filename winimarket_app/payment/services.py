@@ -0,0 +1,182 @@
+import logging
+from decimal import Decimal
+
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from cart.models import CartItem
+from order.models import Payment, PaymentStatus
+from order.state_machine import apply_transition
+from winimarket_app import http_client
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# Paystack
+# -----------------------------
+# Calls to Paystack happen outside any database transaction; only the local
+# writes that follow are atomic. Verification runs in a background task
+# (payment.tasks) so a slow Paystack never holds a web worker.
+
+PAYSTACK_TIMEOUT = (5, 15)  # connect, read
+
+# Paystack transaction statuses that will not turn into a success any more
+PAYSTACK_FINAL_FAILURES = ('failed', 'abandoned', 'reversed')
+
+# Local statuses of payments whose money has been taken; never settled again
+SETTLED_STATUSES = (PaymentStatus.SUCCESS, PaymentStatus.NEEDS_REVIEW)
+
+
+class PaystackError(Exception):
+    """
+    Paystack could not be reached or answered with an error; worth retrying.
+    """
+
+
+class PaystackPending(PaystackError):
+    """
+    Paystack has not settled the transaction yet.
+    """
+
+
+def _paystack_headers():
+    return {
+        "Authorization": f"Bearer {settings.PAYSTACK_TESTED_SECRET_API_KEY}",
+        "Content-Type": "application/json",
+    }
+
+
+def _paystack_url(path):
+    return f"{settings.PAYSTACK_BASE_URL.rstrip('/')}/{path.lstrip('/')}"
+
+
+def initialize_transaction(payload):
+    """
+    Start a Paystack transaction and return its data (authorization_url,
+    access_code, reference). Raises PaystackError.
+    """
+    try:
+        response = http_client.post(
+            _paystack_url('transaction/initialize'), json=payload, headers=_paystack_headers(), timeout=PAYSTACK_TIMEOUT
+        )
+    except requests.RequestException as e:
+        raise PaystackError(f"Paystack unreachable: {e}") from e
+
+    if response.status_code != 200:
+        raise PaystackError(f"Paystack initialize returned {response.status_code}")
+    return response.json()['data']
+
+
+def fetch_transaction(reference):
+    """
+    Paystack's view of a transaction. Raises PaystackError.
+    """
+    try:
+        response = http_client.get(
+            _paystack_url(f'transaction/verify/{reference}'), headers=_paystack_headers(), timeout=PAYSTACK_TIMEOUT
+        )
+    except requests.RequestException as e:
+        raise PaystackError(f"Paystack unreachable: {e}") from e
+
+    if response.status_code != 200:
+        raise PaystackError(f"Paystack verify returned {response.status_code}")
+    return response.json().get('data') or {}
+
+
+def list_transactions(start, end, page, per_page=100, status='success'):
+    """
+    One page of Paystack's transaction list for [start, end], as
+    (transactions, meta). Raises PaystackError.
+    """
+    params = {'from': start.isoformat(), 'to': end.isoformat(), 'page': page, 'perPage': per_page}
+    if status:
+        params['status'] = status
+
+    try:
+        response = http_client.get(
+            _paystack_url('transaction'), params=params, headers=_paystack_headers(), timeout=PAYSTACK_TIMEOUT
+        )
+    except requests.RequestException as e:
+        raise PaystackError(f"Paystack unreachable: {e}") from e
+
+    if response.status_code != 200:
+        raise PaystackError(f"Paystack transaction list returned {response.status_code}")
+    body = response.json()
+    return body.get('data') or [], body.get('meta') or {}
+
+
+def _mark_failed(payment, reason):
+    Payment.objects.filter(pk=payment.pk).exclude(status__in=SETTLED_STATUSES).update(
+        status=PaymentStatus.FAILED, failure_reason=reason
+    )
+    logger.warning("Payment %s failed: %s", payment.reference, reason)
+    return PaymentStatus.FAILED, []
+
+
+def settle_payment(reference, transaction_data):
+    """
+    Apply Paystack's transaction data to the local payment: on a success
+    for the right amount its pending orders are paid (stock committed,
+    buyer and seller notified), the buyer's cart is emptied and the
+    payment is marked successful. Safe to call more than once.
+
+    When some of the orders can no longer be paid (the sweeper cancelled
+    them before the money came in) the payment is marked NEEDS_REVIEW
+    with the reason instead, so it gets refunded or sorted out by hand.
+
+    The orders of a multi-order checkout move together (one UPDATE, one
+    notification batch), so the query count does not grow with them.
+    Returns (payment status, ids of the orders this call paid).
+    """
+    with transaction.atomic():
+        payment = Payment.objects.select_for_update().get(reference=reference)
+        if payment.status in SETTLED_STATUSES:
+            return payment.status, []
+
+        paystack_status = transaction_data.get('status')
+        if paystack_status in PAYSTACK_FINAL_FAILURES:
+            return _mark_failed(payment, f"Paystack status {paystack_status}")
+        if paystack_status != 'success':
+            raise PaystackPending(f"Paystack status {paystack_status}")
+
+        paid_amount = Decimal(transaction_data['amount']) / 100
+        if paid_amount != payment.amount:
+            return _mark_failed(payment, f"Amount mismatch: paid {paid_amount}, expected {payment.amount}")
+
+        orders = payment.orders.filter(buyer_id=payment.buyer_id)
+        order_statuses = dict(orders.values_list('id', 'status'))
+        paid_ids = apply_transition('pay', orders)
+        unpaid = {order_id: order_status for order_id, order_status in order_statuses.items() if order_id not in paid_ids}
+
+        if paid_ids:
+            CartItem.objects.filter(cart__buyer_id=payment.buyer_id).delete()
+
+        payment.paid_at = timezone.now()
+        if unpaid or not paid_ids:
+            payment.status = PaymentStatus.NEEDS_REVIEW
+            payment.failure_reason = (
+                f"Paid, but {len(unpaid)} of {len(order_statuses)} order(s) could not be paid: "
+                + ", ".join(f"{order_id} ({order_status})" for order_id, order_status in unpaid.items())
+            )[:255]
+            logger.error("Payment %s needs a refund or review: %s", payment.reference, payment.failure_reason)
+        else:
+            payment.status = PaymentStatus.SUCCESS
+            payment.failure_reason = ''
+        payment.save(update_fields=['status', 'paid_at', 'failure_reason'])
+
+    return payment.status, paid_ids
+
+
+def verify_payment_reference(reference):
+    """
+    Ask Paystack about the transaction, then settle it locally.
+    Raises PaystackError (PaystackPending) when it should be retried later.
+    """
+    status = Payment.objects.filter(reference=reference).values_list('status', flat=True).first()
+    if status is None or status in SETTLED_STATUSES:
+        return status
+
+    status, _ = settle_payment(reference, fetch_transaction(reference))
+    return status
@@ -0,0 +1,44 @@
+import logging
+
+from .services import PaystackError, verify_payment_reference
+from .webhooks import process_paystack_events
+
+logger = logging.getLogger(__name__)
+
+try:
+    from celery import shared_task
+except ImportError:
+    shared_task = None  # Celery not installed or not used in prod
+
+
+def _verify_payment_task(*, reference):
+    return verify_payment_reference(reference)
+
+if shared_task:
+    @shared_task(bind=True, max_retries=5)
+    def verify_payment_task(self, **kwargs):
+        try:
+            return _verify_payment_task(**kwargs)
+        except PaystackError as exc:
+            logger.warning("Payment verification will be retried: %s", exc)
+            raise self.retry(exc=exc, countdown=10 * (self.request.retries + 1))
+else:
+    def verify_payment_task(**kwargs):
+        return _verify_payment_task(**kwargs)
+
+
+def _process_paystack_events_task():
+    processed, failed = process_paystack_events()
+    return f"{processed} Paystack events applied, {failed} failed"
+
+if shared_task:
+    @shared_task(bind=True, max_retries=3)
+    def process_paystack_events_task(self, **kwargs):
+        try:
+            return _process_paystack_events_task(**kwargs)
+        except Exception as exc:
+            logger.exception("Paystack event processing failed")
+            raise self.retry(exc=exc, countdown=30)
+else:
+    def process_paystack_events_task(**kwargs):
+        return _process_paystack_events_task(**kwargs)
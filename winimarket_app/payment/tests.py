@@ -1,3 +1,396 @@
-from django.test import TestCase
+import hashlib
+import hmac
+import json
+import threading
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
 
-# Create your tests here.
+from django.conf import settings
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from cart.models import CartItem, get_active_cart
+from order.models import Order, OrderItem, OrderStatus, Payment, PaymentStatus
+from order.state_machine import apply_transition
+from order.tasks import expire_pending_orders
+from winimarket_app import http_client
+from winimarket_app.testing import make_products, make_user
+
+from .models import PaystackEvent
+from .reconciliation import reconcile_payments
+from .services import PaystackError, PaystackPending, settle_payment
+from .tasks import _verify_payment_task
+from .views import initialize_payment, payment_status, verify_payment
+from .webhooks import process_paystack_events
+
+
+class PaystackStub(BaseHTTPRequestHandler):
+    """
+    Local stand-in for the Paystack endpoints the app calls. The outcome
+    of each reference is set in `transactions` before verifying; the
+    transaction list pages through the successful ones.
+    """
+    transactions = {}
+    calls = []
+
+    def _reply(self, code, body):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        self.calls.append(self.path)
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self._reply(200, {'status': True, 'data': {
+            'authorization_url': f"https://checkout.paystack.test/{body['reference']}",
+            'access_code': uuid.uuid4().hex,
+            'reference': body['reference'],
+        }})
+
+    def _list(self, query):
+        per_page, page = int(query['perPage'][0]), int(query['page'][0])
+        successes = [
+            {'reference': reference, **outcome}
+            for reference, outcome in sorted(self.transactions.items()) if outcome['status'] == 'success'
+        ]
+        self._reply(200, {
+            'status': True,
+            'data': successes[(page - 1) * per_page:page * per_page],
+            'meta': {'total': len(successes), 'page': page, 'perPage': per_page, 'pageCount': -(-len(successes) // per_page)},
+        })
+
+    def do_GET(self):
+        self.calls.append(self.path)
+        url = urlsplit(self.path)
+        if url.path.rstrip('/') == '/transaction':
+            return self._list(parse_qs(url.query))
+        reference = self.path.rstrip('/').rsplit('/', 1)[-1]
+        outcome = self.transactions.get(reference)
+        if outcome is None:
+            return self._reply(500, {'status': False, 'message': 'Stub error'})
+        self._reply(200, {'status': True, 'data': {'reference': reference, **outcome}})
+
+    def log_message(self, *args):
+        pass
+
+
+class PaystackStubTestCase(TestCase):
+    """
+    Runs the PaystackStub server for the class and points PAYSTACK_BASE_URL
+    at it.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), PaystackStub)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.addClassCleanup(cls.server.server_close)
+        cls.addClassCleanup(cls.server.shutdown)
+        cls.enterClassContext(override_settings(PAYSTACK_BASE_URL=f"http://127.0.0.1:{cls.server.server_port}"))
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = make_user('seller')
+        cls.product = make_products(cls.seller, 1)[0]
+        cls.product.quantity = 100
+        cls.product.save(update_fields=['quantity'])
+
+    def setUp(self):
+        PaystackStub.transactions = {}
+        PaystackStub.calls = []
+        # Breakers and pooled connections are per process
+        http_client.reset()
+
+    def pending_order(self, buyer=None, seller=None, product=None):
+        buyer = buyer or make_user()
+        order = Order.objects.create(buyer=buyer.profile, seller=(seller or self.seller).profile.seller_profile)
+        product = product or self.product
+        OrderItem.objects.create(order=order, product=product, quantity=2, price=product.price)
+        return order
+
+    def call(self, view, user, method='post', data=None, **kwargs):
+        request = getattr(APIRequestFactory(), method)('/', data or {}, format='json')
+        force_authenticate(request, user=user)
+        return view(request, **kwargs)
+
+    def initialized_payment(self, *orders):
+        orders = orders or [self.pending_order()]
+        self.call(initialize_payment, orders[0].buyer.user, data={'order_ids': [str(order.id) for order in orders]})
+        return Payment.objects.get(orders=orders[0])
+
+
+class PaymentVerificationTests(PaystackStubTestCase):
+    def test_initialize_creates_the_payment(self):
+        buyer = make_user()
+        order = self.pending_order(buyer)
+        response = self.call(initialize_payment, buyer, data={'order_ids': [str(order.id)]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('authorization_url', response.data)
+        self.assertEqual(Payment.objects.get(orders=order).amount, Decimal('20.00'))
+
+    def test_verify_answers_at_once_and_queues_the_check(self):
+        payment = self.initialized_payment()
+        calls = len(PaystackStub.calls)
+
+        with mock.patch('payment.views.queue_payment_verification') as queue:
+            response = self.call(verify_payment, payment.buyer.user, data={'reference': payment.reference})
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'pending')
+        self.assertEqual(len(PaystackStub.calls), calls)
+        self.assertEqual(queue.call_args.kwargs, {'reference': payment.reference})
+
+    def test_verify_reports_a_failed_payment_without_queueing(self):
+        payment = self.initialized_payment()
+        Payment.objects.filter(pk=payment.pk).update(status=PaymentStatus.FAILED, failure_reason='Amount mismatch')
+
+        with mock.patch('payment.views.queue_payment_verification') as queue:
+            response = self.call(verify_payment, payment.buyer.user, data={'reference': payment.reference})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'failed')
+        self.assertEqual(response.data['error'], 'Amount mismatch')
+        queue.assert_not_called()
+
+    def test_success_settles_the_payment_once(self):
+        payment = self.initialized_payment()
+        order = payment.orders.get()
+
+        PaystackStub.transactions[payment.reference] = {'status': 'ongoing', 'amount': 2000}
+        with self.assertRaises(PaystackPending):
+            _verify_payment_task(reference=payment.reference)
+
+        PaystackStub.transactions[payment.reference] = {'status': 'success', 'amount': 2000}
+        self.assertEqual(_verify_payment_task(reference=payment.reference), PaymentStatus.SUCCESS)
+        order.refresh_from_db()
+        self.assertEqual(order.status, OrderStatus.PAID)
+        self.assertIsNotNone(order.paid_at)
+
+        response = self.call(payment_status, payment.buyer.user, method='get', reference=payment.reference)
+        self.assertEqual(response.data['status'], 'success')
+        self.assertEqual(response.data['orders'], [str(order.id)])
+
+        calls = len(PaystackStub.calls)
+        self.assertEqual(_verify_payment_task(reference=payment.reference), PaymentStatus.SUCCESS)
+        self.assertEqual(len(PaystackStub.calls), calls)
+
+    def test_final_failures_fail_the_payment(self):
+        for outcome in ({'status': 'success', 'amount': 1}, {'status': 'abandoned', 'amount': 2000}):
+            with self.subTest(outcome=outcome):
+                payment = self.initialized_payment()
+                PaystackStub.transactions[payment.reference] = outcome
+                with self.assertLogs('payment.services', 'WARNING'):
+                    _verify_payment_task(reference=payment.reference)
+
+                payment.refresh_from_db()
+                self.assertEqual(payment.status, PaymentStatus.FAILED)
+                self.assertEqual(payment.orders.get().status, OrderStatus.PENDING)
+
+    def test_paystack_error_leaves_the_payment_pending(self):
+        payment = self.initialized_payment()
+        with self.assertRaises(PaystackError):
+            _verify_payment_task(reference=payment.reference)
+
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, PaymentStatus.PENDING)
+
+
+class LateSettlementTests(PaystackStubTestCase):
+    """
+    The money comes in after the sweeper cancelled the pending orders.
+    """
+
+    def test_payment_for_cancelled_orders_needs_review(self):
+        payment = self.initialized_payment()
+        order = payment.orders.get()
+        apply_transition('cancel', Order.objects.filter(pk=order.pk))
+
+        with self.assertLogs('payment.services', 'ERROR'):
+            self.assertEqual(
+                settle_payment(payment.reference, {'status': 'success', 'amount': 2000}),
+                (PaymentStatus.NEEDS_REVIEW, []),
+            )
+
+        payment.refresh_from_db()
+        order.refresh_from_db()
+        self.assertEqual(order.status, OrderStatus.CANCELLED)
+        self.assertIn(str(order.id), payment.failure_reason)
+
+        # Settled for good: neither verify nor a redelivered webhook touches it again
+        self.assertEqual(settle_payment(payment.reference, {'status': 'success', 'amount': 2000}), (PaymentStatus.NEEDS_REVIEW, []))
+        with mock.patch('payment.views.queue_payment_verification') as queue:
+            response = self.call(verify_payment, payment.buyer.user, data={'reference': payment.reference})
+        queue.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], PaymentStatus.NEEDS_REVIEW)
+        self.assertIn('refund', response.data['error'])
+
+    def test_partly_cancelled_checkout_pays_the_rest_and_needs_review(self):
+        buyer = make_user()
+        kept, expired = self.pending_order(buyer), self.pending_order(buyer, make_user('seller'))
+        payment = self.initialized_payment(kept, expired)
+        apply_transition('cancel', Order.objects.filter(pk=expired.pk))
+
+        with self.assertLogs('payment.services', 'ERROR'):
+            status, paid = settle_payment(payment.reference, {'status': 'success', 'amount': 4000})
+
+        self.assertEqual((status, paid), (PaymentStatus.NEEDS_REVIEW, [kept.id]))
+        self.assertEqual(Order.objects.get(pk=kept.pk).status, OrderStatus.PAID)
+        self.assertEqual(Order.objects.get(pk=expired.pk).status, OrderStatus.CANCELLED)
+
+
+@override_settings(PAYSTACK_TESTED_SECRET_API_KEY='sk_test_webhooks')
+class PaystackWebhookTests(PaystackStubTestCase):
+    def webhook(self, payload, secret=None):
+        body = json.dumps(payload).encode()
+        key = (secret or settings.PAYSTACK_TESTED_SECRET_API_KEY).encode()
+        signature = hmac.new(key, body, hashlib.sha512).hexdigest()
+        return Client().post(
+            '/payment/paystack-webhook/', body, content_type='application/json', HTTP_X_PAYSTACK_SIGNATURE=signature
+        )
+
+    def charge_success(self, payment, event_id=4242):
+        return {
+            'event': 'charge.success',
+            'data': {'id': event_id, 'reference': payment.reference, 'status': 'success', 'amount': 2000},
+        }
+
+    def test_bad_signature_is_rejected(self):
+        payment = self.initialized_payment()
+        with mock.patch('payment.views.queue_paystack_event_processing') as queue:
+            response = self.webhook(self.charge_success(payment), secret='wrong')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(PaystackEvent.objects.exists())
+        queue.assert_not_called()
+
+    def test_nothing_is_accepted_without_a_secret_key(self):
+        payment = self.initialized_payment()
+        with override_settings(PAYSTACK_TESTED_SECRET_API_KEY=''), \
+                mock.patch('payment.views.queue_paystack_event_processing') as queue, \
+                self.assertLogs('payment.webhooks', 'ERROR'):
+            # Signed with the empty key, as anyone could
+            response = self.webhook(self.charge_success(payment))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(PaystackEvent.objects.exists())
+        queue.assert_not_called()
+
+    def test_event_is_stored_once_and_applied_in_the_background(self):
+        payment = self.initialized_payment()
+        payload = self.charge_success(payment)
+
+        with mock.patch('payment.views.queue_paystack_event_processing') as queue:
+            first, second = self.webhook(payload), self.webhook(payload)
+
+        self.assertEqual((first.status_code, second.status_code), (200, 200))
+        self.assertEqual(PaystackEvent.objects.filter(reference=payment.reference).count(), 1)
+        self.assertEqual(queue.call_count, 1)
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, PaymentStatus.PENDING)
+
+        self.assertEqual(process_paystack_events(), (1, 0))
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, PaymentStatus.SUCCESS)
+        self.assertEqual(payment.orders.get().status, OrderStatus.PAID)
+        self.assertEqual(process_paystack_events(), (0, 0))
+
+
+class PaymentReconciliationTests(PaystackStubTestCase):
+    def setUp(self):
+        super().setUp()
+        success = {'status': 'success', 'amount': 2000}
+
+        self.matched = self.initialized_payment()
+        PaystackStub.transactions[self.matched.reference] = success
+        _verify_payment_task(reference=self.matched.reference)
+
+        self.missed = [self.initialized_payment() for _ in range(3)]
+        Payment.objects.filter(pk=self.missed[0].pk).update(status=PaymentStatus.FAILED, failure_reason='Verification gave up')
+        for payment in self.missed:
+            PaystackStub.transactions[payment.reference] = success
+
+        self.wrong_amount = self.initialized_payment()
+        PaystackStub.transactions[self.wrong_amount.reference] = {'status': 'success', 'amount': 1}
+        PaystackStub.transactions['not-ours'] = success
+        self.unpaid = self.initialized_payment()
+
+        now = timezone.now()
+        self.window = (now - timedelta(days=1), now + timedelta(minutes=1))
+
+    def test_dry_run_reports_without_settling(self):
+        report = reconcile_payments(*self.window, settle=False, page_size=2)
+
+        self.assertEqual(report['counts']['unsettled'], 3)
+        self.assertFalse(Payment.objects.filter(pk__in=[p.pk for p in self.missed], status=PaymentStatus.SUCCESS).exists())
+
+    def test_settles_what_paystack_took(self):
+        calls = len(PaystackStub.calls)
+        report = reconcile_payments(*self.window, page_size=2)
+        counts = report['counts']
+
+        self.assertEqual(len(PaystackStub.calls) - calls, 3)  # 6 transactions, 2 per page
+        self.assertEqual(counts['paystack_transactions'], 6)
+        self.assertEqual(counts['matched'], 1)
+        self.assertEqual(counts['settled'], 3)
+        self.assertCountEqual(report['samples']['settled'], [p.reference for p in self.missed])
+        self.assertEqual(report['samples']['amount_mismatch'], [self.wrong_amount.reference])
+        self.assertEqual(report['samples']['unknown_reference'], ['not-ours'])
+        self.assertEqual(counts['pending_unpaid'], 2)  # the unpaid one and the amount mismatch
+        self.assertFalse(Order.objects.filter(payments__in=self.missed).exclude(status=OrderStatus.PAID).exists())
+
+        report = reconcile_payments(*self.window, page_size=2)
+        self.assertEqual(report['counts']['settled'], 0)
+        self.assertEqual(report['counts']['matched'], 4)
+
+
+    def test_closed_tab_found_after_the_sweep_needs_a_refund(self):
+        # Nobody came back from Paystack and the sweeper cancelled the orders
+        expire_pending_orders(now=timezone.now() + timedelta(hours=1))
+        self.assertFalse(Order.objects.filter(payments__in=self.missed, status=OrderStatus.PENDING).exists())
+
+        with self.assertLogs('payment.services', 'ERROR'):
+            report = reconcile_payments(*self.window, page_size=2)
+
+        self.assertEqual(report['counts']['settled'], 0)
+        self.assertEqual(report['counts']['needs_refund'], 3)
+        self.assertCountEqual(report['samples']['needs_refund'], [p.reference for p in self.missed])
+        self.assertFalse(Payment.objects.filter(pk__in=[p.pk for p in self.missed]).exclude(status=PaymentStatus.NEEDS_REVIEW).exists())
+        self.assertFalse(Order.objects.filter(payments__in=self.missed, status=OrderStatus.PAID).exists())
+
+        # Still reported by later runs until someone deals with them
+        report = reconcile_payments(*self.window, page_size=2)
+        self.assertEqual(report['counts']['needs_refund'], 3)
+
+class MultiOrderSettlementTests(PaystackStubTestCase):
+    def settle_checkout(self, order_count):
+        buyer = make_user()
+        orders = []
+        for _ in range(order_count):
+            seller = make_user('seller')
+            product = make_products(seller, 1)[0]
+            orders.append(self.pending_order(buyer, seller, product))
+            CartItem.objects.create(cart=get_active_cart(buyer.profile), product=product, quantity=2)
+
+        payment = self.initialized_payment(*orders)
+        with CaptureQueriesContext(connection) as queries:
+            settle_payment(payment.reference, {'status': 'success', 'amount': 2000 * order_count})
+
+        self.assertEqual(Order.objects.filter(id__in=[order.id for order in orders], status=OrderStatus.PAID).count(), order_count)
+        self.assertFalse(CartItem.objects.filter(cart__buyer=buyer.profile).exists())
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_the_orders(self):
+        self.assertEqual(self.settle_checkout(1), self.settle_checkout(6))
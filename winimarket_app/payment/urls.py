@@ -7,5 +7,6 @@ urlpatterns = [
     # API FOR PAYMENTS
     path('initialize-payment/', views.initialize_payment, name='initialize_payment'),
     path('verify-payment/', views.verify_payment, name='verify_payment'),
+    path('status/<str:reference>/', views.payment_status, name='payment_status'),
     path('paystack-webhook/', views.paystack_webhook, name='paystack_webhook'),
 ]
\ No newline at end of file
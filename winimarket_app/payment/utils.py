@@ -0,0 +1,27 @@
+from django.conf import settings
+
+from order.emails.enqueue import enqueue_task
+from .tasks import process_paystack_events_task, verify_payment_task
+
+
+def queue_payment_verification(**payload):
+    """
+    Decide where to send the payment verification task.
+    - Local dev → Celery
+    - Production → Cloud Tasks
+    """
+    if getattr(settings, "USE_CLOUD_TASKS", False):
+        enqueue_task("verify_payment_task", payload)
+    else:
+        verify_payment_task.delay(**payload)
+
+def queue_paystack_event_processing():
+    """
+    Decide where to send the Paystack webhook processing task.
+    - Local dev → Celery
+    - Production → Cloud Tasks
+    """
+    if getattr(settings, "USE_CLOUD_TASKS", False):
+        enqueue_task("process_paystack_events_task", {})
+    else:
+        process_paystack_events_task.delay()
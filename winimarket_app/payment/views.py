@@ -12,21 +12,32 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.utils import timezone
 from datetime import timedelta
 
-from order.models import Order, Payment, OrderStatus, PaymentStatus, OrderTrackingStatus
+from order.models import Order, OrderItem, Payment, OrderStatus, PaymentStatus, OrderTrackingStatus
 
-import requests
-import hashlib
+import json
+import logging
 from django.conf import settings
+from django.views.decorators.http import require_POST
 from decimal import Decimal
 from cart.models import Cart, CartItem
 
 from order.emails.dispatcher import OrderEmailDispatcher
+from order.state_machine import apply_transition
 from order.constants.email_event import OrderEmailEvent
 from django.db import transaction
+from django.urls import reverse
+
+from .services import PaystackError, initialize_transaction
+from .utils import queue_payment_verification, queue_paystack_event_processing
+from .webhooks import record_event, valid_signature
+
+logger = logging.getLogger(__name__)
+
+# Seconds the client should wait between two payment status polls
+PAYMENT_STATUS_POLL_SECONDS = 2
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@transaction.atomic
 def initialize_payment(request):
     buyer = request.user.profile
     order_ids = request.data.get('order_ids', [])
@@ -43,37 +54,37 @@ def initialize_payment(request):
         status=OrderStatus.PENDING
     )
 
-    if not orders.exists():
+    orders = list(orders.only('id', 'total'))
+    if not orders:
         return Response(
             {'error': 'No valid pending orders found'},
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    # Ensure none are already paid / cancelled
+    # Totals are stored on the order, so these checks are two small queries
     for order in orders:
-        if order.total_cost <= 0:
+        if order.total <= 0:
             return Response(
                 {'error': f'Invalid order amount for order {order.id}'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        for item in order.items.all():
-            if item.product is None:
-                return Response(
-                    {'error': f'Order {order.id} contains deleted products.'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-    total_amount = sum(order.total_cost for order in orders)
+
+    deleted_product_order = (
+        OrderItem.objects.filter(order__in=orders, product__isnull=True)
+        .values_list('order_id', flat=True)
+        .first()
+    )
+    if deleted_product_order:
+        return Response(
+            {'error': f'Order {deleted_product_order} contains deleted products.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    total_amount = sum(order.total for order in orders)
     amount_kobo = int(total_amount * 100)
 
     reference = f"multi-order-{buyer.id}-{int(timezone.now().timestamp())}"
 
-    headers = {
-        "Authorization": f"Bearer {settings.PAYSTACK_TESTED_SECRET_API_KEY}",
-        "Content-Type": "application/json",
-    }
-
     payload = {
         "email": request.user.email,
         "amount": amount_kobo,
@@ -88,159 +99,114 @@ def initialize_payment(request):
         }
     }
 
+    # No transaction is open while waiting on Paystack
     try:
-        response = requests.post(
-            "https://api.paystack.co/transaction/initialize",
-            json=payload,
-            headers=headers,
-            timeout=30
-        )
-    except requests.RequestException:
+        data = initialize_transaction(payload)
+    except PaystackError:
         return Response(
-            {'error': 'Payment service unavailable. Please check your connection.'},
+            {'error': 'Failed to initialize payment'},
             status=status.HTTP_503_SERVICE_UNAVAILABLE
         )
 
-    if response.status_code != 200:
-        return Response(
-            {'error': 'Failed to initialize payment'},
-            status=status.HTTP_400_BAD_REQUEST
+    with transaction.atomic():
+        payment = Payment.objects.create(
+            buyer=buyer,
+            amount=total_amount,
+            reference=reference,
+            status=PaymentStatus.PENDING
         )
 
-    payment = Payment.objects.create(
-        buyer=buyer,
-        amount=total_amount,
-        reference=reference,
-        status=PaymentStatus.PENDING
-    )
+        payment.orders.set(orders)
 
-    payment.orders.set(orders)
+    return Response(data, status=status.HTTP_200_OK)
 
-    return Response(response.json()['data'], status=status.HTTP_200_OK)
+def _payment_status_data(payment):
+    data = {
+        'reference': payment.reference,
+        'status': payment.status,
+        'orders': [str(order_id) for order_id in payment.orders.values_list('id', flat=True)],
+    }
+    if payment.status == PaymentStatus.FAILED:
+        data['error'] = payment.failure_reason or 'Payment not successful'
+    elif payment.status == PaymentStatus.NEEDS_REVIEW:
+        data['error'] = (
+            'We received your payment, but your order expired before it was confirmed. '
+            'We will refund you or get in touch shortly.'
+        )
+    return data
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def verify_payment(request):
     """
-    Verify Paystack payment for multi-order checkout
+    Queue the Paystack verification of a multi-order checkout and answer
+    straight away: 200 with the final status when it is already known,
+    else 202 "pending" and a status_url to poll.
     """
-    order_ids = request.data.get('order_ids', [])
     reference = request.data.get('reference')
 
-    if not order_ids or not reference:
+    if not reference:
         return Response(
-            {'error': 'order_ids and reference are required'},
+            {'error': 'reference is required'},
             status=status.HTTP_400_BAD_REQUEST
         )
 
     buyer = request.user.profile
 
-    # Get payment
     try:
-        payment = Payment.objects.select_related('buyer').get(
-            reference=reference,
-            buyer=buyer
-        )
+        payment = Payment.objects.get(reference=reference, buyer=buyer)
     except Payment.DoesNotExist:
         return Response({'error': 'Payment record not found'}, status=status.HTTP_404_NOT_FOUND)
 
-    if payment.status == PaymentStatus.SUCCESS:
-        return Response({
-            'message': 'Payment already verified'
-        }, status=status.HTTP_200_OK)
-
-    # Verify with Paystack
-    headers = {
-        "Authorization": f"Bearer {settings.PAYSTACK_TESTED_SECRET_API_KEY}",
-        "Content-Type": "application/json",
-    }
-
-    try:
-        response = requests.get(
-            f"https://api.paystack.co/transaction/verify/{reference}",
-            headers=headers,
-            timeout=30
-        )
-    except requests.RequestException:
-        return Response(
-            {'error': 'Payment service unavailable'},
-            status=status.HTTP_503_SERVICE_UNAVAILABLE
-        )
-
-    if response.status_code != 200:
-        return Response({'error': 'Unable to verify payment'}, status=status.HTTP_400_BAD_REQUEST)
-
-    data = response.json().get('data')
+    # Settled, failed or refunded: nothing left to verify
+    if payment.status != PaymentStatus.PENDING:
+        return Response(_payment_status_data(payment), status=status.HTTP_200_OK)
 
-    if not data or data.get('status') != 'success':
-        return Response({'error': 'Payment not successful'}, status=status.HTTP_400_BAD_REQUEST)
+    queue_payment_verification(reference=reference)
 
-    paid_amount = Decimal(data['amount']) / 100
-
-    if paid_amount != payment.amount:
-        return Response({'error': 'Payment amount mismatch'}, status=status.HTTP_400_BAD_REQUEST)
-
-    # ✅ Mark payment successful
-    payment.status = PaymentStatus.SUCCESS
-    payment.paid_at = timezone.now()
-    payment.save()
-
-    # ✅ Update all orders
-    orders = Order.objects.filter(
-        id__in=order_ids,
-        buyer=buyer,
-        status=OrderStatus.PENDING
-    )
-
-    verified_orders = []
-
-    for order in orders:
-        order.status = OrderStatus.PAID
-        order.track_status = OrderTrackingStatus.PROCESSING
-        order.paid_at = timezone.now()
-        order.save()
-        verified_orders.append(str(order.id))
-
-        OrderEmailDispatcher.dispatcher(
-            order=order,
-            event=OrderEmailEvent.ORDER_PAID
-        )
+    data = _payment_status_data(payment)
+    data['status_url'] = reverse('payment:payment_status', args=[reference])
+    return Response(data, status=status.HTTP_202_ACCEPTED, headers={'Retry-After': str(PAYMENT_STATUS_POLL_SECONDS)})
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def payment_status(request, reference):
+    """
+    Polled by the payment page after verify_payment: one indexed lookup.
+    """
     try:
-        cart = Cart.objects.get(buyer=buyer)
-    except Cart.DoesNotExist:
-        return Response({'error': 'Cart not found.'}, status=status.HTTP_404_NOT_FOUND)
-    
-    cart_items = CartItem.objects.select_related('product', 'product__seller').filter(cart=cart)
-    
-    cart_items.delete()
-    
-    return Response({
-        'message': 'Payment verified successfully',
-        'orders': verified_orders
-    }, status=status.HTTP_200_OK)
+        payment = Payment.objects.get(reference=reference, buyer=request.user.profile)
+    except Payment.DoesNotExist:
+        return Response({'error': 'Payment record not found'}, status=status.HTTP_404_NOT_FOUND)
 
+    headers = {}
+    if payment.status == PaymentStatus.PENDING:
+        headers['Retry-After'] = str(PAYMENT_STATUS_POLL_SECONDS)
+    return Response(_payment_status_data(payment), status=status.HTTP_200_OK, headers=headers)
 
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
-def paystack_webhook(request):
-    paystack_signature = request.headers.get('X-Paystack-Signature')
-    payload = request.body
-    hashed = hashlib.sha512(payload + settings.PAYSTACK_TESTED_SECRET_API_KEY.encode()).hexdigest()
 
-    if hashed != paystack_signature:
+@csrf_exempt
+@require_POST
+def paystack_webhook(request):
+    """
+    Paystack calls this without a session: the HMAC signature is the
+    authentication. The event is stored and acknowledged at once, then
+    applied in the background (payment.webhooks).
+    """
+    if not valid_signature(request.body, request.headers.get('X-Paystack-Signature')):
         return JsonResponse({'error': 'Invalid signature'}, status=400)
-    
-    event = request.data
 
-    if event['event'] == 'charge.success':
-        reference = event['data']['reference']
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid payload'}, status=400)
+
+    if record_event(payload):
         try:
-            order = Order.objects.get(payment_reference=reference)
-            order.status = 'paid'
-            order.paid_at = timezone.now()
-            order.save()
-        except Order.DoesNotExist:
-            return JsonResponse({'error': 'Order not found'}, status=404)
-    return JsonResponse({'message': 'Webhook received'}, status=200)
\ No newline at end of file
+            queue_paystack_event_processing()
+        except Exception:
+            # Stored already; the process_paystack_events sweep applies it
+            logger.exception("Could not queue Paystack event processing")
+
+    return JsonResponse({'message': 'Webhook received'}, status=200)
@@ -0,0 +1,121 @@
+import hashlib
+import hmac
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from order.models import Payment
+
+from .models import PaystackEvent
+from .services import settle_payment
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# Paystack webhooks
+# -----------------------------
+# The webhook view only checks the signature and stores the event (one
+# INSERT, redeliveries are ignored by event_key), then queues
+# process_paystack_events(), which applies stored events in batches with
+# the same settlement code as verify_payment.
+
+WEBHOOK_BATCH_SIZE = 100
+MAX_EVENT_ATTEMPTS = 10
+
+
+def valid_signature(body, signature):
+    """
+    Paystack signs the raw body with HMAC-SHA512 of the secret key. With no
+    key configured nothing is valid: anyone can sign with an empty key.
+    """
+    secret = settings.PAYSTACK_TESTED_SECRET_API_KEY
+    if not secret:
+        logger.error("PAYSTACK_TESTED_SECRET_API_KEY is not set, rejecting Paystack webhook")
+        return False
+
+    expected = hmac.new(secret.encode(), body, hashlib.sha512).hexdigest()
+    return hmac.compare_digest(expected, signature or '')
+
+
+def record_event(payload):
+    """
+    Store a webhook payload once. Returns True when it was new.
+    """
+    data = payload.get('data') or {}
+    event = str(payload.get('event', ''))[:50]
+    reference = str(data.get('reference') or '')[:100]
+
+    _, created = PaystackEvent.objects.get_or_create(
+        event_key=f"{event}:{data.get('id') or reference}"[:100],
+        defaults={'event': event, 'reference': reference, 'payload': payload},
+    )
+    return created
+
+
+def _charge_success(event):
+    try:
+        return settle_payment(event.reference, event.payload['data'])
+    except Payment.DoesNotExist:
+        # Not a checkout of ours (or already archived): nothing to apply
+        logger.warning("Paystack event %s for unknown reference %s", event.event_key, event.reference)
+
+
+EVENT_HANDLERS = {
+    'charge.success': _charge_success,
+}
+
+
+def _apply(event):
+    handler = EVENT_HANDLERS.get(event.event)
+    if handler is None:
+        return ''
+    try:
+        handler(event)
+    except Exception as e:
+        logger.exception("Paystack event %s failed", event.event_key)
+        return (str(e) or e.__class__.__name__)[:255]
+    return ''
+
+
+def process_paystack_events(batch_size=WEBHOOK_BATCH_SIZE):
+    """
+    Apply stored, unprocessed events in arrival order, batch by batch.
+    Failed events keep processed_at empty and are retried by the next run
+    until MAX_EVENT_ATTEMPTS. Events another worker holds are skipped.
+    Returns (processed, failed).
+    """
+    processed = failed = 0
+    pending = PaystackEvent.objects.filter(processed_at__isnull=True, attempts__lt=MAX_EVENT_ATTEMPTS)
+    last = None
+
+    while True:
+        batch = pending
+        if last:
+            batch = batch.filter(Q(received_at__gt=last[0]) | Q(received_at=last[0], id__gt=last[1]))
+
+        with transaction.atomic():
+            events = list(batch.select_for_update(skip_locked=True).order_by('received_at', 'id')[:batch_size])
+            if not events:
+                break
+
+            # Each settlement runs in its own savepoint
+            errors = {event.id: _apply(event) for event in events}
+
+            now = timezone.now()
+            done = [event_id for event_id, error in errors.items() if not error]
+            PaystackEvent.objects.filter(id__in=done).update(processed_at=now, attempts=F('attempts') + 1, last_error='')
+
+            for event in events:
+                if errors[event.id]:
+                    PaystackEvent.objects.filter(id=event.id).update(attempts=F('attempts') + 1, last_error=errors[event.id])
+
+        processed += len(done)
+        failed += len(events) - len(done)
+        last = (events[-1].received_at, events[-1].id)
+
+    if processed or failed:
+        logger.info("Applied %s Paystack event(s), %s failed", processed, failed)
+    return processed, failed
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.core.exceptions import ValidationError
 from django.utils.html import format_html
-from .models import Category, Product, ProductImage, Review, ContactClick, ProductView
+from .models import Category, Product, ProductImage, Review, ContactClick, ProductView, ProductImportJob
 
 # ========== CATEGORY ADMIN ==========
 @admin.register(Category)
@@ -171,4 +171,12 @@ class ProductImageAdmin(admin.ModelAdmin):
 class ReviewAdmin(admin.ModelAdmin):
     list_display = ("product", "reviewer", "ratings")
     list_filter = ("ratings",)
-    search_fields = ("product__name", "reviewer__full_name")
\ No newline at end of file
+    search_fields = ("product__name", "reviewer__full_name")
+
+@admin.register(ProductImportJob)
+class ProductImportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "seller", "status", "processed_rows", "created_count", "error_count", "created_at", "finished_at")
+    list_filter = ("status", "created_at")
+    search_fields = ("seller__store_name",)
+    readonly_fields = ("total_rows", "processed_rows", "created_count", "error_count", "errors", "detail", "started_at", "finished_at")
+    ordering = ("-created_at",)
@@ -0,0 +1,98 @@
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+
+from .models import Product, ProductImage
+
+# -----------------------------
+# Product cards
+# -----------------------------
+# A card is the small, request-independent dict needed to render a product
+# tile (feed, cart, recently viewed...). Cards are cached per product so a
+# list of ids can be hydrated with one cache multi-get plus one query for misses.
+
+CARD_CACHE_TIMEOUT = 60 * 15  # 15 minutes
+
+CARD_FIELDS = (
+    'id', 'name', 'slug', 'price', 'min_price', 'max_price', 'quantity',
+    'condition', 'is_active', 'category__name', 'seller_id', 'seller__store_name',
+    'seller__is_verified',
+)
+
+
+def card_cache_key(product_id):
+    return f"product_card:{product_id}"
+
+
+def _storage_url(name):
+    return default_storage.url(name) if name else None
+
+
+def build_cards(product_ids):
+    """
+    Build cards straight from the database: one values() query for the
+    products and one for their images. Returns {str(product_id): card}.
+    """
+    if not product_ids:
+        return {}
+
+    rows = Product.objects.filter(id__in=product_ids).values(*CARD_FIELDS)
+
+    images = {}
+    image_rows = (
+        ProductImage.objects
+        .filter(product_id__in=product_ids)
+        .order_by('product_id', '-is_primary', '-uploaded_at')
+        .values('product_id', 'image', 'thumbnail', 'medium')
+    )
+    for image in image_rows:
+        # First row per product wins: the primary image, or the newest one
+        images.setdefault(image['product_id'], image)
+
+    cards = {}
+    for row in rows:
+        image = images.get(row['id'], {})
+        cards[str(row['id'])] = {
+            'id': str(row['id']),
+            'name': row['name'],
+            'slug': row['slug'],
+            'price': str(row['price']),
+            'min_price': str(row['min_price']),
+            'max_price': str(row['max_price']),
+            'condition': row['condition'],
+            'is_available': row['quantity'] > 0 and row['is_active'],
+            'category_name': row['category__name'],
+            'seller': {
+                'id': str(row['seller_id']),
+                'store_name': row['seller__store_name'],
+                'is_verified': row['seller__is_verified'],
+            },
+            'image': _storage_url(image.get('medium') or image.get('image')),
+            'thumbnail': _storage_url(image.get('thumbnail')),
+            'url': f"/product/detail/{row['id']}/{row['slug']}/",
+        }
+
+    return cards
+
+
+def get_product_cards(product_ids):
+    """
+    Return the cards for product_ids in the given order, skipping products
+    that no longer exist. Uses a single cache multi-get and builds only the misses.
+    """
+    product_ids = [str(pk) for pk in product_ids]
+    keys = {card_cache_key(pk): pk for pk in product_ids}
+
+    cached = cache.get_many(keys.keys())
+    cards = {keys[key]: card for key, card in cached.items()}
+
+    missing = [pk for pk in product_ids if pk not in cards]
+    if missing:
+        built = build_cards(missing)
+        cache.set_many({card_cache_key(pk): card for pk, card in built.items()}, CARD_CACHE_TIMEOUT)
+        cards.update(built)
+
+    return [cards[pk] for pk in product_ids if pk in cards]
+
+
+def invalidate_product_cards(product_ids):
+    cache.delete_many([card_cache_key(pk) for pk in product_ids])
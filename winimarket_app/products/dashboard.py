@@ -0,0 +1,84 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from order.models import ArchivedOrder, OrderStatus, OrderTrackingStatus
+from registration.models import SellerProfile
+
+from .models import Product
+
+# -----------------------------
+# Seller dashboard stats
+# -----------------------------
+# Computed with a single conditional-aggregate query (plus one over the
+# archived orders) and cached briefly per seller. Order/product signals drop
+# the entry on changes, the timeout covers bulk updates that bypass signals.
+
+DASHBOARD_STATS_TIMEOUT = 60
+
+
+def dashboard_stats_cache_key(seller_id):
+    return f"seller_dashboard_stats:{seller_id}"
+
+
+def invalidate_seller_dashboard_stats(seller_ids):
+    cache.delete_many([dashboard_stats_cache_key(seller_id) for seller_id in seller_ids if seller_id])
+
+
+def _order_count(**filters):
+    condition = Q(**{f'seller_orders__{field}': value for field, value in filters.items()})
+    return Count('seller_orders', filter=condition, distinct=True)
+
+
+def compute_seller_dashboard_stats(seller_id):
+    product_count = (
+        Product.objects.filter(seller=OuterRef('pk'))
+        .order_by()
+        .values('seller')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+
+    stats = (
+        SellerProfile.objects.filter(pk=seller_id)
+        .annotate(
+            total_products=Coalesce(Subquery(product_count, output_field=IntegerField()), Value(0)),
+            total_orders=Count('seller_orders', distinct=True),
+            pending_orders=_order_count(status=OrderStatus.PENDING),
+            paid_orders=_order_count(status=OrderStatus.PAID),
+            shipped_orders=_order_count(track_status=OrderTrackingStatus.SHIPPED),
+            delivered_orders=_order_count(track_status=OrderTrackingStatus.DELIVERED),
+            complete_orders=_order_count(track_status=OrderTrackingStatus.COMPLETED),
+            total_earnings=Coalesce(
+                Sum('seller_orders__total', filter=Q(seller_orders__is_escrow_released=True)),
+                Value(Decimal('0.00')),
+            ),
+        )
+        .values(
+            'store_name', 'is_verified', 'total_products', 'total_orders', 'pending_orders', 'paid_orders',
+            'shipped_orders', 'delivered_orders', 'complete_orders', 'total_earnings',
+        )
+        .get()
+    )
+
+    # Finished orders moved to cold storage still count towards the totals
+    archived = ArchivedOrder.objects.filter(seller_id=seller_id).aggregate(
+        total_orders=Count('id'),
+        complete_orders=Count('id', filter=Q(track_status=OrderTrackingStatus.COMPLETED)),
+        total_earnings=Coalesce(Sum('total', filter=Q(is_escrow_released=True)), Value(Decimal('0.00'))),
+    )
+    for name, value in archived.items():
+        stats[name] += value
+    return stats
+
+
+def get_seller_dashboard_stats(seller_id):
+    key = dashboard_stats_cache_key(seller_id)
+
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_seller_dashboard_stats(seller_id)
+        cache.set(key, stats, DASHBOARD_STATS_TIMEOUT)
+    return stats
@@ -0,0 +1,126 @@
+from collections import defaultdict
+
+from django.db.models import Count, Sum
+
+from cart.models import CartItem
+from order.models import OrderItem, OrderStatus
+from registration.fast_serializers import file_url, format_datetime, format_decimal, serialize_sellers
+
+from .models import Product, ProductImage, Review
+
+# -----------------------------
+# Fast read path for ProductSerializer
+# -----------------------------
+
+PRODUCT_VALUES = (
+    'id', 'seller_id', 'name', 'slug', 'description', 'price', 'min_price', 'max_price', 'quantity',
+    'category_id', 'category__name', 'category__slug', 'category__image_url', 'category__created_at',
+    'condition', 'is_active', 'created_at', 'updated_at', 'views', 'seller__profile__role',
+)
+
+IMAGE_VALUES = ('id', 'product_id', 'image', 'thumbnail', 'medium', 'large', 'is_primary', 'uploaded_at')
+
+
+def _serialize_image(row, request):
+    return {
+        'id': str(row['id']),
+        'image': file_url(row['image'], request),
+        'thumbnail': file_url(row['thumbnail'], request),
+        'medium': file_url(row['medium'], request),
+        'large': file_url(row['large'], request),
+        'is_primary': row['is_primary'],
+        'uploaded_at': format_datetime(row['uploaded_at']),
+    }
+
+
+def _user_product_flags(product_ids, request):
+    """
+    Batched is_in_cart / user_has_reviewed / can_review lookups (one query each).
+    """
+    if request is None or not request.user.is_authenticated:
+        return set(), set(), set()
+
+    profile = request.user.profile
+
+    in_cart = set(CartItem.objects.filter(
+        cart__buyer=profile, cart__status='active', product_id__in=product_ids
+    ).values_list('product_id', flat=True))
+
+    reviewed = set(Review.objects.filter(
+        reviewer=profile, product_id__in=product_ids
+    ).values_list('product_id', flat=True))
+
+    purchased = set(OrderItem.objects.filter(
+        order__buyer=profile, order__status=OrderStatus.COMPLETED, product_id__in=product_ids
+    ).values_list('product_id', flat=True))
+
+    return in_cart, reviewed, purchased
+
+
+def serialize_products(product_ids, request):
+    """
+    Same output as ProductSerializer(many=True) for product_ids, in that order.
+    Runs a fixed number of queries whatever the number of products.
+    """
+    if not product_ids:
+        return []
+
+    rows = {row['id']: row for row in Product.objects.filter(id__in=product_ids).values(*PRODUCT_VALUES)}
+
+    images = defaultdict(list)
+    for image in ProductImage.objects.filter(product_id__in=product_ids).values(*IMAGE_VALUES):
+        images[image['product_id']].append(_serialize_image(image, request))
+
+    ratings = {
+        rating['product_id']: round(rating['total'] / rating['count'], 1)
+        for rating in Review.objects.filter(product_id__in=product_ids).order_by()
+        .values('product_id').annotate(total=Sum('ratings'), count=Count('id'))
+    }
+
+    sellers = serialize_sellers({row['seller_id'] for row in rows.values()}, request)
+    in_cart, reviewed, purchased = _user_product_flags(product_ids, request)
+
+    data = []
+    for product_id in product_ids:
+        row = rows.get(product_id)
+        if row is None:
+            continue
+
+        category = None
+        if row['category_id'] is not None:
+            category = {
+                'id': str(row['category_id']),
+                'name': row['category__name'],
+                'slug': row['category__slug'],
+                'image_url': row['category__image_url'],
+                'created_at': format_datetime(row['category__created_at']),
+            }
+
+        data.append({
+            'id': str(row['id']),
+            'seller': sellers.get(row['seller_id']),
+            'name': row['name'],
+            'slug': row['slug'],
+            'description': row['description'],
+            'price': format_decimal(row['price']),
+            'min_price': format_decimal(row['min_price']),
+            'max_price': format_decimal(row['max_price']),
+            'quantity': row['quantity'],
+            'category': category,
+            'condition': row['condition'],
+            'is_active': row['is_active'],
+            'created_at': format_datetime(row['created_at']),
+            'updated_at': format_datetime(row['updated_at']),
+            'images': images[product_id],
+            'views': row['views'],
+            'price_range': f"{row['min_price']} - {row['max_price']}",
+            'is_available': row['quantity'] > 0 and row['is_active'],
+            'is_seller': row['seller__profile__role'] == 'seller',
+            'image_count': len(images[product_id]),
+            'average_rating': float(ratings.get(product_id, 0)),
+            'is_in_cart': product_id in in_cart,
+            'can_review': product_id in purchased,
+            'user_has_reviewed': product_id in reviewed,
+        })
+
+    return data
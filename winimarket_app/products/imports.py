@@ -0,0 +1,283 @@
+import codecs
+import csv
+import logging
+from itertools import islice
+
+from django.core.validators import URLValidator
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+from rest_framework import serializers
+
+from winimarket_app import http_client
+
+from .dashboard import invalidate_seller_dashboard_stats
+from .models import Category, Product, ProductImportJob
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# Bulk product import (CSV / XLSX)
+# -----------------------------
+# Rows are streamed from the uploaded file and handled BATCH_SIZE at a time:
+# validate, allocate slugs with two queries, bulk_create, then queue the
+# image downloads. Progress and row-level errors are written on the job
+# after every batch so the seller can poll it.
+
+BATCH_SIZE = 500
+MAX_IMAGES_PER_PRODUCT = 4
+MAX_REPORTED_ERRORS = 1000  # keep the JSON report bounded on very bad files
+
+IMPORT_COLUMNS = [
+    'name', 'description', 'price', 'min_price', 'max_price', 'quantity',
+    'category', 'condition', 'is_active', 'image_urls',
+]
+
+
+class ProductImportRowSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=200)
+    description = serializers.CharField()
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0)
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False)
+    max_price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False)
+    quantity = serializers.IntegerField(min_value=0, default=1)
+    category = serializers.CharField(required=False)
+    condition = serializers.ChoiceField(choices=['new', 'used', 'refurbished'], default='new')
+    is_active = serializers.BooleanField(default=True)
+    image_urls = serializers.CharField(required=False)
+
+    def validate_category(self, value):
+        categories = self.context['categories']
+        category_id = categories.get(value.strip().lower())
+        if category_id is None:
+            raise serializers.ValidationError(f"Unknown category '{value}'.")
+        return category_id
+
+    def validate_image_urls(self, value):
+        urls = value.replace(',', ' ').split()
+        if len(urls) > MAX_IMAGES_PER_PRODUCT:
+            raise serializers.ValidationError(f"A maximum of {MAX_IMAGES_PER_PRODUCT} images can be uploaded.")
+
+        validator = URLValidator(schemes=['http', 'https'])
+        for url in urls:
+            try:
+                validator(url)
+                # Host names are resolved and checked again when the image is fetched
+                http_client.check_public_url(url, resolve=False)
+            except Exception:
+                raise serializers.ValidationError(f"Invalid image URL '{url}'.")
+        return urls
+
+    def validate(self, attrs):
+        attrs.setdefault('min_price', attrs['price'])
+        attrs.setdefault('max_price', attrs['price'])
+
+        if attrs['max_price'] < attrs['min_price']:
+            raise serializers.ValidationError({'max_price': "Max price cannot be less than min price."})
+        return attrs
+
+
+def _clean_row(row):
+    # Empty cells are treated as missing so defaults apply
+    cleaned = {}
+    for key, value in row.items():
+        if key is None or value is None:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+            if not value:
+                continue
+        cleaned[key] = value
+    return cleaned
+
+
+def _header(values):
+    return [str(value).strip().lower() if value is not None else None for value in values]
+
+
+def _iter_csv(file):
+    reader = csv.reader(codecs.iterdecode(file, 'utf-8-sig'))
+    header = _header(next(reader, []))
+
+    for row_number, values in enumerate(reader, start=2):
+        if any(value.strip() for value in values):
+            yield row_number, dict(zip(header, values))
+
+
+def _iter_xlsx(file):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = _header(next(rows, ()))
+
+        for row_number, values in enumerate(rows, start=2):
+            if any(value not in (None, '') for value in values):
+                yield row_number, dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def xlsx_row_count(file):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True)
+    try:
+        max_row = workbook.active.max_row
+    finally:
+        workbook.close()
+    return max(max_row - 1, 0) if max_row else None
+
+
+def iter_import_rows(file, filename):
+    """
+    Yield (row_number, {column: value}) from a CSV or XLSX file without
+    loading the whole sheet into memory.
+    """
+    if filename.lower().endswith('.xlsx'):
+        return _iter_xlsx(file)
+    return _iter_csv(file)
+
+
+def allocate_slugs(products, contended=False):
+    """
+    Give each product a unique slug using two queries per batch instead of
+    the one-query-per-attempt loop in Product.save(). With contended, every
+    product gets the suffixed slug: used after a concurrent import took one
+    of the plain ones.
+    """
+    bases = {product.pk: slugify(product.name) or product.pk.hex for product in products}
+    taken = set(Product.objects.filter(slug__in=set(bases.values())).values_list('slug', flat=True))
+
+    fallback = []
+    for product in products:
+        base = bases[product.pk]
+        if contended or base in taken:
+            fallback.append(product)
+        else:
+            product.slug = base
+            taken.add(base)
+
+    if not fallback:
+        return
+
+    # Collisions get a short suffix derived from the (already unique) primary key
+    candidates = {product.pk: f"{bases[product.pk][:190]}-{product.pk.hex[:8]}" for product in fallback}
+    taken |= set(Product.objects.filter(slug__in=candidates.values()).values_list('slug', flat=True))
+
+    for product in fallback:
+        slug = candidates[product.pk]
+        product.slug = slug if slug not in taken else f"{bases[product.pk][:167]}-{product.pk.hex}"
+        taken.add(product.slug)
+
+
+def _category_lookup():
+    lookup = {}
+    for category_id, name, slug in Category.objects.values_list('id', 'name', 'slug'):
+        lookup[name.lower()] = category_id
+        lookup[slug.lower()] = category_id
+    return lookup
+
+
+def _import_batch(job, batch, categories):
+    from .utils import queue_product_image_task
+
+    products, images, errors = [], [], []
+
+    for row_number, row in batch:
+        serializer = ProductImportRowSerializer(data=_clean_row(row), context={'categories': categories})
+        if not serializer.is_valid():
+            errors.append({'row': row_number, 'errors': serializer.errors})
+            continue
+
+        data = serializer.validated_data
+        product = Product(
+            seller_id=job.seller_id,
+            name=data['name'],
+            description=data['description'],
+            price=data['price'],
+            min_price=data['min_price'],
+            max_price=data['max_price'],
+            quantity=data['quantity'],
+            category_id=data.get('category'),
+            condition=data['condition'],
+            is_active=data['is_active'],
+        )
+        products.append(product)
+        images.extend((product.pk, url, index == 0) for index, url in enumerate(data.get('image_urls', [])))
+
+    if products:
+        with transaction.atomic():
+            allocate_slugs(products)
+            try:
+                with transaction.atomic():
+                    Product.objects.bulk_create(products, batch_size=BATCH_SIZE)
+            except IntegrityError:
+                # Another import inserted one of the slugs after they were checked
+                logger.info("Slug clash in import job %s, retrying the batch with suffixed slugs", job.id)
+                allocate_slugs(products, contended=True)
+                Product.objects.bulk_create(products, batch_size=BATCH_SIZE)
+
+        def queue_images():
+            for product_id, image_url, is_primary in images:
+                queue_product_image_task(product_id=str(product_id), image_url=image_url, is_primary=is_primary)
+
+        transaction.on_commit(queue_images)
+        transaction.on_commit(lambda: invalidate_seller_dashboard_stats([job.seller_id]))
+
+    return len(products), errors
+
+
+def process_import_job(job_id):
+    """
+    Run an import job to completion. Safe to call from a worker or inline.
+    """
+    claimed = ProductImportJob.objects.filter(id=job_id, status='pending').update(
+        status='processing', started_at=timezone.now()
+    )
+    if not claimed:
+        logger.info("Import job %s already picked up, skipping", job_id)
+        return
+
+    job = ProductImportJob.objects.get(id=job_id)
+    processed = created = error_count = 0
+    errors = []
+
+    try:
+        categories = _category_lookup()
+
+        with job.file.open('rb') as file:
+            if job.file.name.lower().endswith('.xlsx'):
+                job.total_rows = xlsx_row_count(file)
+                job.save(update_fields=['total_rows'])
+                file.seek(0)
+
+            rows = iter_import_rows(file, job.file.name)
+            while True:
+                batch = list(islice(rows, BATCH_SIZE))
+                if not batch:
+                    break
+
+                batch_created, batch_errors = _import_batch(job, batch, categories)
+                processed += len(batch)
+                created += batch_created
+                error_count += len(batch_errors)
+                errors.extend(batch_errors[:max(MAX_REPORTED_ERRORS - len(errors), 0)])
+
+                ProductImportJob.objects.filter(id=job.id).update(
+                    processed_rows=processed, created_count=created, error_count=error_count, errors=errors
+                )
+
+    except Exception as e:
+        logger.exception("Import job %s failed: %s", job_id, e)
+        ProductImportJob.objects.filter(id=job.id).update(
+            status='failed', detail=str(e), processed_rows=processed, created_count=created,
+            error_count=error_count, errors=errors, finished_at=timezone.now(),
+        )
+        return
+
+    ProductImportJob.objects.filter(id=job.id).update(
+        status='completed', total_rows=processed, processed_rows=processed, created_count=created,
+        error_count=error_count, errors=errors, finished_at=timezone.now(),
+    )
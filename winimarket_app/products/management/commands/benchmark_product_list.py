@@ -0,0 +1,65 @@
+import gzip
+import time
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from products.models import Product
+from products.serializers import ProductSerializer
+from winimarket_app.parsers import ORJSONParser
+from winimarket_app.renderers import ORJSONRenderer
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class Command(BaseCommand):
+    help = 'Compares the stdlib and orjson render/parse paths (and compressed sizes) on the product list payload'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=50, help='Number of products in the payload')
+        parser.add_argument('--iterations', type=int, default=200)
+
+    def _time(self, func, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return (time.perf_counter() - start) / iterations * 1000
+
+    def handle(self, *args, **options):
+        limit, iterations = options['limit'], options['iterations']
+
+        request = Request(RequestFactory().get('/products/api/products/'))
+        products = Product.objects.select_related('category', 'seller').prefetch_related('images')[:limit]
+        data = {
+            'count': len(products),
+            'next': None,
+            'previous': None,
+            'results': ProductSerializer(products, many=True, context={'request': request}).data,
+        }
+
+        if not data['results']:
+            self.stdout.write(self.style.WARNING("No products found, nothing to benchmark."))
+            return
+
+        self.stdout.write(f"Payload: {len(data['results'])} products, {iterations} iterations")
+
+        for label, renderer, parser in (
+            ('stdlib json', JSONRenderer(), JSONParser()),
+            ('orjson', ORJSONRenderer(), ORJSONParser()),
+        ):
+            body = renderer.render(data)
+            render_ms = self._time(lambda: renderer.render(data), iterations)
+            parse_ms = self._time(lambda: parser.parse(BytesIO(body)), iterations)
+            self.stdout.write(f"{label:<12} render {render_ms:8.3f} ms   parse {parse_ms:8.3f} ms   {len(body)} bytes")
+
+        body = ORJSONRenderer().render(data)
+        self.stdout.write(f"gzip         {len(gzip.compress(body, compresslevel=6))} bytes")
+        if brotli is not None:
+            self.stdout.write(f"brotli       {len(brotli.compress(body, quality=5))} bytes")
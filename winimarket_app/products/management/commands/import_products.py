@@ -0,0 +1,48 @@
+import os
+
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from products.imports import process_import_job
+from products.models import ProductImportJob
+from products.utils import queue_product_import_task
+from registration.models import SellerProfile
+
+
+class Command(BaseCommand):
+    help = 'Bulk import products for a seller from a CSV or XLSX file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or XLSX file with a header row')
+        parser.add_argument('--seller', required=True, help='Email of the seller account')
+        parser.add_argument('--background', action='store_true', help='Queue the job instead of running it here')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not path.lower().endswith(('.csv', '.xlsx')):
+            raise CommandError("Only .csv and .xlsx files are supported.")
+
+        try:
+            seller = SellerProfile.objects.get(profile__user__email=options['seller'])
+        except SellerProfile.DoesNotExist:
+            raise CommandError(f"No seller with email {options['seller']}")
+
+        with open(path, 'rb') as f:
+            job = ProductImportJob.objects.create(seller=seller, file=File(f, name=os.path.basename(path)))
+
+        if options['background']:
+            queue_product_import_task(job_id=str(job.id))
+            self.stdout.write(f"Queued import job {job.id}")
+            return
+
+        process_import_job(job.id)
+        job.refresh_from_db()
+
+        for error in job.errors:
+            self.stdout.write(self.style.WARNING(f"Row {error['row']}: {error['errors']}"))
+
+        style = self.style.SUCCESS if job.status == 'completed' else self.style.ERROR
+        self.stdout.write(style(
+            f"Import {job.id} {job.status}: {job.created_count} created, "
+            f"{job.error_count} rejected out of {job.processed_rows} rows. {job.detail}".strip()
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 18:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_productimportjob'),
+        ('registration', '0006_alter_sellerprofile_store_name'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contactclick',
+            index=models.Index(fields=['clicked_at'], name='products_co_clicked_60ff2a_idx'),
+        ),
+    ]
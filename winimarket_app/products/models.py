@@ -235,6 +235,9 @@ class ContactClick(models.Model):
 
     ip_address = models.GenericIPAddressField(null=True, blank=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['clicked_at'])]  # Range scans for the analytics rollup
+
     def __str__(self):
         return f"{self.contact_type.capitalize()} click for {self.product.name} by {self.buyer.user.email if self.buyer else 'Anonymous'}"
 
@@ -257,4 +260,45 @@ class ProductView(models.Model):
         ordering = ['-viewed_at']  # Newest views first
 
     def __str__(self):
-        return f"View of {self.product.name} by {self.user.user.email if self.user else 'Anonymous' or self.session_key}"
\ No newline at end of file
+        return f"View of {self.product.name} by {self.user.user.email if self.user else 'Anonymous' or self.session_key}"
+# -----------------------------
+# Bulk Product Import Job
+# -----------------------------
+class ProductImportJob(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    seller = models.ForeignKey('registration.SellerProfile', related_name='import_jobs', on_delete=models.CASCADE)
+    file = models.FileField(upload_to='product_imports/')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+
+    total_rows = models.PositiveIntegerField(null=True, blank=True)      # Known up front for XLSX, at the end for CSV
+    processed_rows = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)                 # [{"row": 3, "errors": {"price": [...]}}]
+    detail = models.TextField(blank=True, default='')                   # Reason when the whole job failed
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['seller', '-created_at'])]
+
+    def __str__(self):
+        return f"Import {self.id} by {self.seller.store_name} - {self.status}"
+
+    @property
+    def progress(self):
+        if self.status == 'completed':
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(100, int(self.processed_rows * 100 / self.total_rows))
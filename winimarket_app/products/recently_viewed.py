@@ -0,0 +1,95 @@
+import time
+
+from django.core.cache import cache
+
+from .models import ProductView
+
+# -----------------------------
+# Recently viewed products
+# -----------------------------
+# A capped, most-recent-first list of product ids per user (or per session for
+# anonymous visitors) kept in the cache. On a cache miss the list is rebuilt
+# from the ProductView log, so losing the cache only costs one indexed query.
+# Updates are read-modify-write, so they take a short cache.add() lock per
+# list: two views at once would otherwise each drop the other's product.
+
+RECENTLY_VIEWED_LIMIT = 50
+RECENTLY_VIEWED_TIMEOUT = 60 * 60 * 24 * 30  # 30 days
+
+LOCK_TIMEOUT = 5  # seconds; frees the lock if its holder died
+LOCK_WAIT = 0.5  # seconds to wait for it before updating anyway
+LOCK_POLL = 0.01
+
+
+def _owner(request):
+    if request.user.is_authenticated:
+        return 'user', request.user.profile.id
+    if request.session.session_key:
+        return 'session', request.session.session_key
+    return None, None
+
+
+def recently_viewed_key(request):
+    kind, owner_id = _owner(request)
+    if not kind:
+        return None
+    return f"recently_viewed:{kind}:{owner_id}"
+
+
+def _load_from_views(kind, owner_id):
+    filters = {'user_id': owner_id} if kind == 'user' else {'session_key': owner_id}
+
+    # Over-fetch a little since the same product can be logged several times
+    product_ids = (
+        ProductView.objects
+        .filter(**filters)
+        .order_by('-viewed_at')
+        .values_list('product_id', flat=True)[:RECENTLY_VIEWED_LIMIT * 4]
+    )
+
+    ids = []
+    for product_id in product_ids:
+        product_id = str(product_id)
+        if product_id not in ids:
+            ids.append(product_id)
+            if len(ids) == RECENTLY_VIEWED_LIMIT:
+                break
+    return ids
+
+
+def get_recently_viewed_ids(request):
+    key = recently_viewed_key(request)
+    if not key:
+        return []
+
+    ids = cache.get(key)
+    if ids is None:
+        ids = _load_from_views(*_owner(request))
+        cache.set(key, ids, RECENTLY_VIEWED_TIMEOUT)
+    return ids
+
+
+def push_recently_viewed(request, product_id):
+    """
+    Move product_id to the front of the visitor's recently viewed list.
+    """
+    key = recently_viewed_key(request)
+    if not key:
+        return
+
+    lock_key = f"{key}:lock"
+    deadline = time.monotonic() + LOCK_WAIT
+    locked = cache.add(lock_key, 1, LOCK_TIMEOUT)
+    while not locked and time.monotonic() < deadline:
+        time.sleep(LOCK_POLL)
+        locked = cache.add(lock_key, 1, LOCK_TIMEOUT)
+
+    try:
+        product_id = str(product_id)
+        ids = [pk for pk in get_recently_viewed_ids(request) if pk != product_id]
+        ids.insert(0, product_id)
+
+        cache.set(key, ids[:RECENTLY_VIEWED_LIMIT], RECENTLY_VIEWED_TIMEOUT)
+    finally:
+        if locked:
+            cache.delete(lock_key)
@@ -1,8 +1,8 @@
 from rest_framework import serializers
-from .models import Product, ProductImage, WishList, Category, Review, ContactClick
+from .models import Product, ProductImage, WishList, Category, Review, ContactClick, ProductImportJob
 from django.utils.text import slugify
 from uuid import uuid4
-from registration.serializers import SellerProfileSerializer, ProfileSerializer
+from registration.serializers import SellerProfileSerializer, ProfileSerializer, SparseFieldsMixin
 from cart.models import CartItem
 
 from order.models import Order, OrderStatus
@@ -67,7 +67,7 @@ class ProductImageBulkUploadSerializer(serializers.Serializer):
 
         return created_images
     
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     images = ProductImageSerializer(many=True, required=False, allow_empty=True)
     category = CategorySerializer(read_only=True)
     category_id = serializers.UUIDField(write_only=True, required=False)
@@ -97,6 +97,7 @@ class ProductSerializer(serializers.ModelSerializer):
         ]
 
         read_only_fields = ['id', 'seller', 'slug', 'created_at', 'price_range', 'is_available', 'is_seller', 'image_count', 'average_rating', "can_review"]
+        expandable_fields = ['seller', 'images', 'category']
 
     def get_is_in_cart(self, obj):
         request = self.context.get('request')
@@ -282,4 +283,25 @@ class ContactClickSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         request = self.context['request']
         validated_data['ip_address'] = self.get_client_ip(request)
-        return super().create(validated_data)
\ No newline at end of file
+        return super().create(validated_data)
+class ProductStockUpdateSerializer(serializers.Serializer):
+    id = serializers.UUIDField()
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False)
+    quantity = serializers.IntegerField(min_value=0, required=False)
+    is_active = serializers.BooleanField(required=False)
+
+    def validate(self, attrs):
+        if len(attrs) == 1:
+            raise serializers.ValidationError("Provide at least one of price, quantity or is_active.")
+        return attrs
+
+class ProductImportJobSerializer(serializers.ModelSerializer):
+    progress = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = ProductImportJob
+        fields = [
+            'id', 'status', 'total_rows', 'processed_rows', 'created_count', 'error_count',
+            'progress', 'errors', 'detail', 'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
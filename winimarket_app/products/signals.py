@@ -1,37 +1,20 @@
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from .models import ProductImage, Category
-from django.conf import settings
-import requests
-
-PEXEL_ACCESS_KEY = settings.PEXEL_ACCESS_KEY
+from .models import Product, ProductImage, Category
+from .cards import invalidate_product_cards
+from .dashboard import invalidate_seller_dashboard_stats
+from .utils import search_pexels_image
+from registration.models import SellerProfile
 
 @receiver(post_save, sender=Category)
 def fetch_pexels_image(sender, instance, created, **kwargs):
     if created and not instance.image_url:
         try:
-            query = instance.name
-
-            headers = {
-                "Authorization": PEXEL_ACCESS_KEY
-            }
-
-            res = requests.get(
-                "https://api.pexels.com/v1/search",
-                params={"query": query, "per_page": 1},
-                headers=headers,
-                timeout=5  # Prevents long waits if Pexels is slow
-            )
-            
-            if res.status_code == 200:
-                data = res.json()
-                if data.get("photos") and len(data["photos"]) > 0:
-                    # Use the 'medium' or 'large' image directly from Pexels
-                    # Pexels optimizes these images automatically
-                    optimized_url = data["photos"][0]["src"]["medium"]
-                    
-                    # Update without invoking the post_save signal loop
-                    Category.objects.filter(pk=instance.pk).update(image_url=optimized_url)
+            # Runs inside the request that saved the category: one try, no backoff
+            optimized_url = search_pexels_image(instance.name, retries=0)
+            if optimized_url:
+                # Update without invoking the post_save signal loop
+                Category.objects.filter(pk=instance.pk).update(image_url=optimized_url)
 
         except Exception as e:
             print(f"Pexels fetch failed for {instance.name}: {e}")
@@ -47,5 +30,24 @@ def auto_assign_new_primary(sender, instance, **kwargs):
             next_image.is_primary = True
             next_image.save()
 
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_card_on_product_change(sender, instance, **kwargs):
+    invalidate_product_cards([instance.pk])
 
-            
\ No newline at end of file
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def invalidate_card_on_image_change(sender, instance, **kwargs):
+    invalidate_product_cards([instance.product_id])
+
+@receiver(post_save, sender=SellerProfile)
+def invalidate_cards_on_seller_change(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_product_cards(
+            Product.objects.filter(seller=instance).values_list('id', flat=True)
+        )
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_dashboard_on_product_change(sender, instance, **kwargs):
+    invalidate_seller_dashboard_stats([instance.seller_id])
@@ -0,0 +1,91 @@
+import logging
+from uuid import uuid4
+
+from django.core.files.base import ContentFile
+
+from winimarket_app import http_client
+
+from .imports import MAX_IMAGES_PER_PRODUCT, process_import_job
+from .models import Product, ProductImage
+
+logger = logging.getLogger(__name__)
+
+try:
+    from celery import shared_task
+except ImportError:
+    shared_task = None  # Celery not installed or not used in prod
+
+MAX_IMAGE_SIZE = 5 * 1024 * 1024
+IMAGE_CONTENT_TYPES = {'image/jpeg': 'jpg', 'image/jpg': 'jpg', 'image/png': 'png'}
+
+
+def _process_product_import_task(*, job_id):
+    process_import_job(job_id)
+
+if shared_task:
+    @shared_task(bind=True, max_retries=3)
+    def process_product_import_task(self, **kwargs):
+        try:
+            return _process_product_import_task(**kwargs)
+        except Exception as exc:
+            logger.exception("Product import failed")
+            raise self.retry(exc=exc, countdown=30)
+else:
+    def process_product_import_task(**kwargs):
+        return _process_product_import_task(**kwargs)
+
+
+def _fetch_product_image_task(*, product_id, image_url, is_primary=False):
+    """
+    Download one image for an imported product. ProductImage.save() then
+    builds the resized variations, like a regular upload.
+    """
+    product = Product.objects.filter(id=product_id).first()
+    if product is None:
+        logger.info("Product %s no longer exists, skipping image %s", product_id, image_url)
+        return
+
+    if product.images.count() >= MAX_IMAGES_PER_PRODUCT:
+        logger.info("Product %s already has %s images, skipping %s", product_id, MAX_IMAGES_PER_PRODUCT, image_url)
+        return
+
+    try:
+        response = http_client.get_public(image_url, timeout=(5, 20), stream=True)
+    except http_client.UnsafeURL as e:
+        # Not worth a retry: the seller has to fix the URL
+        logger.warning("Refusing image %s for product %s: %s", image_url, product_id, e)
+        return
+
+    with response:
+        response.raise_for_status()
+
+        content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        extension = IMAGE_CONTENT_TYPES.get(content_type)
+        if extension is None:
+            logger.warning("Unsupported image type %s for %s", content_type, image_url)
+            return
+
+        data = bytearray()
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            data += chunk
+            if len(data) > MAX_IMAGE_SIZE:
+                logger.warning("Image %s is larger than 5MB, skipping", image_url)
+                return
+
+    image = ProductImage(
+        product=product,
+        is_primary=is_primary and not product.images.filter(is_primary=True).exists(),
+    )
+    image.image.save(f"{uuid4()}.{extension}", ContentFile(bytes(data)), save=True)
+
+if shared_task:
+    @shared_task(bind=True, max_retries=3)
+    def fetch_product_image_task(self, **kwargs):
+        try:
+            return _fetch_product_image_task(**kwargs)
+        except Exception as exc:
+            logger.exception("Product image fetch failed")
+            raise self.retry(exc=exc, countdown=60)
+else:
+    def fetch_product_image_task(**kwargs):
+        return _fetch_product_image_task(**kwargs)
@@ -1,3 +1,263 @@
-from django.test import TestCase
+import io
+import threading
+import time
+import uuid
+from contextlib import redirect_stdout
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from rest_framework import serializers
+from rest_framework.request import Request
+
+from cart.models import Cart, CartItem
+from order.models import Order, OrderItem, OrderStatus, ShippingAddress
+from winimarket_app import http_client
+from winimarket_app.renderers import ORJSONRenderer
+from winimarket_app.testing import api_request, make_products, make_user
+
+from . import imports, recently_viewed
+from .dashboard import compute_seller_dashboard_stats, get_seller_dashboard_stats, invalidate_seller_dashboard_stats
+from .fast_serializers import serialize_products
+from .imports import ProductImportRowSerializer
+from .models import Category, Product, ProductImage, Review
+from .serializers import ProductImageSerializer, ProductSerializer
+from .tasks import _fetch_product_image_task
+from .views import PRODUCT_BATCH_LIMIT
+
+
+class FastProductSerializerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.buyer, cls.seller = make_user(), make_user('seller')
+        # image_url set, so the Pexels lookup does not run
+        category = Category.objects.create(name='Phones', image_url='https://images.example.com/phones.jpg')
+        cls.products = make_products(cls.seller, 5, category) + make_products(make_user('seller'), 3)
+
+        ProductImage.objects.bulk_create([
+            ProductImage(product=product, image=f"product_images/{uuid.uuid4().hex}.jpg", is_primary=primary)
+            for product in cls.products[:4]
+            for primary in (True, False)
+        ])
+        Review.objects.create(product=cls.products[0], reviewer=cls.buyer.profile, ratings=4, reviewed_text='Good')
+
+        cart = Cart.objects.create(buyer=cls.buyer.profile)
+        CartItem.objects.create(cart=cart, product=cls.products[1], quantity=1)
+
+        order = Order.objects.create(buyer=cls.buyer.profile, seller=cls.seller.profile.seller_profile, status=OrderStatus.COMPLETED)
+        OrderItem.objects.create(order=order, product=cls.products[2], quantity=1, price=Decimal('10.00'))
+
+    def test_matches_product_serializer(self):
+        renderer = ORJSONRenderer()
+        for user in (None, self.buyer, self.seller):
+            with self.subTest(user=user):
+                request = api_request(user)
+                products = Product.objects.filter(id__in=[product.id for product in self.products])
+                expected = ProductSerializer(products, many=True, context={'request': request}).data
+                actual = serialize_products([product.id for product in products], request)
+                self.assertEqual(renderer.render(actual), renderer.render(expected))
+
+    def test_query_count_does_not_grow_with_products(self):
+        request = api_request(self.buyer)
+        product_ids = [product.id for product in self.products]
+
+        with self.assertNumQueries(7):
+            serialize_products(product_ids[:1], request)
+        with self.assertNumQueries(7):
+            serialize_products(product_ids, request)
+
+
+
+class SparseFieldsTests(TestCase):
+    class PhotoSerializer(ProductSerializer):
+        photos = ProductImageSerializer(source='images', many=True, read_only=True)
+
+        class Meta(ProductSerializer.Meta):
+            fields = ProductSerializer.Meta.fields + ['photos']
+            expandable_fields = ProductSerializer.Meta.expandable_fields + ['photos']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = make_products(make_user('seller'), 1)[0]
+        cls.image, = ProductImage.objects.bulk_create([ProductImage(product=cls.product, is_primary=True)])
+
+    def request(self, method, path):
+        return Request(getattr(RequestFactory(), method)(path))
+
+    def test_unexpanded_relation_keeps_its_source(self):
+        serializer = self.PhotoSerializer(self.product, context={'request': self.request('get', '/?fields=id,photos')})
+        self.assertEqual(serializer.data['photos'], [self.image.pk])
+
+    def test_writes_keep_every_field(self):
+        request = self.request('post', '/?fields=id,images')
+        fields = ProductSerializer(context={'request': request}).fields
+        self.assertIsInstance(fields['images'], serializers.ListSerializer)
+        self.assertIn('name', fields)
+
+
+class ImportImageURLTests(SimpleTestCase):
+    def row(self, image_urls):
+        return ProductImportRowSerializer(
+            data={'name': 'Lamp', 'description': 'Desk lamp', 'price': '12.00', 'image_urls': image_urls},
+            context={'categories': {}},
+        )
+
+    def test_urls_pointing_inside_the_network_are_rejected(self):
+        for url in (
+            'http://127.0.0.1/a.jpg',
+            'http://169.254.169.254/latest/meta-data/',
+            'http://10.0.0.5:8080/a.jpg',
+            'http://[::1]/a.jpg',
+            'http://localhost/a.jpg',
+        ):
+            with self.subTest(url=url):
+                serializer = self.row(url)
+                self.assertFalse(serializer.is_valid())
+                self.assertIn('image_urls', serializer.errors)
+
+    def test_public_urls_are_accepted(self):
+        serializer = self.row('https://images.example.com/a.jpg, https://cdn.example.org/b.png')
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+
+class FetchProductImageTests(TestCase):
+    def test_private_address_is_never_fetched(self):
+        product = make_products(make_user('seller'), 1)[0]
+
+        with mock.patch('winimarket_app.http_client.request') as request:
+            with self.assertLogs('products.tasks', 'WARNING'):
+                _fetch_product_image_task(product_id=product.id, image_url='http://169.254.169.254/latest/meta-data/')
+
+        request.assert_not_called()
+        self.assertFalse(ProductImage.objects.filter(product=product).exists())
+
+
+class CategoryPexelsImageTests(TestCase):
+    def test_lookup_on_save_is_not_retried(self):
+        with mock.patch('winimarket_app.http_client.request', side_effect=http_client.OutboundHTTPError('down')) as request, \
+                redirect_stdout(io.StringIO()):
+            category = Category.objects.create(name='Lamps')
+
+        request.assert_called_once()
+        self.assertEqual(request.call_args.kwargs['retries'], 0)
+        category.refresh_from_db()
+        self.assertFalse(category.image_url)
+
+
+class SellerDashboardStatsTests(TestCase):
+    def _seller(self, orders, products):
+        buyer, seller = make_user(), make_user('seller')
+        make_products(seller, products)
+        address = ShippingAddress.objects.create(buyer=buyer.profile, state_region='Central', city='Winneba', phonenumber='0200000000')
+        Order.objects.bulk_create([
+            Order(
+                buyer=buyer.profile, seller=seller.profile.seller_profile, shipping_address=address,
+                # One pending order per buyer and seller, the rest paid and released
+                status=OrderStatus.PAID if index else OrderStatus.PENDING,
+                total=Decimal('10.00'), is_escrow_released=bool(index),
+            )
+            for index in range(orders)
+        ])
+        return seller.profile.seller_profile.id
+
+    def test_query_count_does_not_grow_with_orders_or_products(self):
+        for orders, products in ((1, 1), (12, 9)):
+            with self.subTest(orders=orders, products=products):
+                seller_id = self._seller(orders, products)
+                with self.assertNumQueries(2):
+                    stats = compute_seller_dashboard_stats(seller_id)
+
+                self.assertEqual(stats['total_products'], products)
+                self.assertEqual(stats['total_orders'], orders)
+                self.assertEqual(stats['pending_orders'], 1)
+                self.assertEqual(stats['paid_orders'], orders - 1)
+                self.assertEqual(stats['total_earnings'], Decimal('10.00') * (orders - 1))
+
+    def test_cached_stats_run_no_queries(self):
+        seller_id = self._seller(3, 2)
+        invalidate_seller_dashboard_stats([seller_id])
+        self.addCleanup(invalidate_seller_dashboard_stats, [seller_id])
+
+        with self.assertNumQueries(2):
+            stats = get_seller_dashboard_stats(seller_id)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_seller_dashboard_stats(seller_id), stats)
+
+
+class RecentlyViewedTests(SimpleTestCase):
+    def test_concurrent_views_are_all_kept(self):
+        request = SimpleNamespace(user=SimpleNamespace(is_authenticated=True, profile=SimpleNamespace(id=uuid.uuid4())))
+        key = recently_viewed.recently_viewed_key(request)
+        cache.set(key, [])
+        self.addCleanup(cache.delete, key)
+
+        # Widen the read-modify-write window so unlocked updates would collide
+        real_get = recently_viewed.get_recently_viewed_ids
+
+        def slow_get(request):
+            ids = real_get(request)
+            time.sleep(0.02)
+            return ids
+
+        product_ids = [str(uuid.uuid4()) for _ in range(8)]
+        with mock.patch.object(recently_viewed, 'get_recently_viewed_ids', slow_get):
+            threads = [
+                threading.Thread(target=recently_viewed.push_recently_viewed, args=(request, product_id))
+                for product_id in product_ids
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertCountEqual(cache.get(key), product_ids)
+
+
+class ProductBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.products = make_products(make_user('seller'), 3)
+
+    def get(self, ids):
+        return self.client.get('/products/api/products/batch/', {'ids': ','.join(ids)})
+
+    def test_cards_come_back_in_request_order_without_repeats(self):
+        ids = [str(product.pk) for product in reversed(self.products)]
+        response = self.get(ids + ids[:2])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([card['id'] for card in response.json()], ids)
+
+    def test_oversized_input_is_rejected_before_parsing(self):
+        with mock.patch('products.views.UUID') as parse:
+            response = self.get([str(uuid.uuid4())] * (PRODUCT_BATCH_LIMIT * 2 + 1))
+
+        self.assertEqual(response.status_code, 400)
+        parse.assert_not_called()
+
+    def test_too_many_distinct_ids_are_rejected(self):
+        response = self.get([str(uuid.uuid4()) for _ in range(PRODUCT_BATCH_LIMIT + 1)])
+        self.assertEqual(response.status_code, 400)
+
+
+class ImportSlugClashTests(TestCase):
+    def test_slug_taken_by_a_concurrent_import_does_not_fail_the_batch(self):
+        seller = make_user('seller')
+        job = SimpleNamespace(id=uuid.uuid4(), seller_id=seller.profile.seller_profile.id)
+        real_allocate = imports.allocate_slugs
+
+        def allocate_then_race(products, contended=False):
+            real_allocate(products, contended)
+            if not contended:
+                # The other import commits the same slug before our INSERT
+                Product.objects.filter(pk=make_products(seller, 1)[0].pk).update(slug='desk-lamp')
+
+        row = {'name': 'Desk lamp', 'description': 'Warm light', 'price': '12.00'}
+        with mock.patch.object(imports, 'allocate_slugs', allocate_then_race):
+            created, errors = imports._import_batch(job, [(2, row)], categories={})
+
+        self.assertEqual((created, errors), (1, []))
+        product = Product.objects.get(name='Desk lamp')
+        self.assertTrue(product.slug.startswith('desk-lamp-'))
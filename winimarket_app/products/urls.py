@@ -18,9 +18,11 @@ urlpatterns = [
 
     # Product API URLs
     path('products/api/products/', views.product_list_create),
+    path('products/api/products/batch/', views.product_batch, name='product_batch'),
     path('products/api/products/<uuid:pk>/', views.product_detail, name="product_detai_api"),
     path('product/api/search/', views.search_products),
     path('product/api/search/suggestions/', views.search_suggestions),
+    path('products/api/recently-viewed/', views.recently_viewed_products, name='recently_viewed'),
 
     path('product/detail/<uuid:pk>/<slug:slug>/', views.product_detail_view, name='product_detail'),
 
@@ -33,7 +35,11 @@ urlpatterns = [
     path('api/seller/dashboard/stats/', views.seller_dashboard_stats),
     path('api/seller/products/', views.seller_products),
     path('api/seller/product/update/<uuid:product_id>/', views.seller_update_product),
+    path('api/seller/products/bulk-update/', views.seller_bulk_update_products),
+    path('api/seller/products/export/', views.seller_export_products),
     path('api/seller/product/delete/<uuid:product_id>/', views.seller_delete_product),
+    path('api/seller/products/import/', views.seller_import_products),
+    path('api/seller/products/import/<uuid:job_id>/', views.seller_import_status),
 
     path('offline/', views.offline_view, name='offline'),
     path('support/', views.support_view, name='support'),
@@ -0,0 +1,50 @@
+from django.conf import settings
+
+from order.emails.enqueue import enqueue_task
+from winimarket_app import http_client
+from .tasks import fetch_product_image_task, process_product_import_task
+
+
+def queue_product_import_task(**payload):
+    """
+    Decide where to send the product import task.
+    - Local dev → Celery
+    - Production → Cloud Tasks
+    """
+    if getattr(settings, "USE_CLOUD_TASKS", False):
+        enqueue_task("process_product_import_task", payload, task_id=f"product-import-{payload.get('job_id')}")
+    else:
+        process_product_import_task.delay(**payload)
+
+def queue_product_image_task(**payload):
+    """
+    Decide where to send the product image download task.
+    - Local dev → Celery
+    - Production → Cloud Tasks
+    """
+    if getattr(settings, "USE_CLOUD_TASKS", False):
+        enqueue_task("fetch_product_image_task", payload)
+    else:
+        fetch_product_image_task.delay(**payload)
+
+
+PEXELS_SEARCH_URL = "https://api.pexels.com/v1/search"
+
+def search_pexels_image(query, retries=http_client.DEFAULT_RETRIES):
+    """
+    URL of the first Pexels photo (medium size) matching the query, or None.
+    Raises http_client.OutboundHTTPError when Pexels cannot be reached.
+    """
+    res = http_client.get(
+        PEXELS_SEARCH_URL,
+        params={"query": query, "per_page": 1},
+        headers={"Authorization": settings.PEXEL_ACCESS_KEY},
+        timeout=5,  # Prevents long waits if Pexels is slow
+        retries=retries,
+    )
+    if res.status_code != 200:
+        return None
+
+    photos = res.json().get("photos")
+    # Pexels optimizes the 'medium' image automatically
+    return photos[0]["src"]["medium"] if photos else None
@@ -17,8 +17,14 @@ from rest_framework.pagination import PageNumberPagination
 
 from django.utils import timezone
 
-from .models import Product, Category, Review, ContactClick, ProductView
-from .serializers import (CategorySerializer, ProductSerializer, ReviewSerializer)
+from .models import Product, Category, Review, ContactClick, ProductView, ProductImportJob
+from .serializers import (CategorySerializer, ProductSerializer, ReviewSerializer, ProductImportJobSerializer, ProductStockUpdateSerializer)
+from .utils import queue_product_import_task
+from .cards import get_product_cards, invalidate_product_cards
+from .dashboard import get_seller_dashboard_stats
+from .recently_viewed import get_recently_viewed_ids, push_recently_viewed
+from .fast_serializers import serialize_products
+from registration.fast_serializers import uses_sparse_fields
 
 from order.models import Order, OrderItem, OrderStatus, OrderTrackingStatus
 
@@ -26,6 +32,9 @@ from django.db.models.functions import Random
 from django.views.decorators.cache import never_cache
 
 from django.db.models import F
+from django.db import transaction
+from winimarket_app.exports import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export_response, format_export_datetime
+from uuid import UUID
 
 def offline_view(request):
     return render(request, 'offline.html')
@@ -69,6 +78,15 @@ class ProductPagination(PageNumberPagination):
     page_size = 10  # Default number of products per page
     page_size_query_param = 'page_size'  # Allow client to set custom size
     max_page_size = 50  # Prevent too-large responses
+
+# Max number of ids accepted by product_batch
+PRODUCT_BATCH_LIMIT = 50
+
+# Max upload size for seller_import_products
+PRODUCT_IMPORT_MAX_SIZE = 10 * 1024 * 1024
+
+# Max number of products per seller_bulk_update_products request
+PRODUCT_BULK_UPDATE_LIMIT = 500
     
 # -------------------------
 # LIST + CREATE PRODUCTS
@@ -92,10 +110,20 @@ def product_list_create(request):
             products = products.filter(condition=condition)
 
         paginator = ProductPagination()
-        page = paginator.paginate_queryset(products, request)
 
-        serializer = ProductSerializer(page, many=True, context={'request': request})
-        return paginator.get_paginated_response(serializer.data)
+        # Card projection for the home feed: page over ids only, then hydrate
+        # the cards from the cache (one values() query for any misses)
+        if request.query_params.get('view') == 'card':
+            page = paginator.paginate_queryset(products.only('id').select_related(None).prefetch_related(None), request)
+            return paginator.get_paginated_response(get_product_cards([p.id for p in page]))
+
+        if uses_sparse_fields(request):
+            page = paginator.paginate_queryset(products, request)
+            serializer = ProductSerializer(page, many=True, context={'request': request})
+            return paginator.get_paginated_response(serializer.data)
+
+        page = paginator.paginate_queryset(products.only('id').select_related(None).prefetch_related(None), request)
+        return paginator.get_paginated_response(serialize_products([p.id for p in page], request))
 
     elif request.method == 'POST':
         if not request.user.is_authenticated:
@@ -197,9 +225,53 @@ def product_detail(request, pk):
 
         # Optional: keep the in-memory object in sync
         product.refresh_from_db(fields=["views"])
-    
+
+    push_recently_viewed(request, product.pk)
+
+    if not uses_sparse_fields(request):
+        return Response(serialize_products([product.pk], request)[0], status=status.HTTP_200_OK)
+
     serializer = ProductSerializer(product, context={'request': request})
     return Response(serializer.data, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+def product_batch(request):
+    """
+    Cards for several products at once: ?ids=<uuid>,<uuid>,...
+    Returned in request order (unknown ids are skipped); does not count as views.
+    """
+    raw_ids = [pk.strip() for value in request.query_params.getlist('ids') for pk in value.split(',') if pk.strip()]
+
+    if not raw_ids:
+        return Response({"error": "ids is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+    too_many = Response(
+        {"error": f"At most {PRODUCT_BATCH_LIMIT} products can be requested at once"},
+        status=status.HTTP_400_BAD_REQUEST
+    )
+    # Bound the work before parsing anything; a few repeated ids are tolerated
+    if len(raw_ids) > PRODUCT_BATCH_LIMIT * 2:
+        return too_many
+
+    parsed = []
+    for pk in raw_ids:
+        try:
+            parsed.append(str(UUID(pk)))
+        except ValueError:
+            return Response({"error": f"Invalid product id: {pk}"}, status=status.HTTP_400_BAD_REQUEST)
+    product_ids = list(dict.fromkeys(parsed))
+
+    if len(product_ids) > PRODUCT_BATCH_LIMIT:
+        return too_many
+
+    return Response(get_product_cards(product_ids), status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+@never_cache
+def recently_viewed_products(request):
+    product_ids = get_recently_viewed_ids(request)
+    cards = get_product_cards(product_ids)
+    return Response(cards, status=status.HTTP_200_OK)
     
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -228,6 +300,106 @@ def seller_update_product(request, product_id):
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def seller_export_products(request):
+    """
+    Stream the seller's catalog as CSV (default) or XLSX (?type=xlsx).
+    The columns match the bulk import template so the file can be re-imported.
+    """
+    seller = request.user.profile.seller_profile
+    export_format = request.query_params.get('type', 'csv')
+
+    if export_format not in EXPORT_FORMATS:
+        return Response({"error": "type must be csv or xlsx"}, status=status.HTTP_400_BAD_REQUEST)
+
+    headers = [
+        'id', 'name', 'slug', 'description', 'price', 'min_price', 'max_price', 'quantity',
+        'category', 'condition', 'is_active', 'views', 'created_at',
+    ]
+
+    products = (
+        Product.objects.filter(seller=seller)
+        .order_by('-created_at')
+        .values_list(
+            'id', 'name', 'slug', 'description', 'price', 'min_price', 'max_price', 'quantity',
+            'category__name', 'condition', 'is_active', 'views', 'created_at',
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+    rows = (
+        [str(pk), name, slug, description, str(price), str(min_price), str(max_price), quantity,
+         category or '', condition, is_active, views, format_export_datetime(created_at)]
+        for pk, name, slug, description, price, min_price, max_price, quantity,
+            category, condition, is_active, views, created_at in products
+    )
+
+    return export_response(export_format, 'winimarket_products', headers, rows, sheet_title='Products')
+
+@api_view(['PATCH'])
+@permission_classes([IsAuthenticated])
+def seller_bulk_update_products(request):
+    """
+    Update price / quantity / is_active on many products at once:
+    {"products": [{"id": ..., "price": ..., "quantity": ..., "is_active": ...}, ...]}
+    All or nothing: one ownership query, one bulk_update.
+    """
+    seller = request.user.profile.seller_profile
+    items = request.data.get('products') if hasattr(request.data, 'get') else None
+
+    if not isinstance(items, list) or not items:
+        return Response({"error": "products must be a non-empty list"}, status=status.HTTP_400_BAD_REQUEST)
+
+    if len(items) > PRODUCT_BULK_UPDATE_LIMIT:
+        return Response(
+            {"error": f"At most {PRODUCT_BULK_UPDATE_LIMIT} products can be updated at once"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    serializer = ProductStockUpdateSerializer(data=items, many=True)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    updates = {item['id']: item for item in serializer.validated_data}
+    if len(updates) != len(items):
+        return Response({"error": "Each product can only appear once"}, status=status.HTTP_400_BAD_REQUEST)
+
+    fields = sorted({field for item in updates.values() for field in item if field != 'id'})
+
+    with transaction.atomic():
+        products = list(
+            Product.objects.select_for_update()
+            .filter(seller=seller, id__in=updates.keys())
+            .only('id', 'price', 'quantity', 'is_active')
+        )
+
+        missing = set(updates) - {product.id for product in products}
+        if missing:
+            return Response(
+                {"error": "Product not found", "ids": sorted(str(pk) for pk in missing)},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        now = timezone.now()
+        for product in products:
+            for field, value in updates[product.id].items():
+                setattr(product, field, value)
+            product.updated_at = now  # bulk_update skips auto_now
+
+        Product.objects.bulk_update(products, fields + ['updated_at'])
+
+        product_ids = list(updates)
+        transaction.on_commit(lambda: invalidate_product_cards(product_ids))
+
+    return Response(
+        {
+            "updated": len(products),
+            "products": ProductStockUpdateSerializer(products, many=True).data,
+        },
+        status=status.HTTP_200_OK
+    )
+
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
 def seller_delete_product(request, product_id):
@@ -241,30 +413,52 @@ def seller_delete_product(request, product_id):
     product.delete()
     return Response({'message': 'Product delete successfully'})
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@parser_classes([MultiPartParser, FormParser])
+def seller_import_products(request):
+    """
+    Upload a CSV/XLSX file of products. The rows are imported in the
+    background; poll seller_import_status with the returned job id.
+    """
+    if not request.user.profile.role == 'seller':
+        return Response({"error": "Only sellers can import products."}, status=status.HTTP_403_FORBIDDEN)
+
+    upload = request.FILES.get('file')
+    if not upload:
+        return Response({"error": "file is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+    if not upload.name.lower().endswith(('.csv', '.xlsx')):
+        return Response({"error": "Only .csv and .xlsx files are supported."}, status=status.HTTP_400_BAD_REQUEST)
+
+    if upload.size > PRODUCT_IMPORT_MAX_SIZE:
+        return Response({"error": "Import files must be 10MB or less."}, status=status.HTTP_400_BAD_REQUEST)
+
+    job = ProductImportJob.objects.create(seller=request.user.profile.seller_profile, file=upload)
+    transaction.on_commit(lambda: queue_product_import_task(job_id=str(job.id)))
+
+    serializer = ProductImportJobSerializer(job)
+    return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def seller_dashboard_stats(request):
+@never_cache
+def seller_import_status(request, job_id):
     seller = request.user.profile.seller_profile
-    
-    total_products = Product.objects.filter(seller=seller).count()
-
-    orders = Order.objects.filter(seller=seller)
-
-    stats = {
-        "store_name": seller.store_name,
-        "is_verified": seller.is_verified,
-        'total_products': total_products,
-        "total_orders": orders.count(),
-        "pending_orders": orders.filter(status=OrderStatus.PENDING).count(),
-        "paid_orders": orders.filter(status=OrderStatus.PAID).count(),
-        "shipped_orders": orders.filter(track_status=OrderTrackingStatus.SHIPPED).count(),
-        "delivered_orders": orders.filter(track_status=OrderTrackingStatus.DELIVERED).count(),
-        "complete_orders": orders.filter(track_status=OrderTrackingStatus.COMPLETED).count(),
-        "total_earnings": sum(
-            o.total_cost for o in orders.filter(is_escrow_released=True)
-        )
-    }
 
+    try:
+        job = ProductImportJob.objects.get(id=job_id, seller=seller)
+    except ProductImportJob.DoesNotExist:
+        return Response({'error': 'Import job not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    serializer = ProductImportJobSerializer(job)
+    return Response(serializer.data, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def seller_dashboard_stats(request):
+    seller = request.user.profile.seller_profile
+    stats = get_seller_dashboard_stats(seller.pk)
     return Response(stats, status=status.HTTP_200_OK)
 
 # -----------------------------
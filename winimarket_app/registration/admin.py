@@ -11,7 +11,8 @@ from .models import (
     SellerVerification,
     SellerAddress,
     SellerAuditLog,
-    SellerNotificationLog
+    SellerNotificationLog,
+    ArchivedSellerNotificationLog
 )
 
 @admin.register(SellerNotificationLog)
@@ -60,6 +61,19 @@ class SellerNotificationLogAdmin(admin.ModelAdmin):
     def has_change_permission(self, request, obj=None):
         return False
 
+@admin.register(ArchivedSellerNotificationLog)
+class ArchivedSellerNotificationLogAdmin(admin.ModelAdmin):
+    list_display = ("seller", "user", "event", "channel", "status", "created_at", "archived_at")
+    list_filter = ("event", "channel", "status")
+    search_fields = ("seller__store_name", "user__email", "event")
+    ordering = ("-created_at",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 
 # =====================================================
 # Custom User Admin
@@ -0,0 +1,143 @@
+from django.core.files.storage import default_storage
+from rest_framework import serializers
+
+from .models import SellerProfile
+
+# -----------------------------
+# Fast read-path serialization
+# -----------------------------
+# Hot read endpoints build their responses from values() rows instead of
+# ModelSerializer instances. The output must stay identical to the DRF
+# serializers, so scalar formatting is delegated to DRF's own field classes.
+# The Fast*SerializerTests in the app tests compare both paths.
+
+_datetime_field = serializers.DateTimeField()
+_decimal_field = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+def format_datetime(value):
+    return _datetime_field.to_representation(value) if value is not None else None
+
+
+def format_decimal(value):
+    return _decimal_field.to_representation(value) if value is not None else None
+
+
+def file_url(name, request):
+    """
+    Same as DRF's ImageField: absolute URL when a request is available.
+    """
+    if not name:
+        return None
+    url = default_storage.url(name)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def uses_sparse_fields(request):
+    # ?fields= / ?expand= are handled by SparseFieldsMixin on the DRF serializers
+    return 'fields' in request.query_params
+
+
+def profile_values(prefix=''):
+    return tuple(prefix + name for name in (
+        'id', 'user_id', 'role', 'role_confirmed', 'full_name', 'user__email',
+        'profile_picture', 'seller_profile__store_name', 'created_at',
+    ))
+
+
+def serialize_profile(row, request, prefix=''):
+    """
+    Mirrors ProfileSerializer for a row fetched with profile_values(prefix).
+    """
+    return {
+        'id': str(row[prefix + 'id']),
+        'user': row[prefix + 'user_id'],
+        'role': row[prefix + 'role'],
+        'role_confirmed': row[prefix + 'role_confirmed'],
+        'full_name': row[prefix + 'full_name'],
+        'user_email': row[prefix + 'user__email'],
+        'profile_picture': file_url(row[prefix + 'profile_picture'], request),
+        'seller_name': row[prefix + 'seller_profile__store_name'],
+        'created_at': format_datetime(row[prefix + 'created_at']),
+    }
+
+
+SELLER_VALUES = (
+    'id', 'store_name', 'store_logo', 'store_description', 'profile__user__phonenumber',
+    'is_verified', 'is_blacklisted', 'created_at',
+    'address__id', 'address__region', 'address__city', 'address__country', 'address__institution',
+    'address__campus', 'address__building', 'address__landmark',
+    'payment__id', 'payment__bank_name', 'payment__bank_account', 'payment__service_provider',
+    'payment__momo_name', 'payment__momo_number',
+    'verification__id', 'verification__id_type', 'verification__id_number', 'verification__id_card_image',
+    'verification__selfie_with_id', 'verification__status', 'verification__note',
+    'verification__submitted_at', 'verification__reviewed_at',
+) + profile_values('profile__')
+
+
+def _serialize_seller(row, request):
+    phonenumber = row['profile__user__phonenumber']
+
+    address = None
+    if row['address__id'] is not None:
+        address = {
+            'id': str(row['address__id']),
+            'region': row['address__region'],
+            'city': row['address__city'],
+            'country': row['address__country'],
+            'institution': row['address__institution'],
+            'campus': row['address__campus'],
+            'building': row['address__building'],
+            'landmark': row['address__landmark'],
+        }
+
+    payment = None
+    if row['payment__id'] is not None:
+        payment = {
+            'id': str(row['payment__id']),
+            'bank_name': row['payment__bank_name'],
+            'bank_account': row['payment__bank_account'],
+            'service_provider': row['payment__service_provider'],
+            'momo_name': row['payment__momo_name'],
+            'momo_number': row['payment__momo_number'],
+        }
+
+    verification = None
+    if row['verification__id'] is not None:
+        verification = {
+            'id': str(row['verification__id']),
+            'id_type': row['verification__id_type'],
+            'id_number': row['verification__id_number'],
+            'id_card_image': file_url(row['verification__id_card_image'], request),
+            'selfie_with_id': file_url(row['verification__selfie_with_id'], request),
+            'status': row['verification__status'],
+            'note': row['verification__note'],
+            'submitted_at': format_datetime(row['verification__submitted_at']),
+            'reviewed_at': format_datetime(row['verification__reviewed_at']),
+        }
+
+    return {
+        'id': str(row['id']),
+        'profile': serialize_profile(row, request, prefix='profile__'),
+        'store_name': row['store_name'],
+        'store_logo': file_url(row['store_logo'], request),
+        'store_description': row['store_description'],
+        'phonenumber': str(phonenumber) if phonenumber is not None else None,
+        'address': address,
+        'payment': payment,
+        'verification': verification,
+        'is_verified': row['is_verified'],
+        'is_blacklisted': row['is_blacklisted'],
+        'created_at': format_datetime(row['created_at']),
+    }
+
+
+def serialize_sellers(seller_ids, request):
+    """
+    Mirrors SellerProfileSerializer. Returns {seller_id: data} from one query.
+    """
+    if not seller_ids:
+        return {}
+
+    rows = SellerProfile.objects.filter(id__in=seller_ids).values(*SELLER_VALUES)
+    return {row['id']: _serialize_seller(row, request) for row in rows}
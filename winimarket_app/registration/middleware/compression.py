@@ -0,0 +1,129 @@
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None  # Brotli not installed, gzip only
+
+# BREACH: a compressed response that carries a secret next to reflected
+# input leaks the secret through its length. So, like Django's
+# GZipMiddleware:
+# - gzip output gets 0-100 random bytes in its header, varying the length
+# - HTML is left out on purpose: pages carry CSRF tokens
+# Brotli has no room for such padding, so the views answering with JWTs
+# (login, refresh, register) are never compressed at all.
+GZIP_MAX_RANDOM_BYTES = 100
+
+DEFAULT_EXCLUDED_VIEWS = (
+    'registration:token_obtain_pair',
+    'registration:token_refresh',
+    'registration:register',
+)
+
+DEFAULT_CONTENT_TYPES = (
+    'application/json',
+    'application/javascript',
+    'text/javascript',
+    'text/css',
+    'text/csv',
+    'text/plain',
+    'application/xml',
+    'image/svg+xml',
+)
+
+re_accepts_br = re.compile(r'\bbr\b')
+re_accepts_gzip = re.compile(r'\bgzip\b')
+
+
+def _compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=5)
+    return compress_string(content, max_random_bytes=GZIP_MAX_RANDOM_BYTES)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress responses with brotli (when installed) or gzip.
+
+    Only allow-listed content types are compressed, and never the views in
+    COMPRESSION_EXCLUDED_VIEWS. Regular responses must be at least
+    COMPRESSION_MIN_LENGTH bytes; streaming responses (exports) are
+    compressed chunk by chunk so memory stays flat.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_length = getattr(settings, 'COMPRESSION_MIN_LENGTH', 1024)
+        self.content_types = set(getattr(settings, 'COMPRESSION_CONTENT_TYPES', DEFAULT_CONTENT_TYPES))
+        self.excluded_views = set(getattr(settings, 'COMPRESSION_EXCLUDED_VIEWS', DEFAULT_EXCLUDED_VIEWS))
+
+    def _choose_encoding(self, request):
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+
+        if brotli is not None and re_accepts_br.search(accept_encoding):
+            return 'br'
+        if re_accepts_gzip.search(accept_encoding):
+            return 'gzip'
+        return None
+
+    def _compress_stream(self, streaming_content, encoding):
+        if encoding == 'gzip':
+            yield from compress_sequence(streaming_content, max_random_bytes=GZIP_MAX_RANDOM_BYTES)
+            return
+
+        compressor = brotli.Compressor(quality=5)
+        for chunk in streaming_content:
+            data = compressor.process(chunk)
+            if data:
+                yield data
+
+        yield compressor.finish()
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type not in self.content_types:
+            return response
+
+        match = getattr(request, 'resolver_match', None)
+        if match is not None and match.view_name in self.excluded_views:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encoding = self._choose_encoding(request)
+        if not encoding:
+            return response
+
+        if response.streaming:
+            if getattr(response, 'is_async', False):
+                return response
+
+            response.streaming_content = self._compress_stream(response.streaming_content, encoding)
+            del response['Content-Length']
+        else:
+            if len(response.content) < self.min_length:
+                return response
+
+            compressed = _compress(response.content, encoding)
+
+            if len(compressed) >= len(response.content):
+                return response
+
+            response.content = compressed
+            response['Content-Length'] = str(len(response.content))
+
+        # The compressed body is no longer byte-identical to the original
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+
+        response['Content-Encoding'] = encoding
+        return response
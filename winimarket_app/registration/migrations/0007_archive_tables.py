@@ -0,0 +1,51 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:01
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registration', '0006_alter_sellerprofile_store_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedSellerNotificationLog',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('event', models.CharField(max_length=50)),
+                ('channel', models.CharField(choices=[('email', 'Email'), ('push', 'Push')], max_length=10)),
+                ('subject', models.CharField(blank=True, max_length=255)),
+                ('payload', models.JSONField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')], max_length=20)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='sellernotificationlog',
+            index=models.Index(fields=['created_at'], name='registratio_created_6a38eb_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedsellernotificationlog',
+            name='seller',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_notification_logs', to='registration.sellerprofile'),
+        ),
+        migrations.AddField(
+            model_name='archivedsellernotificationlog',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_seller_notification_logs', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='archivedsellernotificationlog',
+            index=models.Index(fields=['seller', 'created_at'], name='registratio_seller__f3a9cd_idx'),
+        ),
+    ]
@@ -301,6 +301,7 @@ class SellerNotificationLog(models.Model):
         indexes = [
             models.Index(fields=["seller", "event"]),
             models.Index(fields=["user"]),
+            models.Index(fields=["created_at"]),  # Archival scan
         ]
 
     def mark_sent(self):
@@ -311,3 +312,27 @@ class SellerNotificationLog(models.Model):
     def mark_failed(self):
         self.status = "failed"
         self.save(update_fields=["status"])
+
+class ArchivedSellerNotificationLog(models.Model):
+    """
+    Old seller notification logs, moved out of SellerNotificationLog by
+    order.archive.archive_old_records()
+    """
+
+    id = models.UUIDField(primary_key=True, editable=False)
+    seller = models.ForeignKey(SellerProfile, on_delete=models.CASCADE, related_name="archived_notification_logs")
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="archived_seller_notification_logs")
+    event = models.CharField(max_length=50)
+    channel = models.CharField(max_length=10, choices=(("email", "Email"), ("push", "Push")))
+    subject = models.CharField(max_length=255, blank=True)
+    payload = models.JSONField(blank=True, null=True)
+    status = models.CharField(max_length=20, choices=(("pending", "Pending"), ("sent", "Sent"), ("failed", "Failed")))
+    sent_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["seller", "created_at"]),
+        ]
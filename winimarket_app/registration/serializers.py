@@ -11,6 +11,65 @@ from django.conf import settings
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.contrib.auth import authenticate
 from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+
+class SparseFieldsMixin:
+    """
+    Sparse fieldsets for read endpoints.
+
+    ?fields=id,name,price keeps only the listed fields. Relations declared in
+    Meta.expandable_fields are rendered as primary keys unless they are also
+    listed in ?expand=seller,images. Without ?fields, or on a write, the full
+    serializer is used, so existing clients are unaffected.
+    """
+
+    def _is_root_serializer(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def _sparse_params(self):
+        request = self.context.get('request')
+        query_params = getattr(request, 'query_params', None)
+
+        if query_params is None or 'fields' not in query_params:
+            return None, set()
+        # Writes keep every field: a relation swapped for read only keys would drop its input
+        if request.method not in SAFE_METHODS:
+            return None, set()
+
+        def parse(value):
+            return {name.strip() for name in value.split(',') if name.strip()}
+
+        return parse(query_params.get('fields', '')), parse(query_params.get('expand', ''))
+
+    def get_fields(self):
+        fields = super().get_fields()
+
+        if not self._is_root_serializer():
+            return fields
+
+        requested, expand = self._sparse_params()
+        if requested is None:
+            return fields
+
+        expandable = getattr(self.Meta, 'expandable_fields', ())
+        keep = requested | expand
+
+        for name, field in list(fields.items()):
+            if field.write_only:
+                continue
+            if name not in keep:
+                fields.pop(name)
+            elif name in expandable and name not in expand:
+                fields[name] = serializers.PrimaryKeyRelatedField(
+                    source=field.source,
+                    read_only=True,
+                    many=isinstance(field, serializers.ListSerializer)
+                )
+
+        return fields
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     username_field = 'email_or_phonenumber'
@@ -6,7 +6,7 @@ const cache = new Map()
 export async function fetchProducts(filters = {}, page=1){
     let url = '/products/api/products/'
 
-    const params = new URLSearchParams({...filters, page}).toString();
+    const params = new URLSearchParams({...filters, page, view: 'card'}).toString();
     const fullUrl = params ? `${url}?${params}` : url
 
     if(cache.has(fullUrl)){
@@ -133,7 +133,7 @@ export async function renderProducts(filters = {}, append = false) {
             productElement.innerHTML = `
             <a href="/product/detail/${product.id}/${product.slug}/" class="product-link">
                 <div class="product-img">
-                    <img src="${product.images[0]?.image}" alt="${product.name}" loading="lazy"/>
+                    <img src="${product.image}" alt="${product.name}" loading="lazy"/>
                 </div>
                 <div class="product-info">
                     <h3 class="product-name">${product.name}</h3>
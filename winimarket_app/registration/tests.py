@@ -1,3 +1,34 @@
-from django.test import TestCase
+import gzip
 
-# Create your tests here.
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+from django.urls import resolve
+
+from .middleware.compression import CompressionMiddleware
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    body = b'{"results": [' + b'{"name": "Desk lamp", "price": "12.00"},' * 200 + b'{}]}'
+
+    def respond(self, path, accept_encoding='gzip'):
+        request = RequestFactory().get(path, HTTP_ACCEPT_ENCODING=accept_encoding)
+        request.resolver_match = resolve(path)
+        middleware = CompressionMiddleware(lambda request: HttpResponse(self.body, content_type='application/json'))
+        return middleware(request)
+
+    def test_gzip_length_varies_between_responses(self):
+        responses = [self.respond('/order/api/checkout/') for _ in range(20)]
+
+        for response in responses:
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertEqual(gzip.decompress(response.content), self.body)
+        # Random header padding, as in Django's GZipMiddleware (BREACH)
+        self.assertGreater(len({len(response.content) for response in responses}), 1)
+
+    def test_token_responses_are_never_compressed(self):
+        for path in ('/account/api/login/', '/account/api/login/refresh/', '/account/api/register/'):
+            for encoding in ('gzip', 'br, gzip'):
+                with self.subTest(path=path, encoding=encoding):
+                    response = self.respond(path, encoding)
+                    self.assertFalse(response.has_header('Content-Encoding'))
+                    self.assertEqual(response.content, self.body)
@@ -27,8 +27,7 @@ from .emails import send_verification_email
 from order.models import OrderStatus, OrderItem, Order, OrderTrackingStatus
 from products.models import Product
 from django.http import HttpResponse
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment
+from winimarket_app.exports import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export_response, format_export_datetime
 from datetime import datetime, timedelta
 
 # -----------------------------
@@ -100,36 +99,32 @@ def password_reset_page(request, uidb64, token):
 
 @staff_member_required
 def export_sellers_to_excel(request):
-    sellers = SellerProfile.objects.select_related('profile__user').all()
-
-    workbook = Workbook()
-    sheet = workbook.active
-    sheet.title = "Sellers"
+    export_format = request.GET.get('type', 'xlsx')
+    if export_format not in EXPORT_FORMATS:
+        export_format = 'xlsx'
 
     headers = ["Seller ID", "Store Name", "Email", "Phone Number", "Is Verified", "Created At"]
-    sheet.append(headers)
-
-    for cell in sheet[1]:
-        cell.font = Font(bold=True)
-        cell.alignment = Alignment(horizontal='center')
-
-    for seller in sellers:
-        row = [
-            str(seller.id),
-            seller.store_name if seller.store_name else "None",
-            seller.profile.user.email,
-            str(seller.profile.user.phonenumber),
-            "Yes" if seller.is_verified else "No",
-            seller.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-        ]
-        sheet.append(row)
 
-    filename = f"winimarket_sellers_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    sellers = (
+        SellerProfile.objects
+        .order_by('created_at')
+        .values_list('id', 'store_name', 'profile__user__email', 'profile__user__phonenumber', 'is_verified', 'created_at')
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+    rows = (
+        [
+            str(seller_id),
+            store_name if store_name else "None",
+            email,
+            str(phonenumber),
+            "Yes" if is_verified else "No",
+            format_export_datetime(created_at),
+        ]
+        for seller_id, store_name, email, phonenumber, is_verified, created_at in sellers
+    )
 
-    response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-    response['Content-Disposition'] = f'attachment; filename={filename}'
-    workbook.save(response)
-    return response
+    return export_response(export_format, 'winimarket_sellers', headers, rows, sheet_title='Sellers')
 
 
 # -----------------------------
@@ -0,0 +1,99 @@
+import csv
+import tempfile
+from datetime import datetime
+
+from django.http import FileResponse, StreamingHttpResponse
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font
+
+# -----------------------------
+# Streaming CSV / XLSX exports
+# -----------------------------
+# Rows are plain iterables (usually a values_list(...).iterator(chunk_size=...)
+# piped through a formatter), so memory stays flat whatever the row count:
+# - CSV is written row by row into a StreamingHttpResponse
+# - XLSX uses openpyxl's write-only mode, which spools rows to disk; the
+#   finished file is then streamed from a temporary file
+# Text cells starting with a formula character are prefixed with a quote in
+# both formats, so a product name like "=HYPERLINK(...)" a seller typed in
+# is shown as text instead of run by the spreadsheet.
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FORMATS = ('csv', 'xlsx')
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def export_filename(prefix, extension):
+    return f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+
+
+def format_export_datetime(value):
+    return value.strftime("%Y-%m-%d %H:%M:%S") if value else ""
+
+
+def escape_formula(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def _escaped(row):
+    return [escape_formula(value) for value in row]
+
+
+def stream_csv(filename, headers, rows):
+    writer = csv.writer(_Echo())
+
+    def generate():
+        yield '\ufeff'  # BOM so Excel opens UTF-8 correctly
+        yield writer.writerow(headers)
+        for row in rows:
+            yield writer.writerow(_escaped(row))
+
+    response = StreamingHttpResponse(generate(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def stream_xlsx(filename, headers, rows, sheet_title='Sheet'):
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_title)
+
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(sheet, value=header)
+        cell.font = Font(bold=True)
+        cell.alignment = Alignment(horizontal='center')
+        header_cells.append(cell)
+    sheet.append(header_cells)
+
+    for row in rows:
+        sheet.append(_escaped(row))
+
+    # FileResponse closes the temporary file (and so deletes it) when done
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+
+    return FileResponse(output, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
+
+
+def export_response(export_format, filename_prefix, headers, rows, sheet_title='Sheet'):
+    """
+    Stream rows as CSV or XLSX. export_format must be one of EXPORT_FORMATS.
+    """
+    if export_format == 'xlsx':
+        return stream_xlsx(export_filename(filename_prefix, 'xlsx'), headers, rows, sheet_title)
+    return stream_csv(export_filename(filename_prefix, 'csv'), headers, rows)
@@ -0,0 +1,352 @@
+import ipaddress
+import logging
+import random
+import socket
+import threading
+import time
+from bisect import bisect_left
+from urllib.parse import urljoin, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# Outbound HTTP client
+# -----------------------------
+# Every call to a third party API (Paystack, Pexels, image downloads) goes
+# through request() so that, per process:
+# - connections are kept alive in one pool per host (no TCP + TLS handshake
+#   per call)
+# - failed calls are retried a bounded number of times with full jitter
+#   backoff; POSTs only when no connection could be made, since a dropped
+#   connection may come after the server read the body
+# - a host that keeps failing trips a circuit breaker: calls fail fast with
+#   CircuitOpen for BREAKER_COOLDOWN seconds, then one trial call decides
+#   whether it closes again
+# - call latencies are counted in per host histograms, see snapshot()
+# URLs that come from users (import image URLs) go through get_public()
+# instead, which refuses hosts resolving to private, loopback, link-local
+# or reserved addresses and checks every redirect hop the same way. It then
+# connects to the address it checked (a DNS answer that changes between the
+# check and the connect cannot redirect it) while Host, SNI and the
+# certificate check still use the host name. Those
+# calls are untracked: their hosts are not added to the breakers and
+# histograms, which would otherwise grow with every seller supplied host.
+
+DEFAULT_TIMEOUT = (5, 15)  # connect, read
+DEFAULT_RETRIES = 2
+BACKOFF_BASE = 0.2  # seconds, doubled per attempt
+BACKOFF_MAX = 2.0
+
+POOL_CONNECTIONS = 10  # hosts kept
+POOL_MAXSIZE = 16  # connections per host, above the uWSGI thread count
+
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+BREAKER_FAILURE_THRESHOLD = 5  # consecutive failed calls
+BREAKER_COOLDOWN = 30  # seconds
+
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+MAX_PUBLIC_REDIRECTS = 3
+
+
+class OutboundHTTPError(requests.RequestException):
+    """
+    The call failed after its retries. Subclasses RequestException so
+    existing `except requests.RequestException` handlers keep working.
+    """
+
+
+class CircuitOpen(OutboundHTTPError):
+    """
+    The host failed too often recently; the call was not attempted.
+    """
+
+
+class UnsafeURL(OutboundHTTPError):
+    """
+    The URL is not http(s) or points at a non public address; not fetched.
+    """
+
+
+class CircuitBreaker:
+    def __init__(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.trial_thread = None
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < BREAKER_COOLDOWN or self.trial_running:
+                return False
+            # Half open: let one call through to probe the host
+            self.trial_running = True
+            self.trial_thread = threading.get_ident()
+            return True
+
+    def end_trial(self):
+        """
+        Let another trial through if this thread's trial ended without
+        record() (an exception other than a RequestException).
+        """
+        with self.lock:
+            if self.trial_running and self.trial_thread == threading.get_ident():
+                self.trial_running = False
+
+    def record(self, success):
+        with self.lock:
+            self.trial_running = False
+            if success:
+                self.failures = 0
+                self.opened_at = None
+                return
+
+            self.failures += 1
+            if self.opened_at is not None or self.failures >= BREAKER_FAILURE_THRESHOLD:
+                self.opened_at = time.monotonic()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        return 'half_open' if time.monotonic() - self.opened_at >= BREAKER_COOLDOWN else 'open'
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, elapsed_ms):
+        with self.lock:
+            self.buckets[bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+            self.count += 1
+            self.total_ms += elapsed_ms
+
+    def as_dict(self):
+        labels = [f"le_{bound}" for bound in LATENCY_BUCKETS_MS] + ['inf']
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_ms / self.count, 2) if self.count else 0,
+            'buckets': dict(zip(labels, self.buckets)),
+        }
+
+
+_session = None
+_breakers = {}
+_histograms = {}
+_state_lock = threading.Lock()
+
+
+def get_session():
+    global _session
+    with _state_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+        return _session
+
+
+def _host_state(host):
+    with _state_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker()
+            _histograms[host] = LatencyHistogram()
+        return _breakers[host], _histograms[host]
+
+
+def _backoff(attempt):
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def _retryable(method, exc):
+    if method in IDEMPOTENT_METHODS:
+        return True
+    # Only retry a POST when the connection was never established. "Connection
+    # aborted" and a closed socket are ConnectionErrors too, but they can come
+    # after the body was sent and the server acted on it.
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+    reason = getattr(exc.args[0], 'reason', None) if exc.args else None
+    return isinstance(exc, requests.ConnectionError) and isinstance(reason, NewConnectionError)
+
+
+def request(method, url, *, retries=DEFAULT_RETRIES, timeout=DEFAULT_TIMEOUT, track=True, session=None, **kwargs):
+    """
+    requests.request() through the shared pool, with retries, the host's
+    circuit breaker and latency tracking. Returns the Response (any status
+    once retries are spent); raises OutboundHTTPError / CircuitOpen.
+
+    With track=False nothing is kept for the host: the breaker and the
+    histogram only last for this call. session replaces the shared pool.
+    """
+    method = method.upper()
+    host = urlsplit(url).netloc
+    breaker, histogram = _host_state(host) if track else (CircuitBreaker(), LatencyHistogram())
+
+    for attempt in range(retries + 1):
+        if not breaker.allow():
+            raise CircuitOpen(f"Circuit open for {host}")
+
+        started = time.perf_counter()
+        try:
+            response = (session or get_session()).request(method, url, timeout=timeout, **kwargs)
+        except requests.RequestException as exc:
+            histogram.observe((time.perf_counter() - started) * 1000)
+            breaker.record(success=False)
+            if attempt == retries or not _retryable(method, exc):
+                raise OutboundHTTPError(f"{method} {host} failed: {exc}") from exc
+            logger.warning("%s %s failed (%s), retrying", method, host, exc)
+        else:
+            histogram.observe((time.perf_counter() - started) * 1000)
+            breaker.record(success=response.status_code < 500)
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                return response
+            if method not in IDEMPOTENT_METHODS and response.status_code != 429:
+                return response
+            logger.warning("%s %s returned %s, retrying", method, host, response.status_code)
+            response.close()
+        finally:
+            breaker.end_trial()
+
+        time.sleep(_backoff(attempt))
+
+
+def _is_public(address):
+    if address.version == 6 and address.ipv4_mapped:
+        address = address.ipv4_mapped
+    return address.is_global and not address.is_multicast
+
+
+def check_public_url(url, resolve=True):
+    """
+    Raise UnsafeURL unless url is http(s) on a public host. IP literals
+    are always checked; with resolve, so is every address a host name
+    resolves to. Returns the addresses checked (none for an unresolved
+    host name).
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise UnsafeURL(f"Not an http(s) URL: {url}")
+
+    host = parts.hostname
+    try:
+        addresses = [ipaddress.ip_address(host)]
+    except ValueError:
+        if host == 'localhost' or host.endswith('.localhost'):
+            raise UnsafeURL(f"Local host in {url}")
+        if not resolve:
+            return []
+        try:
+            port = parts.port or (443 if parts.scheme == 'https' else 80)
+            infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except (socket.gaierror, ValueError) as exc:
+            raise UnsafeURL(f"Cannot resolve {host}") from exc
+        addresses = [ipaddress.ip_address(info[4][0].split('%')[0]) for info in infos]
+
+    for address in addresses:
+        if not _is_public(address):
+            raise UnsafeURL(f"{host} is not a public address ({address})")
+    return addresses
+
+
+class _PinnedAdapter(HTTPAdapter):
+    """
+    Transport for a URL whose host was replaced by a checked address: TLS
+    still sends the host name as SNI and verifies the certificate for it.
+    """
+
+    def __init__(self, hostname):
+        self.hostname = hostname
+        super().__init__(max_retries=0)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['server_hostname'] = self.hostname
+        kwargs['assert_hostname'] = self.hostname
+        super().init_poolmanager(*args, **kwargs)
+
+
+def _pinned(url, address):
+    """
+    (url with its host replaced by address, Host header, session to send it with)
+    """
+    parts = urlsplit(url)
+    port = f":{parts.port}" if parts.port else ''
+    host = f"[{address}]" if address.version == 6 else str(address)
+    hostname = f"[{parts.hostname}]" if ':' in parts.hostname else parts.hostname
+
+    session = requests.Session()
+    session.trust_env = False  # a proxy would resolve the host name again
+    adapter = _PinnedAdapter(parts.hostname)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return parts._replace(netloc=f"{host}{port}").geturl(), f"{hostname}{port}", session
+
+
+def get_public(url, *, max_redirects=MAX_PUBLIC_REDIRECTS, headers=None, **kwargs):
+    """
+    GET a URL someone else supplied. The host must resolve to public
+    addresses only and the connection goes to the first address checked;
+    redirects are followed by hand so each hop is checked the same way.
+    Raises UnsafeURL.
+    """
+    for _ in range(max_redirects + 1):
+        address = check_public_url(url)[0]
+        pinned_url, host, session = _pinned(url, address)
+        response = request(
+            'GET', pinned_url, allow_redirects=False, track=False, session=session,
+            headers={**(headers or {}), 'Host': host}, **kwargs
+        )
+        if not response.is_redirect:
+            return response
+        url = urljoin(url, response.headers['Location'])
+        response.close()
+
+    raise UnsafeURL(f"More than {max_redirects} redirects")
+
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request('POST', url, **kwargs)
+
+
+def snapshot():
+    """
+    Per host breaker state and latency histogram of this process.
+    """
+    with _state_lock:
+        hosts = list(_breakers)
+    return {
+        host: {'circuit': _breakers[host].state, 'failures': _breakers[host].failures, **_histograms[host].as_dict()}
+        for host in hosts
+    }
+
+
+def reset():
+    """
+    Forget breakers, histograms and pooled connections (tests / checks).
+    """
+    global _session
+    with _state_lock:
+        _breakers.clear()
+        _histograms.clear()
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -0,0 +1,30 @@
+import orjson
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import JSONRenderer
+
+_encoder = JSONEncoder()
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement for DRF's JSONRenderer backed by orjson.
+
+    UUID, datetime, date and time are encoded natively by orjson; anything
+    else (Decimal, lazy strings, querysets...) falls back to DRF's encoder so
+    the same data comes out. Not always the same bytes, though: NaN and
+    Infinity floats become null where DRF's strict JSON raises ValueError.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        option = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+        if self.get_indent(accepted_media_type, renderer_context):
+            option |= orjson.OPT_INDENT_2
+
+        ret = orjson.dumps(data, default=_encoder.default, option=option)
+
+        # Same as DRF: keep the output safe to embed in a <script> tag
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
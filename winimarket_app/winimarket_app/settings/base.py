@@ -43,6 +43,7 @@ INSTALLED_APPS = [
     'cart.apps.CartConfig',
     'order.apps.OrderConfig',
     'payment.apps.PaymentConfig',
+    'analytics.apps.AnalyticsConfig',
     'rest_framework',
     'phonenumber_field',
     'django.contrib.admin',
@@ -84,6 +85,19 @@ SITE_URL = "http://127.0.0.1:8000"
 
 PAYSTACK_TESTED_PUBLIC_API_KEY = config('PAYSTACK_TESTED_PUBLIC_API_KEY', default="")
 PAYSTACK_TESTED_SECRET_API_KEY = config('PAYSTACK_TESTED_SECRET_API_KEY', default="")
+PAYSTACK_BASE_URL = config('PAYSTACK_BASE_URL', default="https://api.paystack.co")
+
+# Delivered orders the buyer never confirms are completed (escrow released) after this many days
+ORDER_AUTO_COMPLETE_DAYS = config('ORDER_AUTO_COMPLETE_DAYS', default=7, cast=int)
+
+# Unpaid orders are cancelled (and their stock released) after this many minutes
+ORDER_PENDING_EXPIRY_MINUTES = config('ORDER_PENDING_EXPIRY_MINUTES', default=30, cast=int)
+
+# Carts nobody has touched for this many days are marked abandoned
+CART_ABANDON_DAYS = config('CART_ABANDON_DAYS', default=14, cast=int)
+
+# Completed / cancelled orders and notification logs older than this many months move to the archive tables
+ARCHIVE_AFTER_MONTHS = config('ARCHIVE_AFTER_MONTHS', default=6, cast=int)
 
 # Lock after 4 failed attempts
 AXES_FAILURE_LIMIT = 4
@@ -105,6 +119,7 @@ AXES_USERNAME_CALLABLE = get_axes_username
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'registration.middleware.compression.CompressionMiddleware',
     'axes.middleware.AxesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -146,9 +161,21 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
-    ]
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'winimarket_app.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'winimarket_app.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# Response compression (registration.middleware.compression)
+COMPRESSION_MIN_LENGTH = 1024  # bytes
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=180),
@@ -187,6 +214,17 @@ SESSION_EXPIRE_AT_BROWSER_CLOSE = False
 } """
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'winimarket',
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
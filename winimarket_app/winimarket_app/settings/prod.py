@@ -1,4 +1,5 @@
 from .base import *
+import logging
 from decouple import config
 from storages.backends.gcloud import GoogleCloudStorage
 
@@ -24,6 +25,24 @@ DATABASES = {
 
 SITE_URL = "https://winimarket-27948306085.us-east1.run.app"
 
+# Shared cache (product cards, dashboard stats, recently viewed). Set
+# REDIS_URL: with the per-process LocMemCache from base an invalidation only
+# reaches the instance that made it, so the others serve stale entries until
+# they time out.
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    logging.getLogger(__name__).warning(
+        "REDIS_URL is not set: using a per-process cache, other instances may serve stale cards and stats"
+    )
+
 # Max size (in bytes)
 # Example: 50 MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 52428800  # 50 * 1024 * 1024
@@ -0,0 +1,39 @@
+import uuid
+from decimal import Decimal
+
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from products.models import Product
+from registration.models import CustomUser
+
+# -----------------------------
+# Test factories
+# -----------------------------
+# Shared by the app test modules so none of them imports another app's tests.
+
+
+def make_user(role='buyer'):
+    user = CustomUser.objects.create_user(email=f"test-{uuid.uuid4().hex[:12]}@example.com", password=uuid.uuid4().hex)
+    if role == 'seller':
+        user.profile.role = 'seller'
+        user.profile.save()
+    return user
+
+
+def make_products(seller, count, category=None, price='10.00'):
+    return Product.objects.bulk_create([
+        Product(
+            seller=seller.profile.seller_profile, name=f"Test product {index}", slug=f"test-{uuid.uuid4().hex}",
+            description='Test', price=Decimal(price), min_price=Decimal(price), max_price=Decimal(price),
+            quantity=10, category=category,
+        )
+        for index in range(count)
+    ])
+
+
+def api_request(user=None):
+    request = Request(RequestFactory().get('/'))
+    if user is not None:
+        request.user = user
+    return request
@@ -0,0 +1,271 @@
+import csv
+import io
+import ipaddress
+import json
+import socket
+import threading
+import time
+from collections import Counter, defaultdict
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.test import SimpleTestCase
+from openpyxl import load_workbook
+
+from . import exports, http_client
+
+
+class UpstreamStub(BaseHTTPRequestHandler):
+    """
+    Local upstream: /ok, /flaky/<key> (503 twice, then 200), /down (500),
+    /slow (answers after 300ms), /drop (closes without answering), /to-ok
+    and /to-metadata (redirects).
+    """
+    redirects = {'/to-ok': '/ok', '/to-metadata': 'http://169.254.169.254/latest/meta-data/'}
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    hits = Counter()
+    client_ports = defaultdict(set)  # path -> client ports seen
+    host_headers = {}  # path -> last Host header
+
+    def _reply(self, code, location=None):
+        self.client_ports[self.path].add(self.client_address[1])
+        body = json.dumps({'path': self.path}).encode()
+        try:
+            self.send_response(code)
+            if location:
+                self.send_header('Location', location)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client timed out on /slow
+
+    def _handle(self):
+        if self.headers.get('Content-Length'):
+            self.rfile.read(int(self.headers['Content-Length']))
+        self.hits[self.path] += 1
+        self.host_headers[self.path] = self.headers.get('Host')
+
+        if self.path.startswith('/flaky/'):
+            return self._reply(503 if self.hits[self.path] <= 2 else 200)
+        if self.path == '/down':
+            return self._reply(500)
+        if self.path == '/drop':
+            self.close_connection = True
+            return
+        if self.path in self.redirects:
+            return self._reply(302, self.redirects[self.path])
+        if self.path == '/slow':
+            time.sleep(0.3)
+        self._reply(200)
+
+    do_GET = _handle
+    do_POST = _handle
+
+    def log_message(self, *args):
+        pass
+
+
+class HTTPClientTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        server = ThreadingHTTPServer(('127.0.0.1', 0), UpstreamStub)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        cls.addClassCleanup(server.server_close)
+        cls.addClassCleanup(server.shutdown)
+        cls.host = f"127.0.0.1:{server.server_port}"
+        cls.base = f"http://{cls.host}"
+
+        cls.enterClassContext(mock.patch.object(http_client, 'BACKOFF_BASE', 0.01))
+        cls.enterClassContext(mock.patch.object(http_client, 'BREAKER_COOLDOWN', 0.5))
+
+    def setUp(self):
+        UpstreamStub.hits.clear()
+        UpstreamStub.client_ports.clear()
+        http_client.reset()
+        self.addCleanup(http_client.reset)
+
+    def test_sequential_calls_reuse_one_connection(self):
+        for _ in range(20):
+            http_client.get(f"{self.base}/ok")
+        self.assertEqual(len(UpstreamStub.client_ports['/ok']), 1)
+
+    def test_get_is_retried_through_503s(self):
+        with self.assertLogs('winimarket_app.http_client', 'WARNING'):
+            response = http_client.get(f"{self.base}/flaky/get")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(UpstreamStub.hits['/flaky/get'], 3)
+
+    def test_post_that_reached_the_server_is_not_retried(self):
+        response = http_client.post(f"{self.base}/flaky/post")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(UpstreamStub.hits['/flaky/post'], 1)
+
+        with self.assertRaises(http_client.OutboundHTTPError):
+            http_client.post(f"{self.base}/slow", timeout=(1, 0.1))
+        self.assertEqual(UpstreamStub.hits['/slow'], 1)
+
+        # Dropped after the body was read: the server may have acted on it
+        with self.assertRaises(http_client.OutboundHTTPError):
+            http_client.post(f"{self.base}/drop", json={'amount': 100})
+        self.assertEqual(UpstreamStub.hits['/drop'], 1)
+
+    def test_post_that_could_not_connect_is_retried(self):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            closed_port = sock.getsockname()[1]
+
+        with self.assertRaises(http_client.OutboundHTTPError), \
+                self.assertLogs('winimarket_app.http_client', 'WARNING') as logs:
+            http_client.post(f"http://127.0.0.1:{closed_port}/charge", retries=1)
+        self.assertEqual(len(logs.records), 1)
+
+    def test_get_that_timed_out_is_retried(self):
+        with self.assertRaises(http_client.OutboundHTTPError), self.assertLogs('winimarket_app.http_client', 'WARNING'):
+            http_client.get(f"{self.base}/slow", timeout=(1, 0.1), retries=1)
+        self.assertEqual(UpstreamStub.hits['/slow'], 2)
+
+    def test_circuit_opens_then_half_opens_and_closes(self):
+        for _ in range(http_client.BREAKER_FAILURE_THRESHOLD):
+            http_client.get(f"{self.base}/down", retries=0)
+
+        with self.assertRaises(http_client.CircuitOpen):
+            http_client.get(f"{self.base}/ok")
+        self.assertEqual(UpstreamStub.hits['/ok'], 0)
+
+        time.sleep(0.6)
+        self.assertEqual(http_client.snapshot()[self.host]['circuit'], 'half_open')
+        self.assertEqual(http_client.get(f"{self.base}/ok").status_code, 200)
+        self.assertEqual(http_client.snapshot()[self.host]['circuit'], 'closed')
+
+    def test_trial_that_raised_something_else_does_not_block_the_host(self):
+        for _ in range(http_client.BREAKER_FAILURE_THRESHOLD):
+            http_client.get(f"{self.base}/down", retries=0)
+        time.sleep(0.6)
+
+        with mock.patch.object(http_client.get_session(), 'request', side_effect=ValueError('bad header')):
+            with self.assertRaises(ValueError):
+                http_client.get(f"{self.base}/ok")
+
+        # The next call is the trial again, not refused until a restart
+        self.assertEqual(http_client.get(f"{self.base}/ok").status_code, 200)
+        self.assertEqual(http_client.snapshot()[self.host]['circuit'], 'closed')
+
+    def test_latencies_are_counted_per_host(self):
+        http_client.get(f"{self.base}/ok")
+        http_client.get(f"{self.base}/down", retries=0)
+
+        stats = http_client.snapshot()[self.host]
+        self.assertEqual(stats['count'], 2)
+        self.assertEqual(sum(stats['buckets'].values()), 2)
+
+
+class PublicURLTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        server = ThreadingHTTPServer(('127.0.0.1', 0), UpstreamStub)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        cls.addClassCleanup(server.server_close)
+        cls.addClassCleanup(server.shutdown)
+        cls.port = server.server_port
+        cls.base = f"http://127.0.0.1:{cls.port}"
+
+    def setUp(self):
+        UpstreamStub.hits.clear()
+        http_client.reset()
+        self.addCleanup(http_client.reset)
+
+    def test_non_public_addresses_are_refused(self):
+        for url in (
+            'http://127.0.0.1/a.jpg',
+            'http://10.0.0.8/a.jpg',
+            'http://192.168.1.1/a.jpg',
+            'http://169.254.169.254/latest/meta-data/',
+            'http://[::1]/a.jpg',
+            'http://[::ffff:127.0.0.1]/a.jpg',
+            'http://0.0.0.0/a.jpg',
+            'http://localhost/a.jpg',
+            'file:///etc/passwd',
+        ):
+            with self.subTest(url=url), self.assertRaises(http_client.UnsafeURL):
+                http_client.check_public_url(url)
+
+    def test_host_names_are_resolved(self):
+        with mock.patch('socket.getaddrinfo', return_value=[(2, 1, 6, '', ('10.1.2.3', 80))]):
+            with self.assertRaises(http_client.UnsafeURL):
+                http_client.check_public_url('http://images.example.com/a.jpg')
+            # Without resolving only literals are checked
+            http_client.check_public_url('http://images.example.com/a.jpg', resolve=False)
+
+        with mock.patch('socket.getaddrinfo', return_value=[(2, 1, 6, '', ('93.184.216.34', 80))]):
+            http_client.check_public_url('http://images.example.com/a.jpg')
+
+    def test_get_public_does_not_call_private_hosts(self):
+        with self.assertRaises(http_client.UnsafeURL):
+            http_client.get_public(f"{self.base}/ok")
+        self.assertEqual(UpstreamStub.hits['/ok'], 0)
+
+    def test_every_redirect_hop_is_checked(self):
+        # Let the loopback stub through, nothing else that is not public
+        allow_loopback = lambda address: address.is_loopback or address.is_global  # noqa: E731
+        with mock.patch.object(http_client, '_is_public', allow_loopback):
+            self.assertEqual(http_client.get_public(f"{self.base}/to-ok").status_code, 200)
+            self.assertEqual(UpstreamStub.hits['/ok'], 1)
+            # User supplied hosts are not tracked
+            self.assertEqual(http_client.snapshot(), {})
+
+            with self.assertRaises(http_client.UnsafeURL):
+                http_client.get_public(f"{self.base}/to-metadata")
+
+    def test_connects_to_the_address_that_was_checked(self):
+        # images.test first resolves to the stub, then "rebinds" to 127.0.0.2,
+        # a private address nothing listens on
+        answers = iter(['127.0.0.1'])
+        real_getaddrinfo = socket.getaddrinfo
+
+        def getaddrinfo(host, port, *args, **kwargs):
+            if host == 'images.test':
+                return real_getaddrinfo(next(answers, '127.0.0.2'), port, *args, **kwargs)
+            return real_getaddrinfo(host, port, *args, **kwargs)
+
+        stub = ipaddress.ip_address('127.0.0.1')
+        with mock.patch.object(http_client, '_is_public', lambda address: address == stub or address.is_global), \
+                mock.patch('socket.getaddrinfo', getaddrinfo):
+            response = http_client.get_public(f"http://images.test:{self.port}/ok", timeout=(1, 2))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(UpstreamStub.hits['/ok'], 1)
+        self.assertEqual(UpstreamStub.host_headers['/ok'], f"images.test:{self.port}")
+
+
+class ExportFormulaEscapingTests(SimpleTestCase):
+    headers = ['Product', 'Price', 'Note']
+    rows = [
+        ['=HYPERLINK("http://evil.example","click")', Decimal('12.50'), '+233 20 000 0000'],
+        ['@SUM(A1:A2)', -3, '-1+1'],
+        ['\tTabbed', 0, 'Plain lamp'],
+    ]
+    expected = [
+        ['\'=HYPERLINK("http://evil.example","click")', '12.50', "'+233 20 000 0000"],
+        ["'@SUM(A1:A2)", '-3', "'-1+1"],
+        ["'\tTabbed", '0', 'Plain lamp'],
+    ]
+
+    def test_csv_cells_are_escaped(self):
+        response = exports.stream_csv('out.csv', self.headers, iter(self.rows))
+        content = b''.join(response.streaming_content).decode('utf-8').lstrip('\ufeff')
+        self.assertEqual(list(csv.reader(io.StringIO(content)))[1:], self.expected)
+
+    def test_xlsx_cells_are_escaped(self):
+        response = exports.stream_xlsx('out.xlsx', self.headers, iter(self.rows))
+        sheet = load_workbook(io.BytesIO(b''.join(response.streaming_content))).active
+        values = [list(row) for row in sheet.iter_rows(min_row=2, values_only=True)]
+
+        self.assertEqual([row[0] for row in values], [row[0] for row in self.expected])
+        self.assertEqual([row[2] for row in values], [row[2] for row in self.expected])
+        # Numbers stay numbers
+        self.assertEqual([row[1] for row in values], [12.5, -3, 0])